@@ -26,6 +26,7 @@ import argparse
 import json
 import logging
 import os
+import re
 import sys
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -389,6 +390,39 @@ def run_batch_evaluation(reasoning_agent, dataset_name, rollouts=1, workers=10):
         traceback.print_exc()
 
 
+# 统计JSONL记录数时每次读取的字节数
+LINE_COUNT_CHUNK_SIZE = 1 << 20
+# 换行后只含空白、紧接着又是换行的空行（前瞻不消耗换行符，连续空行逐个匹配）
+BLANK_LINE_PATTERN = re.compile(rb'\n[ \t\r\x0b\x0c]*(?=\n)')
+
+
+def count_jsonl_lines(path):
+    """统计JSONL文件的非空记录数：bytes.count 批量统计换行符，再减去空行/只含空白的行，不逐行解码"""
+    newlines = 0
+    blank_lines = 0
+    # 当前尚未结束的行到目前为止是否只含空白（跨块的行据此判断）
+    pending_blank = True
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            chunk = f.read(LINE_COUNT_CHUNK_SIZE)
+            if not chunk:
+                break
+            first = chunk.find(b'\n')
+            if first == -1:
+                # 整块都属于同一行
+                pending_blank = pending_blank and not chunk.strip()
+                continue
+            newlines += chunk.count(b'\n')
+            # 跨块的行在本块第一个换行处结束
+            if pending_blank and not chunk[:first].strip():
+                blank_lines += 1
+            # 块内的空行只有匹配到的才会产生Python对象
+            blank_lines += sum(1 for _ in BLANK_LINE_PATTERN.finditer(chunk, first))
+            pending_blank = not chunk[chunk.rfind(b'\n') + 1:].strip()
+    # 最后一行没有换行符且不为空时也计为一条记录
+    return newlines - blank_lines + (0 if pending_blank else 1)
+
+
 def list_datasets():
     """列出可用数据集"""
     print("\n📂 可用数据集列表")
@@ -400,7 +434,7 @@ def list_datasets():
     datasets = []
     for jsonl_file in datasets_path.glob("*.jsonl"):
         try:
-            count = sum(1 for line in open(jsonl_file, 'r') if line.strip())
+            count = count_jsonl_lines(jsonl_file)
             size_mb = jsonl_file.stat().st_size / (1024 * 1024)
             modified = datetime.fromtimestamp(jsonl_file.stat().st_mtime)
             
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# eval_cli 以 EvaluationPipeline 目录为根导入 src，测试时同样把该目录加入路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
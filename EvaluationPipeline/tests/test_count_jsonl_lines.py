@@ -0,0 +1,32 @@
+import pytest
+
+try:
+    import eval_cli
+except SystemExit:
+    # eval_cli 在推理引擎依赖缺失时直接退出
+    pytest.skip('推理引擎依赖未安装，跳过 eval_cli 测试', allow_module_level=True)
+
+
+@pytest.mark.parametrize('content, expected', [
+    (b'', 0),
+    (b'{"q": 1}\n{"q": 2}\n', 2),
+    # 末尾多出的空行不计入
+    (b'{"q": 1}\n{"q": 2}\n\n', 2),
+    # 最后一行没有换行符
+    (b'{"q": 1}\n{"q": 2}', 2),
+    # 中间的空行和只含空白的行不计入
+    (b'{"q": 1}\n\n  \r\n{"q": 2}\n', 2),
+    (b'\n\n', 0),
+])
+def test_count_jsonl_lines_counts_non_empty_lines(tmp_path, content, expected):
+    path = tmp_path / 'data.jsonl'
+    path.write_bytes(content)
+    assert eval_cli.count_jsonl_lines(str(path)) == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7])
+def test_count_jsonl_lines_handles_lines_across_chunks(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(eval_cli, 'LINE_COUNT_CHUNK_SIZE', chunk_size)
+    path = tmp_path / 'data.jsonl'
+    path.write_bytes(b'{"q": 1}\n\n  \n{"q": 2}\n \t \n{"q": 3}\n\n\n  x\n   ')
+    assert eval_cli.count_jsonl_lines(str(path)) == 4
@@ -519,6 +519,7 @@ def main():
   %(prog)s --list-seeds                             # 列出可用种子文件
   %(prog)s --seed-file test.csv --output custom.jsonl --sample-size 10
   %(prog)s --seed-file entities.csv --qps-limit 1.5 --parallel-workers 1
+  %(prog)s --seed-file entities.csv --yes            # 跳过确认，适用于脚本批量运行
 
 输出文件说明:
   - 默认输出到 qa_output/ 目录
@@ -532,6 +533,7 @@ def main():
     parser.add_argument('--output', '-o', help='输出文件路径（默认自动生成）')
     parser.add_argument('--list-seeds', action='store_true', help='列出可用的种子文件')
     parser.add_argument('--status', action='store_true', help='查看指定文件的处理状态（需要同时指定seed-file和output）')
+    parser.add_argument('--yes', '-y', action='store_true', help='跳过开始前的确认提示（非交互模式）')
     
     # 生成参数
 
@@ -636,6 +638,9 @@ def main():
         seed_file = args.seed_file
         if not seed_file.endswith('.csv'):
             seed_file += '.csv'
+    elif args.yes:
+        print("❌ 非交互模式（--yes）需要通过 --seed-file 指定种子文件")
+        sys.exit(1)
     else:
         seed_file = cli.interactive_select_seed_file()
     
@@ -681,15 +686,16 @@ def main():
     print(f"   模糊化概率: 默认0.3 (暂不支持自定义)")
     print(f"   采样大小: 由GraphRag内部智能决定")
     
-    # 确认开始
-    try:
-        confirm = input(f"\n🚀 是否开始生成? (y/N): ")
-        if confirm.lower() not in ['y', 'yes', '是']:
-            print("用户取消操作")
+    # 确认开始（--yes 时跳过，便于脚本化批量运行）
+    if not args.yes:
+        try:
+            confirm = input(f"\n🚀 是否开始生成? (y/N): ")
+            if confirm.lower() not in ['y', 'yes', '是']:
+                print("用户取消操作")
+                sys.exit(0)
+        except KeyboardInterrupt:
+            print("\n用户取消操作")
             sys.exit(0)
-    except KeyboardInterrupt:
-        print("\n用户取消操作")
-        sys.exit(0)
     
     # 开始生成
     try:
@@ -2,6 +2,7 @@ import asyncio
 import json
 import logging
 import random
+import threading
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Callable
 from pathlib import Path
@@ -282,8 +283,12 @@ B的路径： [复制第一步中对B的还原结果]
             return error_result
 
     async def compare_datasets(self, config: Dict[str, Any], 
-                             progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
-        """比较两个数据集"""
+                             progress_callback: Optional[Callable] = None,
+                             cancel_event: Optional[threading.Event] = None) -> Optional[Dict[str, Any]]:
+        """比较两个数据集
+        
+        cancel_event 被设置后不再开始新的对比，已开始的对比完成后返回 None（不保存结果文件）
+        """
         try:
             # 生成对比ID
             comparison_id = f"comp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -333,6 +338,8 @@ B的路径： [复制第一步中对B的还原结果]
             async def worker_task(task_item):
                 nonlocal completed_count
                 async with semaphore:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None
                     result = await self._process_single_comparison(task_item, config, progress_callback)
                     
                     completed_count += 1
@@ -363,6 +370,10 @@ B的路径： [复制第一步中对B的还原结果]
             # 并发执行所有任务
             results = await asyncio.gather(*[worker_task(task) for task in tasks])
             
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info(f"对比评测已停止，已完成 {sum(1 for r in results if r is not None)}/{total_count} 题")
+                return None
+            
             # 计算最终统计
             datasetA_wins = sum(1 for r in results if r.get('winner') == 'A')
             datasetB_wins = sum(1 for r in results if r.get('winner') == 'B')
@@ -1,6 +1,8 @@
 import asyncio
+import itertools
 import json
 import logging
+import threading
 import openai
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Callable
@@ -297,8 +299,12 @@ class Evaluator:
 
 
     async def evaluate_dataset(self, dataset_path: str, dataset_name: str, mode: str = "R1-0528", 
-                              progress_callback: Optional[Callable] = None, batch_size: int = 10) -> Dict[str, Any]:
-        """评估整个数据集 - 使用流水线并发模式"""
+                              progress_callback: Optional[Callable] = None, batch_size: int = 10,
+                              cancel_event: Optional[threading.Event] = None) -> Optional[Dict[str, Any]]:
+        """评估整个数据集 - 使用流水线并发模式
+        
+        cancel_event 被设置后工作协程不再领取新题目，已开始的题目完成后返回 None（不保存结果文件）
+        """
         # 继承trace context（如果有的话）
         from .trace_manager import TraceManager, start_trace
         parent_trace = TraceManager.get_trace_id()
@@ -322,9 +328,8 @@ class Evaluator:
             task_queue = asyncio.Queue()
             results = [None] * total_tasks  # 预分配结果数组，确保索引对应
             
-            # 创建完成计数器和锁
-            completed_count = 0
-            progress_lock = asyncio.Lock()
+            # 完成计数器：next() 直接返回递增后的完成数（单线程事件循环内无需加锁）
+            completed_counter = itertools.count(1)
             
             # 将所有任务放入队列
             for i, item in enumerate(data):
@@ -335,11 +340,7 @@ class Evaluator:
                     "gold_answer": item.get("answer", ""),
                     "task_id": f"task_{i + 1}"
                 }
-                await task_queue.put(task_item)
-            
-            # 添加结束信号
-            for _ in range(batch_size):
-                await task_queue.put(None)
+                task_queue.put_nowait(task_item)
             
             # 使用信号量控制并发数量
             semaphore = asyncio.Semaphore(batch_size)
@@ -347,23 +348,18 @@ class Evaluator:
             # 创建工作协程
             async def worker(worker_id: int):
                 """工作协程 - 处理完整的流水线"""
-                nonlocal completed_count
-                
                 while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        logger.debug(f"工作协程 {worker_id} 收到停止信号，退出")
+                        break
+                    try:
+                        # 从队列获取任务（队列在启动前已填满，取空即表示没有剩余任务，无需结束信号）
+                        task_item = task_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        logger.debug(f"工作协程 {worker_id} 任务已取完，退出")
+                        break
+                    
                     try:
-                        # 从队列获取任务
-                        task_item = await task_queue.get()
-                        
-                        if task_item is None:  # 结束信号
-                            logger.debug(f"工作协程 {worker_id} 收到结束信号，退出")
-                            break
-                        
-                        # 检查是否已经处理完所有任务
-                        async with progress_lock:
-                            if completed_count >= total_tasks:
-                                logger.warning(f"工作协程 {worker_id}: 已完成所有任务，跳过额外任务")
-                                break
-                        
                         async with semaphore:
                             # 创建一个临时的结果队列
                             temp_result_queue = asyncio.Queue()
@@ -384,37 +380,35 @@ class Evaluator:
                                     results[array_index] = result
                         
                         # 更新完成计数并通知进度
-                        async with progress_lock:
-                            completed_count += 1
-                            progress_percent = min(completed_count / total_tasks * 100, 100)  # 确保不超过100%
+                        completed_count = next(completed_counter)
+                        progress_percent = min(completed_count / total_tasks * 100, 100)  # 确保不超过100%
+                        
+                        # 通知任务完成
+                        if progress_callback and result:
+                            status = "CORRECT" if result.get("correct") else "INCORRECT" if result.get("judgment") == "B" else "ERROR"
+                            progress_callback(
+                                f"第{result['index']}题: 完成 - {status} ({completed_count}/{total_tasks})", 
+                                progress_percent,
+                                task_id=task_item["task_id"],
+                                status="completed"
+                            )
                             
-                            # 通知任务完成
-                            if progress_callback and result:
-                                status = "CORRECT" if result.get("correct") else "INCORRECT" if result.get("judgment") == "B" else "ERROR"
-                                progress_callback(
-                                    f"第{result['index']}题: 完成 - {status} ({completed_count}/{total_tasks})", 
-                                    progress_percent,
-                                    task_id=task_item["task_id"],
-                                    status="completed"
-                                )
-                                
-                            logger.debug(f"工作协程 {worker_id}: 完成第{task_item['index']}题 ({completed_count}/{total_tasks})")
+                        logger.debug(f"工作协程 {worker_id}: 完成第{task_item['index']}题 ({completed_count}/{total_tasks})")
                         
                     except Exception as e:
                         logger.error(f"工作协程 {worker_id} 处理任务失败: {e}")
                         # 即使出错也要标记任务完成
-                        async with progress_lock:
-                            completed_count += 1
-                            progress_percent = min(completed_count / total_tasks * 100, 100)
-                            
-                            # 通知任务失败
-                            if progress_callback and task_item:
-                                progress_callback(
-                                    f"第{task_item.get('index', '?')}题: 系统错误 ({completed_count}/{total_tasks})", 
-                                    progress_percent,
-                                    task_id=task_item.get("task_id", "unknown"),
-                                    status="completed"
-                                )
+                        completed_count = next(completed_counter)
+                        progress_percent = min(completed_count / total_tasks * 100, 100)
+                        
+                        # 通知任务失败
+                        if progress_callback and task_item:
+                            progress_callback(
+                                f"第{task_item.get('index', '?')}题: 系统错误 ({completed_count}/{total_tasks})", 
+                                progress_percent,
+                                task_id=task_item.get("task_id", "unknown"),
+                                status="completed"
+                            )
             
             # 启动工作协程
             workers = [asyncio.create_task(worker(i)) for i in range(batch_size)]
@@ -422,6 +416,10 @@ class Evaluator:
             # 等待所有工作协程结束
             await asyncio.gather(*workers, return_exceptions=True)
             
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info(f"评测已停止: {dataset_name}，已完成 {sum(1 for r in results if r is not None)}/{total_tasks} 题")
+                return None
+            
             # 过滤掉None结果并确保连续性
             valid_results = [r for r in results if r is not None]
             
@@ -38,13 +38,22 @@ class RunManager:
         # 生成运行ID
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         if run_name:
-            self.current_run_id = f"{timestamp}_{run_name}"
+            base_run_id = f"{timestamp}_{run_name}"
         else:
-            self.current_run_id = timestamp
+            base_run_id = timestamp
         
-        # 创建运行目录
-        self.current_run_dir = self.base_dir / self.current_run_id
-        self.current_run_dir.mkdir(parents=True, exist_ok=True)
+        # 创建运行目录；同一秒内启动的同名运行追加序号，保证每次运行独占目录
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.current_run_id = base_run_id
+        suffix = 1
+        while True:
+            self.current_run_dir = self.base_dir / self.current_run_id
+            try:
+                self.current_run_dir.mkdir()
+                break
+            except FileExistsError:
+                self.current_run_id = f"{base_run_id}_{suffix}"
+                suffix += 1
         
         # 创建子目录
         self._create_run_structure()
@@ -252,6 +261,16 @@ class RunManager:
         """获取运行专用的logger"""
         return self.logger
     
+    def reset(self):
+        """关闭当前运行的日志handler并清空运行状态，以便实例复用于下一次运行"""
+        if self.logger:
+            for handler in list(self.logger.handlers):
+                self.logger.removeHandler(handler)
+                handler.close()
+        self.current_run_id = None
+        self.current_run_dir = None
+        self.logger = None
+    
     @classmethod
     def list_runs(cls, base_dir: str = "runs") -> list:
         """列出所有运行"""
@@ -5,15 +5,83 @@
 支持两种模糊化范式：概念本身模糊化和属性指代模糊化
 """
 
+import copy
+import hashlib
 import logging
 import json
 import random
-from typing import Dict, List, Any, Optional
+import threading
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 import openai
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# 已生成QA结果的缓存（按子图指纹索引，所有生成器实例共享，LRU淘汰）；
+# 只用于显式指定了目标实体的请求，未指定目标时每次调用都应生成新的QA
+_QA_CACHE_MAX_SIZE = 2048
+_qa_result_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_qa_result_cache_lock = threading.Lock()
+
+
+def _subgraph_fingerprint(
+    nodes: List[Dict],
+    relations: List[Dict],
+    target_entity: Optional[str],
+    sampling_algorithm: Optional[str]
+) -> str:
+    """计算子图指纹：节点/关系集合相同（与顺序无关）且目标一致时指纹相同"""
+    def canonical(item: Dict) -> str:
+        return json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+    
+    payload = json.dumps({
+        'nodes': sorted(canonical(node) for node in nodes),
+        'relations': sorted(canonical(rel) for rel in relations),
+        'target': target_entity,
+        'sampling_algorithm': sampling_algorithm
+    }, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+# 备用问题/推理路径模板（模块级常量，通过 str.format_map 填充）
+_FALLBACK_QUESTION_COMPLEX = "在一个包含{types}等多种类型实体的复杂网络中，通过分析实体间的关系链和属性特征，同时验证关键信息，最终指向的核心实体是什么？"
+_FALLBACK_QUESTION_SIMPLE = "基于给定的知识网络结构，请推理出与{type}密切相关并需要验证具体信息的目标实体是什么？"
+_FALLBACK_REASONING_STEP1 = "第一步：分析题目中涉及的实体类型包括{types}等，确定问题领域。"
+_FALLBACK_REASONING_STEP2 = "第二步：分析实体间的关系网络，识别关键的连接节点和路径。"
+_FALLBACK_REASONING_STEP3 = "第三步：综合所有线索，通过排除法和逻辑推理，同时验证提供的关键信息，锁定目标实体。"
+_FALLBACK_REASONING_STEP4 = "第四步：验证推理结果并确认相关数据，确认答案为{answer}，该答案与所有线索和提供的信息都能完美匹配。"
+
+
+@lru_cache(maxsize=4096)
+def _build_fallback_question(unique_types: Tuple[str, ...], is_multi_node: bool) -> str:
+    """根据实体类型集合生成备用问题（结果按参数缓存）"""
+    if is_multi_node:
+        return _FALLBACK_QUESTION_COMPLEX.format_map({'types': ', '.join(unique_types)})
+    return _FALLBACK_QUESTION_SIMPLE.format_map({'type': unique_types[0] if unique_types else '相关实体'})
+
+
+@lru_cache(maxsize=4096)
+def _build_fallback_reasoning(unique_types: Tuple[str, ...], has_relations: bool, target_answer: str) -> str:
+    """根据实体类型集合生成备用推理路径（结果按参数缓存）"""
+    # 第一步：识别实体类型和领域
+    reasoning_steps = [_FALLBACK_REASONING_STEP1.format_map({'types': ', '.join(unique_types)})]
+    
+    # 第二步：分析关系网络
+    if has_relations:
+        reasoning_steps.append(_FALLBACK_REASONING_STEP2)
+    
+    # 第三步：综合线索和验证信息
+    reasoning_steps.append(_FALLBACK_REASONING_STEP3)
+    
+    # 第四步：确认答案
+    reasoning_steps.append(_FALLBACK_REASONING_STEP4.format_map({'answer': target_answer}))
+    
+    return " ".join(reasoning_steps)
+
+
 class UnifiedQAGenerator:
     """统一的模糊化+QA生成器"""
     
@@ -119,6 +187,19 @@ class UnifiedQAGenerator:
                 logger.warning("子图信息不足，无法生成复杂QA")
                 return await self._generate_fallback_qa()
             
+            # 显式指定目标实体时，相同子图+目标实体已生成过则直接复用结果，避免重复调用LLM；
+            # 未指定目标的调用（重复采样、变体生成）期望得到新的QA，不使用缓存
+            fingerprint = None
+            if target_entity_for_answer:
+                fingerprint = _subgraph_fingerprint(nodes, relations, target_entity_for_answer, sampling_algorithm)
+                with _qa_result_cache_lock:
+                    cached_result = _qa_result_cache.get(fingerprint)
+                    if cached_result is not None:
+                        _qa_result_cache.move_to_end(fingerprint)
+                if cached_result is not None:
+                    logger.info(f"命中QA结果缓存: {fingerprint}")
+                    return self._stamp_variant_id(copy.deepcopy(cached_result))
+            
             # 构建子图信息JSON
             subgraph_json = self._build_subgraph_json(nodes, relations, sampling_algorithm)
             
@@ -154,7 +235,15 @@ class UnifiedQAGenerator:
             final_answer = qa_result.get('answer', '')
             logger.info(f"最终生成结果: 问题长度={len(final_question)}, 答案={final_answer}")
             
-            return qa_result
+            # 只缓存模型真正生成的结果，备用结果下次仍尝试重新生成
+            if fingerprint is not None and not qa_result.get('generation_metadata', {}).get('is_fallback'):
+                with _qa_result_cache_lock:
+                    _qa_result_cache[fingerprint] = copy.deepcopy(qa_result)
+                    _qa_result_cache.move_to_end(fingerprint)
+                    while len(_qa_result_cache) > _QA_CACHE_MAX_SIZE:
+                        _qa_result_cache.popitem(last=False)
+            
+            return self._stamp_variant_id(qa_result)
             
         except Exception as e:
             logger.error(f"统一QA生成失败: {e}")
@@ -746,10 +835,14 @@ reasoning_path必须详细描述如何一步步解答问题，包括：
         # else:
         #     validated['answer_validation'] = 'matches_target'
         
+        # 节点类型只在需要备用内容时统计，且最多统计一次，供两个备用生成方法共用
+        unique_types = None
+        
         # 验证问题质量
         question = validated['question']
         if not question or len(question) < 20:
-            validated['question'] = self._generate_fallback_question(nodes, target_answer)
+            unique_types = self._collect_unique_types(nodes)
+            validated['question'] = self._generate_fallback_question(nodes, target_answer, unique_types)
             validated['question_quality'] = 'generated_fallback'
         else:
             validated['question_quality'] = 'original'
@@ -757,7 +850,9 @@ reasoning_path必须详细描述如何一步步解答问题，包括：
         # 验证推理路径
         reasoning = validated['reasoning_path']
         if not reasoning or len(reasoning) < 30:
-            validated['reasoning_path'] = self._generate_fallback_reasoning(nodes, target_answer)
+            if unique_types is None:
+                unique_types = self._collect_unique_types(nodes)
+            validated['reasoning_path'] = self._generate_fallback_reasoning(nodes, target_answer, unique_types)
             validated['reasoning_quality'] = 'generated_fallback'
         else:
             validated['reasoning_quality'] = 'original'
@@ -772,52 +867,49 @@ reasoning_path必须详细描述如何一步步解答问题，包括：
         
         return validated
     
-    def _generate_fallback_question(self, nodes: List[Dict], target_answer: str) -> str:
+    @staticmethod
+    def _collect_unique_types(nodes: List[Dict]) -> Tuple[str, ...]:
+        """一次遍历收集节点类型（排序后的元组，可直接作为缓存键）"""
+        return tuple(sorted({node.get('type', 'unknown') for node in nodes}))
+    
+    def _generate_fallback_question(
+        self, 
+        nodes: List[Dict], 
+        target_answer: str, 
+        unique_types: Optional[Tuple[str, ...]] = None
+    ) -> str:
         """生成备用问题"""
         if not nodes:
             return f"什么是 {target_answer}？"
         
         # 基于节点信息生成一个基本的复杂问题
-        node_types = [node.get('type', 'unknown') for node in nodes]
-        unique_types = list(set(node_types))
-        
-        if len(nodes) >= 3:
-            return f"在一个包含{', '.join(unique_types)}等多种类型实体的复杂网络中，通过分析实体间的关系链和属性特征，同时验证关键信息，最终指向的核心实体是什么？"
-        else:
-            return f"基于给定的知识网络结构，请推理出与{unique_types[0] if unique_types else '相关实体'}密切相关并需要验证具体信息的目标实体是什么？"
+        if unique_types is None:
+            unique_types = self._collect_unique_types(nodes)
+        return _build_fallback_question(unique_types, len(nodes) >= 3)
     
-    def _generate_fallback_reasoning(self, nodes: List[Dict], target_answer: str) -> str:
+    def _generate_fallback_reasoning(
+        self, 
+        nodes: List[Dict], 
+        target_answer: str, 
+        unique_types: Optional[Tuple[str, ...]] = None
+    ) -> str:
         """生成备用推理路径"""
         if not nodes:
             return f"基于题目描述，通过逻辑推理和必要的信息验证可以确定答案是{target_answer}。"
         
         # 构建基本的推理路径
-        reasoning_steps = []
-        
-        # 第一步：识别实体类型和领域
-        node_types = [node.get('type', 'unknown') for node in nodes]
-        unique_types = list(set(node_types))
-        reasoning_steps.append(f"第一步：分析题目中涉及的实体类型包括{', '.join(unique_types)}等，确定问题领域。")
-        
-        # 第二步：分析关系网络
-        if len(nodes) >= 2:
-            reasoning_steps.append("第二步：分析实体间的关系网络，识别关键的连接节点和路径。")
-        
-        # 第三步：综合线索和验证信息
-        reasoning_steps.append("第三步：综合所有线索，通过排除法和逻辑推理，同时验证提供的关键信息，锁定目标实体。")
-        
-        # 第四步：确认答案
-        reasoning_steps.append(f"第四步：验证推理结果并确认相关数据，确认答案为{target_answer}，该答案与所有线索和提供的信息都能完美匹配。")
-        
-        return " ".join(reasoning_steps)
+        if unique_types is None:
+            unique_types = self._collect_unique_types(nodes)
+        return _build_fallback_reasoning(unique_types, len(nodes) >= 2, target_answer)
     
     def _create_fallback_result(self, target_answer: str, nodes: List[Dict]) -> Dict[str, Any]:
         """创建备用结果"""
+        unique_types = self._collect_unique_types(nodes)
         return {
             'selected_answer': '无法确定',
-            'question': self._generate_fallback_question(nodes, target_answer),
+            'question': self._generate_fallback_question(nodes, target_answer, unique_types),
             'answer': target_answer,
-            'reasoning_path': self._generate_fallback_reasoning(nodes, target_answer),
+            'reasoning_path': self._generate_fallback_reasoning(nodes, target_answer, unique_types),
             'entity_mapping': {
                 'Target_Entity': target_answer
             },
@@ -843,6 +935,12 @@ reasoning_path必须详细描述如何一步步解答问题，包括：
             }
         }
     
+    @staticmethod
+    def _stamp_variant_id(qa_result: Dict[str, Any]) -> Dict[str, Any]:
+        """为返回给调用方的每个结果写入新的 variant_id，区分同一缓存条目返回的多个副本"""
+        qa_result.setdefault('generation_metadata', {})['variant_id'] = uuid.uuid4().hex
+        return qa_result
+    
     async def generate_multiple_qa_variants(
         self, 
         sample_info: Dict[str, Any], 
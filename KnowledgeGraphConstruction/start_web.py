@@ -1,15 +1,26 @@
 #!/usr/bin/env python3
 """
 Web应用启动脚本
+
+默认以非调试模式启动（关闭自动重载），设置 KG_DEBUG=1 可开启调试模式。
+生产部署可改用 gunicorn 等WSGI服务器，避免Werkzeug开发服务器的开销，例如：
+    SOCKETIO_ASYNC_MODE=eventlet gunicorn -k eventlet -w 1 -b 0.0.0.0:5000 web_app:app
+（Flask-SocketIO 需要单worker；多worker时需设置 SOCKETIO_MQ 指向消息队列，如 redis://localhost:6379/0）
+
+注意：eventlet 模式需在导入其他模块前执行 eventlet.monkey_patch()，且后台任务中的
+asyncio 事件循环会阻塞greenlet调度，因此默认仍使用 threading 模式。
 """
 import os
 import sys
 from web_app import app, socketio
 
 if __name__ == '__main__':
+    debug = os.environ.get('KG_DEBUG') == '1'
+    
     print("🚀 启动知识图谱构建Web应用...")
     print("📍 访问地址: http://localhost:5000")
-    print("🔧 调试模式: 开启")
+    print(f"🔧 调试模式: {'开启' if debug else '关闭'}")
+    print(f"⚙️  SocketIO异步模式: {socketio.async_mode}")
     print("="*50)
     
     # 启动Flask-SocketIO应用
@@ -17,6 +28,7 @@ if __name__ == '__main__':
         app,
         host='0.0.0.0',
         port=5000,
-        debug=True,
+        debug=debug,
+        use_reloader=debug,
         allow_unsafe_werkzeug=True
-    ) 
\ No newline at end of file
+    )
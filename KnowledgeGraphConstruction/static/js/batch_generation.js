@@ -72,17 +72,22 @@ class BatchGenerationManager {
     // Socket.IO事件
     this.socket.on('connect', () => console.log('已连接到服务器'));
     this.socket.on('disconnect', () => console.log('已断开与服务器的连接'));
-    this.socket.on('batch_progress', (data) => this.handleBatchProgress(data));
-    this.socket.on('batch_result', (data) => this.handleBatchResult(data));
-    this.socket.on('batch_complete', (data) => this.handleBatchComplete(data));
-    this.socket.on('batch_error', (data) => this.handleBatchError(data));
-            this.socket.on('log_message', (data) => {
-            // 包含trace信息的日志显示
-            let message = data.message;
-            if (data.trace_id && data.trace_id !== 'NO_TRACE') {
-                message = `[${data.trace_id}] ${message}`;
-            }
-            console.log(`[${data.level}] ${message}`);
+    // 多个批量任务可同时运行，带 run_id 的事件只处理本页面启动的批次
+    this.socket.on('batch_progress', (data) => this.isCurrentBatch(data) && this.handleBatchProgress(data));
+    // 服务端按任务合并后批量推送进度
+    this.socket.on('batch_progress_bulk', (items) => items.forEach((data) => this.isCurrentBatch(data) && this.handleBatchProgress(data)));
+    this.socket.on('batch_result', (data) => this.isCurrentBatch(data) && this.handleBatchResult(data));
+    this.socket.on('batch_complete', (data) => this.isCurrentBatch(data) && this.handleBatchComplete(data));
+    this.socket.on('batch_error', (data) => this.isCurrentBatch(data) && this.handleBatchError(data));
+            this.socket.on('log_batch', (entries) => {
+            // 服务端按批推送日志，逐条显示（包含trace信息）
+            entries.forEach((data) => {
+                let message = data.message;
+                if (data.trace_id && data.trace_id !== 'NO_TRACE') {
+                    message = `[${data.trace_id}] ${message}`;
+                }
+                console.log(`[${data.level}] ${message}`);
+            });
         });
   }
 
@@ -175,6 +180,7 @@ class BatchGenerationManager {
     
     // 重置状态
     this.isBatchGenerating = true;
+    this.currentBatchId = null;
     this.generatedResults = [];
     this.updateUI();
     this.resetTaskList();
@@ -393,6 +399,10 @@ class BatchGenerationManager {
   }
 
   // Socket.IO事件处理
+  isCurrentBatch(data) {
+    return !data || !data.run_id || data.run_id === this.currentBatchId;
+  }
+
   handleBatchProgress(data) {
     console.log('批量生成进度:', data);
     
@@ -37,6 +37,11 @@ class ComparisonEvaluation {
       this.updateProgress(data);
     });
 
+    // 服务端按任务合并后批量推送进度
+    this.socket.on('comparison_progress_bulk', (items) => {
+      items.forEach((data) => this.updateProgress(data));
+    });
+
     this.socket.on('comparison_result', (data) => {
       this.handleComparisonResult(data);
     });
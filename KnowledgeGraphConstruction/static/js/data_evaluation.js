@@ -49,6 +49,8 @@ class DataEvaluationManager {
 
     // Socket.IO事件
     this.socket.on('evaluation_progress', (data) => this.handleEvaluationProgress(data));
+    // 服务端按任务合并后批量推送进度
+    this.socket.on('evaluation_progress_bulk', (items) => items.forEach((data) => this.handleEvaluationProgress(data)));
     this.socket.on('evaluation_result', (data) => this.handleEvaluationResult(data));
     this.socket.on('evaluation_complete', (data) => this.handleEvaluationComplete(data));
     this.socket.on('evaluation_error', (data) => this.handleEvaluationError(data));
@@ -10,6 +10,7 @@ let svg, g, simulation, zoom;
 let currentGraphData = {nodes: [], links: []};
 let expansionInfo = null;  // expansion状态信息
 let isBuilding = false;
+let currentRunId = null;  // 本页面启动的构建任务，只渲染该任务的事件
 let graphContainer; // 图谱容器元素
 
 // DOM元素
@@ -1178,6 +1179,11 @@ function redistributeNodes() {
     setTimeout(() => adjustViewBox(), 200);
 }
 
+// 多个构建可同时运行，带 run_id 的事件只处理本页面启动的任务
+function isCurrentRun(data) {
+    return !data.run_id || data.run_id === currentRunId;
+}
+
 // Socket.IO事件监听
 socket.on('connect', function() {
     console.log('已连接到服务器');
@@ -1192,21 +1198,25 @@ socket.on('disconnect', function() {
     addLog('WARNING', '已断开与服务器的连接');
 });
 
-socket.on('log_message', function(data) {
-    // 如果有trace_id，在消息中显示
-    let message = data.message;
-    if (data.trace_id && data.trace_id !== 'NO_TRACE') {
-        message = `[${data.trace_id}] ${message}`;
-    }
-    addLog(data.level, message);
+socket.on('log_batch', function(entries) {
+    // 服务端按批推送日志，逐条显示；如果有trace_id，在消息中显示
+    entries.forEach(function(data) {
+        let message = data.message;
+        if (data.trace_id && data.trace_id !== 'NO_TRACE') {
+            message = `[${data.trace_id}] ${message}`;
+        }
+        addLog(data.level, message);
+    });
 });
 
 socket.on('progress_update', function(data) {
+    if (!isCurrentRun(data)) return;
     console.log('收到进度更新:', data);
     updateProgress(data.progress, data.step);
 });
 
 socket.on('graph_update', function(data) {
+    if (!isCurrentRun(data)) return;
     console.log('收到图谱更新:', data);
     
     // 调试expansion状态
@@ -1233,6 +1243,7 @@ socket.on('graph_update', function(data) {
 });
 
 socket.on('sampled_graph_update', function(data) {
+    if (!isCurrentRun(data)) return;
     console.log('收到星座图更新:', data);
     const sampledNodes = data.nodes.map(node => ({...node, sampled: true}));
     const sampledLinks = data.links.map(link => ({...link, sampled: true}));
@@ -1241,6 +1252,7 @@ socket.on('sampled_graph_update', function(data) {
 });
 
 socket.on('building_complete', function(data) {
+    if (!isCurrentRun(data)) return;
     console.log('构建完成:', data);
     console.log('构建完成数据详情:', {
         hasGraphData: !!data.graph_data,
@@ -1302,6 +1314,7 @@ startBtn.addEventListener('click', function() {
     
     // 更新UI状态
     isBuilding = true;
+    currentRunId = null;
     startBtn.disabled = true;
     stopBtn.disabled = false;
     
@@ -1324,6 +1337,7 @@ startBtn.addEventListener('click', function() {
         if (data.error) {
             throw new Error(data.error);
         }
+        currentRunId = data.run_id;
         addLog('INFO', `开始构建知识图谱：${entity}`);
     })
     .catch(error => {
@@ -1337,7 +1351,11 @@ startBtn.addEventListener('click', function() {
 
 stopBtn.addEventListener('click', function() {
     fetch('/api/stop_building', {
-        method: 'POST'
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({run_id: currentRunId})
     })
     .then(response => response.json())
     .then(data => {
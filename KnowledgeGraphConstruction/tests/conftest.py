@@ -0,0 +1,6 @@
+import os
+import sys
+
+# web_app 以脚本目录为根导入 lib，测试时同样把 KnowledgeGraphConstruction 加入路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('OPENAI_API_KEY', 'test')
@@ -0,0 +1,30 @@
+import json
+
+import web_app
+
+
+def test_details_streams_baseline_shape(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dataset_dir = tmp_path / 'evaluation_data' / 'standard_datasets'
+    dataset_dir.mkdir(parents=True)
+    (dataset_dir / 'demo.jsonl').write_text(
+        '{"question": "Q1", "answer": "A1", "source": "s"}\n\nnot json\n{"question": "Q2", "answer": "A2"}\n',
+        encoding='utf-8'
+    )
+    
+    response = web_app.app.test_client().get('/api/evaluation_data/details/demo.jsonl')
+    assert response.status_code == 200
+    body = json.loads(response.get_data(as_text=True))
+    assert set(body) == {'id', 'name', 'type', 'count', 'created_at', 'modified_at', 'data', 'evaluation_history'}
+    assert body['count'] == 2
+    assert body['type'] == 'standard'
+    assert body['data'] == [
+        {'line_num': 1, 'question': 'Q1', 'answer': 'A1', 'metadata': {'source': 's'}},
+        {'line_num': 4, 'question': 'Q2', 'answer': 'A2', 'metadata': {}},
+    ]
+
+
+def test_details_missing_dataset_returns_404(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    response = web_app.app.test_client().get('/api/evaluation_data/details/missing.jsonl')
+    assert response.status_code == 404
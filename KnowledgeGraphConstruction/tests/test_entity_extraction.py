@@ -0,0 +1,23 @@
+import web_app
+
+
+def entity_names(text):
+    return [item['entity'] for item in web_app.extract_entities_from_text(text)]
+
+
+def test_geographic_match_keeps_proper_noun_parts():
+    assert entity_names('Visit New York, Texas in 2023.') == [
+        'Visit New York, Texas', 'Visit New York', 'Texas', '2023'
+    ]
+
+
+def test_bold_span_and_names_inside_it_are_both_extracted():
+    assert entity_names('The trial was led by **Dr. John Smith** at Mayo Clinic in 1998.') == [
+        'Dr. John Smith', 'Mayo Clinic', 'John Smith', '1998', 'The'
+    ]
+
+
+def test_entity_types_and_counts():
+    entities = {item['entity']: item for item in web_app.extract_entities_from_text('Mayo Clinic, 1998. Mayo Clinic again.')}
+    assert entities['Mayo Clinic'] == {'entity': 'Mayo Clinic', 'count': 2, 'type': 'proper_name'}
+    assert entities['1998']['type'] == 'year'
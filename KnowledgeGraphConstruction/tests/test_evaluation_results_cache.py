@@ -0,0 +1,23 @@
+import os
+
+import web_app
+
+
+def write_result(directory, name, accuracy):
+    (directory / name).write_bytes(web_app.json_dumps({'accuracy': accuracy, 'results': [1, 2]}).encode('utf-8'))
+
+
+def test_load_evaluation_results_reads_misses_and_drops_deleted(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_app, 'evaluation_results_cache', {})
+    for i in range(3):
+        write_result(tmp_path, f'eval_{i}.json', i)
+    
+    results = dict(web_app.load_evaluation_results(str(tmp_path)))
+    assert results == {f'eval_{i}.json': {'accuracy': i} for i in range(3)}
+    etag = web_app.evaluation_results_etag('results:all')
+    
+    os.remove(tmp_path / 'eval_0.json')
+    results = dict(web_app.load_evaluation_results(str(tmp_path)))
+    assert sorted(results) == ['eval_1.json', 'eval_2.json']
+    assert sorted(web_app.evaluation_results_cache) == ['eval_1.json', 'eval_2.json']
+    assert web_app.evaluation_results_etag('results:all') != etag
@@ -0,0 +1,46 @@
+import pytest
+
+import web_app
+
+
+@pytest.fixture
+def emitted(monkeypatch):
+    events = []
+
+    def emit(event, data=None, *args, **kwargs):
+        # 后台日志推送任务也会调用 emit，只记录被测事件
+        if event != 'log_batch':
+            events.append((event, data))
+
+    monkeypatch.setattr(web_app.socketio, 'start_background_task', lambda *args, **kwargs: None)
+    monkeypatch.setattr(web_app.socketio, 'emit', emit)
+    return events
+
+
+def test_graph_update_carries_run_id(emitted):
+    web_app.emit_graph_update('graph_update', {'nodes': [], 'links': []}, 'run_a')
+    web_app.send_pending_graph_updates()
+    assert emitted == [('graph_update', {'nodes': [], 'links': [], 'run_id': 'run_a'})]
+
+
+def test_batch_progress_of_concurrent_runs_is_not_merged(emitted):
+    web_app.emit_batch_progress('第1题: 开始', None, task_id='task_1', run_id='run_a')
+    web_app.emit_batch_progress('第1题: 开始', None, task_id='task_1', run_id='run_b')
+    web_app.flush_progress_updates()
+    assert len(emitted) == 1
+    event, items = emitted[0]
+    assert event == 'batch_progress_bulk'
+    assert sorted(item['run_id'] for item in items) == ['run_a', 'run_b']
+
+
+def test_graph_updates_of_concurrent_runs_are_kept_per_run(emitted):
+    web_app.emit_graph_update('graph_update', {'nodes': [1], 'links': []}, 'run_a')
+    web_app.emit_graph_update('graph_update', {'nodes': [2], 'links': []}, 'run_b')
+    web_app.emit_graph_update('sampled_graph_update', {'nodes': [3], 'links': []}, 'run_a')
+    web_app.emit_graph_update('graph_update', {'nodes': [4], 'links': []}, 'run_a')
+    web_app.send_pending_graph_updates()
+    assert emitted == [
+        ('graph_update', {'nodes': [4], 'links': [], 'run_id': 'run_a'}),
+        ('sampled_graph_update', {'nodes': [3], 'links': [], 'run_id': 'run_a'}),
+        ('graph_update', {'nodes': [2], 'links': [], 'run_id': 'run_b'}),
+    ]
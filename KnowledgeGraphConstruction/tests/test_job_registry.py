@@ -0,0 +1,119 @@
+import concurrent.futures
+import itertools
+import logging
+import threading
+
+import web_app
+
+run_ids = itertools.count()
+
+
+def new_run_id():
+    return f'test_run_{next(run_ids)}'
+
+
+def test_start_job_enforces_limit_atomically():
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    release = threading.Event()
+    barrier = threading.Barrier(8)
+    started = []
+
+    def worker(job):
+        release.wait(5)
+        job.is_running = False
+
+    def start():
+        barrier.wait()
+        started.append(web_app.start_job(pool, 2, new_run_id, '测试', worker))
+
+    threads = [threading.Thread(target=start) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+    pool.shutdown(wait=True)
+
+    accepted = [job for job in started if job is not None]
+    assert len(accepted) == 2
+    assert len({job.run_id for job in accepted}) == 2
+
+
+def test_logs_and_progress_stay_with_owning_job():
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    logger = logging.getLogger('test_job_registry')
+    handler = web_app.WebSocketHandler()
+    logger.addHandler(handler)
+    both_started = threading.Barrier(2)
+
+    def worker(job, name):
+        both_started.wait(5)
+        logger.warning(f'log from {name}')
+        web_app.update_progress(job, f'step {name}', 50)
+        job.is_running = False
+
+    try:
+        job_a = web_app.start_job(pool, 2, new_run_id, '测试', worker, 'a')
+        job_b = web_app.start_job(pool, 2, new_run_id, '测试', worker, 'b')
+        job_a.future.result(5)
+        job_b.future.result(5)
+    finally:
+        logger.removeHandler(handler)
+        pool.shutdown(wait=True)
+
+    messages_a = ' '.join(entry['message'] for entry in job_a.logs)
+    messages_b = ' '.join(entry['message'] for entry in job_b.logs)
+    assert 'log from a' in messages_a and 'log from b' not in messages_a
+    assert 'log from b' in messages_b and 'log from a' not in messages_b
+    assert job_a.current_step == 'step a'
+    assert job_b.current_step == 'step b'
+
+
+def test_stop_job_interrupts_running_build_at_next_progress_checkpoint():
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    entered = threading.Event()
+    outcome = {}
+
+    def worker(job):
+        entered.set()
+        job.cancel_event.wait(5)
+        try:
+            web_app.update_progress(job, '迭代', 40)
+        except web_app.JobCancelled:
+            outcome['cancelled'] = True
+        finally:
+            job.is_running = False
+            job.current_step = '已停止' if job.cancel_event.is_set() else '完成'
+
+    try:
+        job = web_app.start_job(pool, 1, new_run_id, '测试', worker)
+        assert entered.wait(5)
+        web_app.stop_job(job.run_id)
+        job.future.result(5)
+    finally:
+        pool.shutdown(wait=True)
+
+    assert outcome == {'cancelled': True}
+    assert not job.is_running
+    assert job.current_step == '已停止'
+
+
+def test_stop_job_cancels_queued_job():
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+
+    def blocker(job):
+        release.wait(5)
+        job.is_running = False
+
+    try:
+        running = web_app.start_job(pool, 2, new_run_id, '测试', blocker)
+        queued = web_app.start_job(pool, 2, new_run_id, '测试', blocker)
+        web_app.stop_job(queued.run_id)
+        assert queued.future.cancelled()
+        assert not queued.is_running
+        assert queued.current_step == '已停止'
+    finally:
+        release.set()
+        pool.shutdown(wait=True)
+    assert not running.is_running
@@ -0,0 +1,33 @@
+import pytest
+
+import web_app
+
+
+@pytest.mark.parametrize('text', [
+    '糖尿病的治疗方法有哪些？',
+    '高血压患者应该注意什么',
+    '',
+    '   ',
+    'What is the first-line treatment for type 2 diabetes?',
+    'How does insulin resistance develop in obese patients?',
+])
+def test_obvious_text_skips_llm(text):
+    assert web_app.is_language_obvious(text)
+
+
+@pytest.mark.parametrize('text', [
+    # 日文：含假名，不能按中文直接判定
+    'これは日本語の文章です。東京は日本の首都です。',
+    '糖尿病の治療方法は何ですか？',
+    # 韩文
+    '당뇨병의 치료 방법은 무엇입니까?',
+    '糖尿病 치료',
+    # 纯ASCII但不是英文
+    'Que es la diabetes mellitus tipo dos?',
+    'Was ist Diabetes?',
+    'Wie wird Diabetes behandelt und was sind die Symptome?',
+    # 中英混合
+    '什么是 insulin resistance？',
+])
+def test_ambiguous_text_goes_to_llm(text):
+    assert not web_app.is_language_obvious(text)
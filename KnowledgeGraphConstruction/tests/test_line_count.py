@@ -0,0 +1,38 @@
+import pytest
+
+import web_app
+
+
+@pytest.mark.parametrize('content, expected', [
+    (b'', 0),
+    (b'{"q": 1}\n{"q": 2}\n', 2),
+    # 最后一行没有换行符
+    (b'{"q": 1}\n{"q": 2}', 2),
+    # 中间、末尾的空行和只含空白的行不计入
+    (b'{"q": 1}\n\n{"q": 2}\n\n\n', 2),
+    (b'\n{"q": 1}\n  \r\n\t\n{"q": 2}\n   ', 2),
+    (b'\n\n', 0),
+    (b'  ', 0),
+])
+def test_count_jsonl_lines_skips_blank_lines(tmp_path, content, expected):
+    path = tmp_path / 'data.jsonl'
+    path.write_bytes(content)
+    assert web_app.count_jsonl_lines(str(path)) == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7])
+def test_count_jsonl_lines_handles_lines_across_chunks(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(web_app, 'LINE_COUNT_CHUNK_SIZE', chunk_size)
+    content = b'{"q": 1}\n\n  \n{"q": 2}\n \t \n{"q": 3}\n\n\n  x\n   '
+    path = tmp_path / 'data.jsonl'
+    path.write_bytes(content)
+    expected = sum(1 for line in content.split(b'\n') if line.strip())
+    assert web_app.count_jsonl_lines(str(path)) == expected == 4
+
+
+def test_count_jsonl_records_matches_dataset_count(tmp_path):
+    path = tmp_path / 'data.jsonl'
+    path.write_bytes(b'{"q": 1}\n\n{"q": 2}\n  \n\n')
+    stat = path.stat()
+    assert web_app.count_jsonl_records(str(path), stat.st_mtime, stat.st_size) == 2
+    assert web_app.count_jsonl_records(str(path), stat.st_mtime, stat.st_size) == web_app.count_jsonl_lines(str(path))
@@ -0,0 +1,15 @@
+import web_app
+
+
+def test_write_jsonl_lines_terminates_each_line(tmp_path):
+    path = tmp_path / 'data.jsonl'
+    web_app.write_jsonl_lines(str(path), ['{"a":1}', '{"b":"问题"}'])
+    assert path.read_bytes() == '{"a":1}\n{"b":"问题"}\n'.encode('utf-8')
+
+
+def test_write_jsonl_lines_empty_list_writes_empty_file(tmp_path):
+    path = tmp_path / 'data.jsonl'
+    path.write_bytes(b'{"old":true}\n')
+    web_app.write_jsonl_lines(str(path), [])
+    assert path.read_bytes() == b''
+    assert not (tmp_path / 'data.jsonl.part').exists()
@@ -8,19 +8,44 @@ import json
 import logging
 import asyncio
 import csv
+import hashlib
 import io
+import itertools
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_from_directory, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO, emit
 import threading
 import sys
 import os
 import concurrent.futures
+import contextvars
+import queue
+import random
+import re
+import string
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Optional
 from threading import Lock
 import time
+import zlib
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 # 预定义的领域标签列表
-PREDEFINED_DOMAIN_TAGS = {'体育', '学术', '政治', '娱乐', '文学', '文化', '经济', '科技', '历史', '医疗', '其他'}
+PREDEFINED_DOMAIN_TAGS = frozenset({'体育', '学术', '政治', '娱乐', '文学', '文化', '经济', '科技', '历史', '医疗', '其他'})
 
 # 添加lib目录到Python路径
 sys.path.append(os.path.join(os.path.dirname(__file__), 'lib'))
@@ -29,20 +54,289 @@ from lib.graphrag_builder import GraphRagBuilder
 from lib.run_manager import RunManager
 from lib.runs_qa_generator import RunsQAGenerator
 
+def json_loads(data):
+    """解析JSON（str或bytes），优先使用orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj, indent=False):
+    """序列化为JSON字符串（保留非ASCII字符），优先使用orjson"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+def json_dumps_line(obj):
+    """序列化为一行JSONL（UTF-8字节，含结尾换行），优先使用orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+# 写JSONL时攒够该字节数再写入一次，兼顾写入次数和峰值内存
+JSONL_WRITE_CHUNK_SIZE = 1024 * 1024
+
+def write_jsonl(file_path, items):
+    """将条目序列化为JSONL写入文件（覆盖），按 JSONL_WRITE_CHUNK_SIZE 分块写入
+
+    先写入临时文件再原子替换：目标路径总是指向新文件，原文件的硬链接（如备份）保持旧内容不变
+    """
+    tmp_path = f'{file_path}.part'
+    buffer = bytearray()
+    with open(tmp_path, 'wb') as f:
+        for item in items:
+            buffer += json_dumps_line(item)
+            if len(buffer) >= JSONL_WRITE_CHUNK_SIZE:
+                f.write(buffer)
+                buffer.clear()
+        if buffer:
+            f.write(buffer)
+    os.replace(tmp_path, file_path)
+
+# 用于从LLM回复中逐个位置尝试解析JSON（orjson不支持从中间位置解析）
+JSON_DECODER = json.JSONDecoder()
+
+def extract_json_array(response):
+    """从LLM回复中提取JSON对象数组：先解析首个'['到最后一个']'之间的文本，
+    失败时（数组前后的说明文字中也有方括号）逐个'['位置用 raw_decode 解析；找不到时抛出 JSONDecodeError"""
+    start = response.find('[')
+    end = response.rfind(']') + 1
+    if start >= 0 and end > start:
+        try:
+            return json_loads(response[start:end])
+        except json.JSONDecodeError:
+            pass
+    while start >= 0:
+        try:
+            result, _ = JSON_DECODER.raw_decode(response, start)
+            # 跳过说明文字中形如 [1] 的非对象数组
+            if isinstance(result, list) and all(isinstance(element, dict) for element in result):
+                return result
+        except json.JSONDecodeError:
+            pass
+        start = response.find('[', start + 1)
+    raise json.JSONDecodeError("未找到有效的JSON数组", response, 0)
+
+def write_jsonl_lines(file_path, lines):
+    """将已序列化的JSONL行一次编码、一次写入文件（覆盖，经临时文件原子替换）；无行时写入空文件"""
+    tmp_path = f'{file_path}.part'
+    with open(tmp_path, 'wb') as f:
+        if lines:
+            f.write('\n'.join(lines).encode('utf-8'))
+            f.write(b'\n')
+    os.replace(tmp_path, file_path)
+
+class ORJSONProvider(DefaultJSONProvider):
+    """使用orjson序列化jsonify响应的JSON提供器"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj,
+            default=self.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-socketio = SocketIO(app, cors_allowed_origins="*")
-
-# 全局变量存储构建状态
-building_status = {
-    'is_running': False,
-    'current_step': '',
-    'progress': 0,
-    'graph_data': {'nodes': [], 'links': []},
-    'logs': [],
-    'run_id': None,
-    'qa_result': None
-}
+# 部署在支持 X-Sendfile 的反向代理之后时，文件下载交给代理直接发送
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE') == '1'
+# 请求体大小上限（MB），超限的请求在读取前即被拒绝（413）
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('KG_MAX_CONTENT_MB', '1024')) * 1024 * 1024
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
+
+
+def get_request_json():
+    """解析一次请求体JSON（不缓存原始请求体）；请求体缺失或无法解析时返回 None
+
+    需要请求体的接口应在返回 None 时以 invalid_json_response() 返回400；
+    请求体可选的接口（如停止任务）使用 get_request_json() or {}。
+    """
+    return request.get_json(silent=True, cache=False)
+
+
+def invalid_json_response():
+    """请求体缺失或不是有效JSON时的400响应"""
+    return jsonify({'success': False, 'error': '请求体缺失或不是有效的JSON'}), 400
+
+
+# 异步模式可通过 SOCKETIO_ASYNC_MODE 指定（threading/eventlet/gevent），未设置时由Flask-SocketIO自动选择；
+# 多进程部署时通过 SOCKETIO_MQ 指定消息队列（如 redis://localhost:6379/0）
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    async_mode=os.getenv("SOCKETIO_ASYNC_MODE") or None,
+    message_queue=os.getenv("SOCKETIO_MQ") or None
+)
+
+# 日志缓冲配置：状态中最多保留的日志条数、批量推送的间隔（秒）和单批最大条数
+LOG_BUFFER_SIZE = 5000
+LOG_FLUSH_INTERVAL = 0.05
+LOG_BATCH_SIZE = 200
+
+# 任务注册表中最多保留的已结束任务数
+JOB_HISTORY_LIMIT = 50
+
+class JobCancelled(Exception):
+    """任务已被停止（由进度回调在检查点抛出，中断正在执行的构建）"""
+
+@dataclass(slots=True)
+class JobState:
+    """单个任务（图谱构建/批量生成/对比评测）的运行状态"""
+    run_id: Optional[str] = None
+    is_running: bool = False
+    current_step: str = ''
+    progress: int = 0
+    graph_data: Dict[str, list] = field(default_factory=lambda: {'nodes': [], 'links': []})
+    logs: deque = field(default_factory=lambda: deque(maxlen=LOG_BUFFER_SIZE))
+    qa_result: Optional[Dict[str, Any]] = None
+    future: Optional[concurrent.futures.Future] = None
+    # 任务提交到的线程池，用于按线程池统计同时运行的任务数
+    pool: Optional[concurrent.futures.Executor] = None
+    # 停止信号：stop_job 设置后，工作线程在下一个检查点退出
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    # 最近一次发送的图信息指纹，内容未变化时跳过重复的 graph_update
+    graph_fingerprint: Optional[str] = None
+    
+    def to_dict(self):
+        """转换为可序列化的字典（与旧版 building_status 结构一致）"""
+        return {
+            'is_running': self.is_running,
+            'current_step': self.current_step,
+            'progress': self.progress,
+            'graph_data': self.graph_data,
+            'logs': list(self.logs),
+            'run_id': self.run_id,
+            'qa_result': self.qa_result
+        }
+
+# 任务注册表（run_id -> JobState），增删查均需持有 jobs_lock
+jobs: Dict[str, JobState] = {}
+jobs_lock = threading.RLock()
+# 最近启动的任务ID，供未指定run_id的接口使用
+active_job_id: Optional[str] = None
+# 尚未启动任何任务时的占位状态（同时收集不属于任何任务的日志）
+idle_job = JobState()
+# 当前执行上下文所属的任务，由 run_job 在工作线程中设置，日志据此归入产生它的任务
+current_job = contextvars.ContextVar('current_job', default=None)
+
+# 图谱构建/批量生成任务的共享线程池（KG_WORKERS 控制并发上限）
+BUILD_WORKERS = int(os.getenv('KG_WORKERS', '4'))
+BUILD_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=BUILD_WORKERS,
+    thread_name_prefix='kgbuild'
+)
+
+# 评测/对比评测的独立线程池（KG_EVAL_WORKERS 控制并发上限），长时间评测不占用构建任务的线程
+EVAL_WORKERS = int(os.getenv('KG_EVAL_WORKERS', '2'))
+EVAL_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=EVAL_WORKERS,
+    thread_name_prefix='kgeval'
+)
+
+# 请求处理中的目录扫描/文件读取交给独立的IO线程池（KG_IO_WORKERS 按磁盘并行度设置），
+# 并发请求再多也只有固定数量的线程同时访问磁盘，不会拖慢SocketIO推送
+IO_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv('KG_IO_WORKERS', '4')),
+    thread_name_prefix='kgio'
+)
+IO_TIMEOUT = 30
+
+def run_io(fn, *args):
+    """在IO线程池中执行阻塞的文件操作并等待结果（超时抛出 TimeoutError）"""
+    return IO_POOL.submit(fn, *args).result(timeout=IO_TIMEOUT)
+
+# 线程池工作线程各自复用一个事件循环，避免每个任务都新建（且从未关闭）事件循环
+worker_loops = threading.local()
+
+def get_worker_loop():
+    """返回当前线程复用的事件循环，首次调用时创建并设为当前线程的事件循环"""
+    loop = getattr(worker_loops, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        worker_loops.loop = loop
+    return loop
+
+# 任务ID序号：同一秒内启动的多个任务也能得到不同的ID
+task_id_counter = itertools.count()
+
+def make_task_id(prefix):
+    """生成 前缀_时间戳_序号 形式的任务ID"""
+    return f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{next(task_id_counter):04d}"
+
+def create_job(run_id, current_step):
+    """注册新任务并设为当前活动任务"""
+    global active_job_id
+    job = JobState(run_id=run_id, is_running=True, current_step=current_step)
+    with jobs_lock:
+        jobs[run_id] = job
+        active_job_id = run_id
+        # 清理最早结束的任务，避免注册表无限增长
+        finished_ids = [job_id for job_id, state in jobs.items() if not state.is_running]
+        for job_id in finished_ids[:max(0, len(finished_ids) - JOB_HISTORY_LIMIT)]:
+            del jobs[job_id]
+    return job
+
+def run_job(job, fn, *args):
+    """在工作线程中执行任务函数：绑定 current_job 后以 fn(job, *args) 调用"""
+    token = current_job.set(job)
+    try:
+        return fn(job, *args)
+    finally:
+        current_job.reset(token)
+
+def start_job(pool, max_running, new_run_id, current_step, fn, *args):
+    """检查并发上限、注册任务并提交到线程池，三步在 jobs_lock 内一次完成
+
+    new_run_id 在通过检查后才被调用（创建运行目录等副作用不会发生在被拒绝的请求上）。
+    该线程池中运行的任务已达 max_running 时返回 None。
+    """
+    with jobs_lock:
+        running = sum(1 for state in jobs.values() if state.is_running and state.pool is pool)
+        if running >= max_running:
+            return None
+        job = create_job(new_run_id(), current_step)
+        job.pool = pool
+        job.future = pool.submit(run_job, job, fn, *args)
+    return job
+
+def get_job(run_id=None):
+    """获取任务状态：指定run_id时按ID查找（不存在返回None），否则返回当前活动任务"""
+    with jobs_lock:
+        if run_id:
+            return jobs.get(run_id)
+        return jobs.get(active_job_id, idle_job)
+
+def stop_job(run_id=None):
+    """停止任务：尚未开始执行的任务直接从线程池取消，执行中的任务由工作线程在下一个检查点退出"""
+    job = get_job(run_id)
+    if job:
+        job.cancel_event.set()
+        if job.future is None or job.future.cancel():
+            job.is_running = False
+            job.current_step = '已停止'
+        elif job.is_running:
+            job.current_step = '正在停止'
+
+# 等待推送到WebSocket的日志（由后台任务批量发送）；SimpleQueue入队无需额外加锁，日志调用方不会被socket发送阻塞
+pending_log_entries = queue.SimpleQueue()
+
+# 日志时间戳的秒级前缀缓存：(整秒时间, 格式化后的前缀)，整体替换以保证线程安全
+log_timestamp_cache = (None, '')
+
+def format_log_timestamp(created):
+    """将日志记录时间格式化为ISO字符串（毫秒精度），同一秒内复用已格式化的前缀"""
+    global log_timestamp_cache
+    second = int(created)
+    cached_second, prefix = log_timestamp_cache
+    if cached_second != second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+        log_timestamp_cache = (second, prefix)
+    return f"{prefix}.{int((created - second) * 1000):03d}"
 
 class WebSocketHandler(logging.Handler):
     """自定义日志处理器，将日志发送到WebSocket - 支持trace"""
@@ -52,13 +346,107 @@ class WebSocketHandler(logging.Handler):
         trace_id = getattr(record, 'trace_id', 'NO_TRACE')
         
         log_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': format_log_timestamp(record.created),
             'level': record.levelname,
             'message': self.format(record),
             'trace_id': trace_id
         }
-        building_status['logs'].append(log_entry)
-        socketio.emit('log_message', log_entry)
+        (current_job.get() or idle_job).logs.append(log_entry)
+        # 只入队，由 flush_log_entries 后台任务合并发送
+        pending_log_entries.put_nowait(log_entry)
+
+def flush_log_entries():
+    """后台任务：定期取出待发送的日志，合并为一个 log_batch 事件发送"""
+    while True:
+        socketio.sleep(LOG_FLUSH_INTERVAL)
+        while not pending_log_entries.empty():
+            batch = []
+            try:
+                while len(batch) < LOG_BATCH_SIZE:
+                    batch.append(pending_log_entries.get_nowait())
+            except queue.Empty:
+                pass
+            if batch:
+                try:
+                    socketio.emit('log_batch', batch)
+                except Exception:
+                    # 发送失败时丢弃该批日志，保证后台任务持续运行
+                    pass
+                # 让出执行权，避免大量积压时长时间占用事件循环
+                socketio.sleep(0)
+
+# 图更新合并发送：间隔内只发送每个任务每类事件的最新快照，按固定顺序发送（先完整图，后采样高亮）
+GRAPH_EMIT_INTERVAL = 0.1
+GRAPH_EVENTS = ('graph_update', 'sampled_graph_update')
+# run_id -> {事件名: 最新快照}，并发任务的快照互不覆盖
+pending_graph_updates = {}
+pending_graph_lock = Lock()
+
+def emit_graph_update(event, payload, run_id=None):
+    """记录最新的图快照（附带所属任务的 run_id，前端据此只渲染自己启动的任务），间隔结束后由后台任务统一发送"""
+    with pending_graph_lock:
+        schedule = not pending_graph_updates
+        pending_graph_updates.setdefault(run_id, {})[event] = {**payload, 'run_id': run_id}
+    if schedule:
+        socketio.start_background_task(flush_graph_updates)
+
+def flush_graph_updates():
+    """后台任务：等待合并间隔后发送期间最新的图快照"""
+    socketio.sleep(GRAPH_EMIT_INTERVAL)
+    send_pending_graph_updates()
+
+def send_pending_graph_updates():
+    """立即发送所有待发送的图快照（任务结束前调用，保证图更新先于完成事件到达）"""
+    with pending_graph_lock:
+        updates = dict(pending_graph_updates)
+        pending_graph_updates.clear()
+    for by_event in updates.values():
+        for event in GRAPH_EVENTS:
+            if event in by_event:
+                try:
+                    socketio.emit(event, by_event[event])
+                except Exception as e:
+                    logger.error(f"发送图更新失败: {e}")
+
+def emit_after_graph_updates(event, data):
+    """先发送积压的图更新再发送完成/错误事件，避免最后一次 graph_update 晚于完成事件到达前端"""
+    send_pending_graph_updates()
+    socketio.emit(event, data)
+
+# 任务进度合并发送：同一任务在间隔内只保留最新一条进度，批量以 <事件>_bulk 发送（最多约20次/秒）
+PROGRESS_EMIT_INTERVAL = 0.05
+pending_progress_updates = {}
+pending_progress_lock = Lock()
+
+def emit_progress(event, progress_data):
+    """记录任务进度，按 (run_id, task_id) 合并后由后台任务批量发送，并发任务的同名子任务互不覆盖"""
+    key = (progress_data.get('run_id'), progress_data.get('task_id'))
+    with pending_progress_lock:
+        schedule = not pending_progress_updates
+        pending_progress_updates.setdefault(event, {})[key] = progress_data
+    if schedule:
+        socketio.start_background_task(flush_progress_after_interval)
+
+def flush_progress_after_interval():
+    """后台任务：等待合并间隔后发送期间积累的进度"""
+    socketio.sleep(PROGRESS_EMIT_INTERVAL)
+    flush_progress_updates()
+
+def flush_progress_updates():
+    """立即发送所有待发送的进度（任务结束前调用，保证进度先于完成事件到达）"""
+    with pending_progress_lock:
+        updates = dict(pending_progress_updates)
+        pending_progress_updates.clear()
+    for event, by_task in updates.items():
+        try:
+            socketio.emit(f'{event}_bulk', list(by_task.values()))
+        except Exception as e:
+            logger.error(f"发送进度更新失败: {e}")
+
+def emit_after_progress(event, data):
+    """先发送积压的进度再发送完成/错误事件，避免进度晚于完成事件到达前端"""
+    flush_progress_updates()
+    socketio.emit(event, data)
 
 def setup_logging():
     """设置日志系统 - 带有trace支持"""
@@ -80,8 +468,9 @@ def setup_logging():
         trace_formatter = TraceFormatter('%(asctime)s [%(trace_id)s] - %(name)s - %(levelname)s - %(message)s')
         ws_handler.setFormatter(trace_formatter)
         
-        # 添加WebSocket处理器
+        # 添加WebSocket处理器，并启动日志批量推送任务
         root_logger.addHandler(ws_handler)
+        socketio.start_background_task(flush_log_entries)
     
     # 检查控制台处理器
     has_console_handler = any(isinstance(handler, logging.StreamHandler) and handler.stream == sys.stdout 
@@ -101,6 +490,70 @@ def setup_logging():
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# 统计JSONL记录数时每次读取的字节数
+LINE_COUNT_CHUNK_SIZE = 1 << 20
+# 换行后只含空白、紧接着又是换行的空行（前瞻不消耗换行符，连续空行逐个匹配）
+BLANK_LINE_PATTERN = re.compile(rb'\n[ \t\r\x0b\x0c]*(?=\n)')
+
+def count_jsonl_lines(filepath):
+    """统计JSONL文件的非空记录数：bytes.count 批量统计换行符，再减去空行/只含空白的行，不做逐行解码"""
+    newlines = 0
+    blank_lines = 0
+    # 当前尚未结束的行到目前为止是否只含空白（跨块的行据此判断）
+    pending_blank = True
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        while True:
+            chunk = os.read(fd, LINE_COUNT_CHUNK_SIZE)
+            if not chunk:
+                break
+            first = chunk.find(b'\n')
+            if first == -1:
+                # 整块都属于同一行
+                pending_blank = pending_blank and not chunk.strip()
+                continue
+            newlines += chunk.count(b'\n')
+            # 跨块的行在本块第一个换行处结束
+            if pending_blank and not chunk[:first].strip():
+                blank_lines += 1
+            # 块内的空行只有匹配到的才会产生Python对象
+            blank_lines += sum(1 for _ in BLANK_LINE_PATTERN.finditer(chunk, first))
+            pending_blank = not chunk[chunk.rfind(b'\n') + 1:].strip()
+    finally:
+        os.close(fd)
+    # 最后一行没有换行符且不为空时也计为一条记录
+    return newlines - blank_lines + (0 if pending_blank else 1)
+
+@lru_cache(maxsize=1024)
+def count_jsonl_records(filepath, mtime, size):
+    """统计JSONL文件的记录数（与评测任务总数共用 count_jsonl_lines，跳过空行），按 (路径, 修改时间, 大小) 缓存，文件未变化时不再重复读取"""
+    return count_jsonl_lines(filepath)
+
+# 直接在原始字节中匹配 "entity" 字段，避免为取一个字段而解析整行JSON
+ENTITY_FIELD_PATTERN = re.compile(rb'"entity"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def load_completed_entities(filepath):
+    """读取已生成的JSONL文件，返回其中已完成的实体集合（frozenset，用于断点续传）"""
+    completed_entities = set()
+    with open(filepath, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            match = ENTITY_FIELD_PATTERN.search(line)
+            if match:
+                raw_entity = match.group(1)
+                # 含转义字符时交给JSON解析器还原
+                if b'\\' in raw_entity:
+                    entity = json_loads(b'"' + raw_entity + b'"')
+                else:
+                    entity = raw_entity.decode('utf-8')
+            else:
+                # 正则未命中（如字段不是字符串）时回退到完整解析
+                entity = json_loads(line).get('entity', '')
+            if entity:
+                completed_entities.add(entity)
+    return frozenset(completed_entities)
+
 @app.route('/')
 def index():
     """主页导航"""
@@ -154,46 +607,36 @@ def start_building():
     trace_id = start_trace(prefix="web")
     logger.info(f"开始构建知识图谱请求")
     
-    if building_status['is_running']:
-        return jsonify({'error': '系统正在运行中'}), 400
-    
-    data = request.json
+    data = get_request_json()
+    if data is None:
+        return invalid_json_response()
     entity = data.get('entity', '蚂蚁集团')
     max_nodes = data.get('max_nodes', 200)
     max_iterations = data.get('max_iterations', 10)
     sample_size = data.get('sample_size', 12)
     sampling_algorithm = data.get('sampling_algorithm', 'mixed')
     
-    # 创建运行管理器
+    # 创建运行管理器，注册任务并提交到构建线程池运行
     run_manager = RunManager()
-    run_id = run_manager.create_new_run(f"kg_build_{entity}")
-    
-    # 重置状态
-    building_status['is_running'] = True
-    building_status['current_step'] = '初始化'
-    building_status['progress'] = 0
-    building_status['graph_data'] = {'nodes': [], 'links': []}
-    building_status['logs'] = []
-    building_status['run_id'] = run_id
-    building_status['qa_result'] = None
-    
-    # 在新线程中运行构建过程
-    thread = threading.Thread(target=run_building_process, args=(entity, max_nodes, sample_size, run_manager, max_iterations, sampling_algorithm))
-    thread.daemon = True
-    thread.start()
+    job = start_job(BUILD_POOL, BUILD_WORKERS, partial(run_manager.create_new_run, f"kg_build_{entity}"), '初始化',
+                    run_building_process, entity, max_nodes, sample_size, run_manager, max_iterations, sampling_algorithm)
+    if job is None:
+        return jsonify({'error': '系统正在运行中'}), 400
     
-    return jsonify({'message': '开始构建知识图谱', 'entity': entity, 'run_id': run_id})
+    return jsonify({'message': '开始构建知识图谱', 'entity': entity, 'run_id': job.run_id})
 
 @app.route('/api/status')
 def get_status():
-    """获取构建状态"""
-    return jsonify(building_status)
+    """获取构建状态（可通过 run_id 参数查询指定任务，默认返回当前任务）"""
+    job = get_job(request.args.get('run_id'))
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    return jsonify(job.to_dict())
 
 @app.route('/api/stop_building', methods=['POST'])
 def stop_building():
     """停止构建"""
-    building_status['is_running'] = False
-    building_status['current_step'] = '已停止'
+    stop_job((get_request_json() or {}).get('run_id'))
     return jsonify({'message': '已停止构建'})
 
 @app.route('/api/generate/single', methods=['POST'])
@@ -205,69 +648,46 @@ def generate_single():
     trace_id = start_trace(prefix="single")
     logger.info(f"接收单条QA生成请求")
     
-    if building_status['is_running']:
-        return jsonify({'error': '系统正在运行中'}), 400
-    
-    data = request.json
+    data = get_request_json()
+    if data is None:
+        return invalid_json_response()
     entity = data.get('entity', '量子计算机')
     sampling_algorithm = data.get('sampling_algorithm', 'mixed')
     
     logger.info(f"单条QA生成参数: 实体={entity}, 采样算法={sampling_algorithm}")
     
-    # 创建运行管理器
+    # 创建运行管理器，注册任务并提交到构建线程池运行
     run_manager = RunManager()
-    run_id = run_manager.create_new_run(f"single_{entity}")
-    
-    # 重置状态
-    building_status['is_running'] = True
-    building_status['current_step'] = '初始化'
-    building_status['progress'] = 0
-    building_status['graph_data'] = {'nodes': [], 'links': []}
-    building_status['logs'] = []
-    building_status['run_id'] = run_id
-    building_status['qa_result'] = None
-    
-    # 在新线程中运行构建过程
-    thread = threading.Thread(target=run_building_process, args=(entity, 30, 8, run_manager, 3, sampling_algorithm))
-    thread.daemon = True
-    thread.start()
+    job = start_job(BUILD_POOL, BUILD_WORKERS, partial(run_manager.create_new_run, f"single_{entity}"), '初始化',
+                    run_building_process, entity, 30, 8, run_manager, 3, sampling_algorithm)
+    if job is None:
+        return jsonify({'error': '系统正在运行中'}), 400
     
-    return jsonify({'job_id': run_id})
+    return jsonify({'job_id': job.run_id})
 
 @app.route('/api/generate/batch', methods=['POST'])
 def generate_batch():
     """批量生成接口 - 按研发计划设计"""
-    if building_status['is_running']:
-        return jsonify({'error': '系统正在运行中'}), 400
-    
-    data = request.json
+    data = get_request_json()
+    if data is None:
+        return invalid_json_response()
     entities = data.get('entities', ['量子计算机', '人工智能', '基因编辑'])
     
-    # 创建运行管理器
+    # 创建运行管理器，注册任务并提交到构建线程池运行批量构建过程
     run_manager = RunManager()
-    run_id = run_manager.create_new_run(f"batch_{len(entities)}_entities")
-    
-    # 重置状态
-    building_status['is_running'] = True
-    building_status['current_step'] = '批量初始化'
-    building_status['progress'] = 0
-    building_status['graph_data'] = {'nodes': [], 'links': []}
-    building_status['logs'] = []
-    building_status['run_id'] = run_id
-    building_status['qa_result'] = None
-    
-    # 在新线程中运行批量构建过程
-    thread = threading.Thread(target=run_batch_building_process, args=(entities, run_manager))
-    thread.daemon = True
-    thread.start()
+    job = start_job(BUILD_POOL, BUILD_WORKERS, partial(run_manager.create_new_run, f"batch_{len(entities)}_entities"), '批量初始化',
+                    run_batch_building_process, entities, run_manager)
+    if job is None:
+        return jsonify({'error': '系统正在运行中'}), 400
     
-    return jsonify({'batch_job_id': run_id})
+    return jsonify({'batch_job_id': job.run_id})
 
 @app.route('/api/qa/<job_id>')
 def get_qa_result(job_id):
     """获取QA生成结果"""
-    if building_status['run_id'] == job_id and building_status['qa_result']:
-        return jsonify(building_status['qa_result'])
+    job = get_job(job_id)
+    if job and job.qa_result:
+        return jsonify(job.qa_result)
     
     # 如果没有找到结果，返回默认消息
     return jsonify({
@@ -277,11 +697,50 @@ def get_qa_result(job_id):
 
 # 批量生成相关API
 # 实体集管理API
+
+# 实体集列表缓存：元数据文件的 (文件名, 修改时间, 大小) 指纹不变时直接返回缓存结果
+entity_sets_cache = {'fingerprint': None, 'data': []}
+
+def invalidate_entity_sets_cache():
+    """实体集发生增删改后清除列表缓存"""
+    entity_sets_cache['fingerprint'] = None
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def iter_upload_lines(stream, chunk_size=UPLOAD_CHUNK_SIZE):
+    """按固定大小分块读取上传流并逐行产出bytes（不含换行符），内存占用与块大小相关而非文件大小"""
+    buf = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        lines = buf.split(b'\n')
+        buf = lines.pop()
+        yield from lines
+    if buf:
+        yield buf
+
+def write_entity_set_csv(csv_path, entities):
+    """将实体列表写入单列CSV文件（带 entity 表头）"""
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        # 实体中没有需要转义的字符时直接拼接写入，输出与csv.writer一致（\r\n换行）
+        if all(isinstance(e, str) and e and not any(c in e for c in '",\r\n') for e in entities):
+            f.write('entity\r\n')
+            f.write('\r\n'.join(entities))
+            f.write('\r\n')
+        else:
+            writer = csv.writer(f)
+            writer.writerow(['entity'])  # 头部
+            writer.writerows([entity] for entity in entities)
+
 @app.route('/api/entity_sets/save', methods=['POST'])
 def save_entity_set():
     """保存实体集"""
     try:
-        data = request.json
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         name = data.get('name', '').strip()
         entities = data.get('entities', [])
         import_method = data.get('import_method', 'manual_newline')
@@ -298,11 +757,7 @@ def save_entity_set():
         
         # 保存为CSV文件
         csv_path = os.path.join(entity_sets_dir, f"{name}.csv")
-        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['entity'])  # 头部
-            for entity in entities:
-                writer.writerow([entity])
+        write_entity_set_csv(csv_path, entities)
         
         # 保存元数据
         metadata = {
@@ -315,8 +770,9 @@ def save_entity_set():
         
         metadata_path = os.path.join(entity_sets_dir, f"{name}.json")
         with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+            f.write(json_dumps(metadata, indent=True))
         
+        invalidate_entity_sets_cache()
         logger.info(f"实体集 '{name}' 保存成功，共{len(entities)}个实体")
         
         return jsonify({
@@ -349,25 +805,32 @@ def upload_entity_set():
         entity_sets_dir = "evaluation_data/entity_sets"
         os.makedirs(entity_sets_dir, exist_ok=True)
         
-        # 读取CSV文件
-        stream = io.StringIO(file.stream.read().decode("utf-8"))
-        reader = csv.reader(stream)
+        # 分块读取CSV文件：只取第一列，且非空；跳过 entity 表头
+        stream = file.stream
+        head = stream.read(8192)
+        stream.seek(0)
+        if b'"' in head:
+            # 含引号字段时交给csv模块解析（字段内可能包含逗号或换行）
+            text_stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+            first_column = [row[0] for row in csv.reader(text_stream) if row]
+            text_stream.detach()
+        else:
+            first_column = (line.split(b',', 1)[0].decode('utf-8') for line in iter_upload_lines(stream))
         
         entities = []
-        for row in reader:
-            if row and row[0].strip():  # 只取第一列，且非空
-                entities.append(row[0].strip())
+        for value in first_column:
+            value = value.strip()
+            if value:
+                entities.append(value)
+        if entities and entities[0].lower() == 'entity':
+            entities = entities[1:]
         
         if not entities:
             return jsonify({'error': 'CSV文件中没有有效的实体数据'}), 400
         
         # 保存为CSV文件
         csv_path = os.path.join(entity_sets_dir, f"{name}.csv")
-        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['entity'])  # 头部
-            for entity in entities:
-                writer.writerow([entity])
+        write_entity_set_csv(csv_path, entities)
         
         # 保存元数据
         metadata = {
@@ -380,8 +843,9 @@ def upload_entity_set():
         
         metadata_path = os.path.join(entity_sets_dir, f"{name}.json")
         with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+            f.write(json_dumps(metadata, indent=True))
         
+        invalidate_entity_sets_cache()
         logger.info(f"实体集 '{name}' 上传保存成功，共{len(entities)}个实体")
         
         return jsonify({
@@ -403,19 +867,33 @@ def list_entity_sets():
         if not os.path.exists(entity_sets_dir):
             return jsonify({'success': True, 'entity_sets': []})
         
-        entity_sets = []
-        for file in os.listdir(entity_sets_dir):
-            if file.endswith('.json'):
+        # scandir 返回的条目自带stat信息，只用于计算目录指纹
+        metadata_entries = []
+        with os.scandir(entity_sets_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    metadata_entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        metadata_entries.sort()
+        fingerprint = tuple(metadata_entries)
+        
+        if entity_sets_cache['fingerprint'] == fingerprint:
+            entity_sets = entity_sets_cache['data']
+        else:
+            entity_sets = []
+            for file, _, _ in metadata_entries:
                 try:
                     metadata_path = os.path.join(entity_sets_dir, file)
-                    with open(metadata_path, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
+                    with open(metadata_path, 'rb') as f:
+                        metadata = json_loads(f.read())
                     entity_sets.append(metadata)
                 except Exception as e:
                     logger.warning(f"读取元数据文件失败: {file}, 错误: {e}")
-        
-        # 按创建时间排序
-        entity_sets.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+            
+            # 按创建时间排序
+            entity_sets.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+            entity_sets_cache['fingerprint'] = fingerprint
+            entity_sets_cache['data'] = entity_sets
         
         return jsonify({
             'success': True,
@@ -437,7 +915,7 @@ def get_entity_set_info(name):
             return jsonify({'error': '实体集不存在'}), 404
         
         with open(metadata_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+            metadata = json_loads(f.read())
         
         return jsonify({
             'success': True,
@@ -464,6 +942,7 @@ def delete_entity_set(name):
         if os.path.exists(metadata_path):
             os.remove(metadata_path)
         
+        invalidate_entity_sets_cache()
         logger.info(f"实体集 '{name}' 删除成功")
         
         return jsonify({
@@ -475,42 +954,62 @@ def delete_entity_set(name):
         logger.error(f"删除实体集失败: {e}")
         return jsonify({'error': f'删除失败: {str(e)}'}), 500
 
+# 数据管理页面可选的数据目录
+DATA_DIRECTORIES = (
+    {
+        'path': 'evaluation_data/generated_datasets',
+        'name': '生成数据集',
+        'description': '批量生成的QA数据集'
+    },
+    {
+        'path': 'evaluation_data/final_datasets',
+        'name': '最终数据集',
+        'description': '最终版本的数据集'
+    },
+    {
+        'path': 'evaluation_data/final_datasets/label_datasets',
+        'name': '标签数据集',
+        'description': '带领域标签的数据集'
+    }
+)
+
+# 目录列表响应缓存：各目录修改时间不变（没有文件增删）时直接返回预先序列化的响应体
+data_directories_cache = {'fingerprint': None, 'body': None}
+
 @app.route('/api/data_management/directories')
 def list_data_directories():
     """获取可用的数据目录列表"""
     try:
-        directories = [
-            {
-                'path': 'evaluation_data/generated_datasets',
-                'name': '生成数据集',
-                'description': '批量生成的QA数据集'
-            },
-            {
-                'path': 'evaluation_data/final_datasets',
-                'name': '最终数据集', 
-                'description': '最终版本的数据集'
-            },
-            {
-                'path': 'evaluation_data/final_datasets/label_datasets',
-                'name': '标签数据集',
-                'description': '带领域标签的数据集'
-            }
-        ]
+        fingerprint = []
+        for dir_info in DATA_DIRECTORIES:
+            try:
+                fingerprint.append(os.stat(dir_info['path']).st_mtime_ns)
+            except FileNotFoundError:
+                fingerprint.append(None)
+        fingerprint = tuple(fingerprint)
+        
+        if data_directories_cache['fingerprint'] == fingerprint:
+            return Response(data_directories_cache['body'], mimetype='application/json')
         
         # 检查目录是否存在并添加文件统计
         available_dirs = []
-        for dir_info in directories:
-            if os.path.exists(dir_info['path']):
-                # 统计JSONL文件数量
-                file_count = sum(1 for f in os.listdir(dir_info['path']) 
-                               if f.endswith('.jsonl'))
-                dir_info['file_count'] = file_count
-                available_dirs.append(dir_info)
+        for dir_info in DATA_DIRECTORIES:
+            # 直接scandir，目录不存在时跳过（省去单独的exists检查）
+            try:
+                with os.scandir(dir_info['path']) as it:
+                    # 统计JSONL文件数量
+                    file_count = sum(1 for entry in it if entry.name.endswith('.jsonl'))
+            except FileNotFoundError:
+                continue
+            available_dirs.append({**dir_info, 'file_count': file_count})
         
-        return jsonify({
+        body = json_dumps({
             'success': True,
             'directories': available_dirs
         })
+        data_directories_cache['body'] = body
+        data_directories_cache['fingerprint'] = fingerprint
+        return Response(body, mimetype='application/json')
         
     except Exception as e:
         logger.error(f"获取目录列表失败: {e}")
@@ -531,18 +1030,18 @@ def list_directory_files():
             return jsonify({'success': False, 'error': '目录不存在'}), 404
         
         files = []
-        for filename in os.listdir(directory):
-            if filename.endswith('.jsonl'):
-                filepath = os.path.join(directory, filename)
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.jsonl'):
+                    continue
+                filename = entry.name
                 try:
-                    # 获取文件信息
-                    stat = os.stat(filepath)
-                    modified_time = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+                    # 获取文件信息（scandir条目自带stat信息）
+                    stat = entry.stat()
+                    modified_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stat.st_mtime))
                     
-                    # 计算记录数
-                    count = 0
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        count = sum(1 for line in f if line.strip())
+                    # 计算记录数（文件未变化时使用缓存）
+                    count = count_jsonl_records(entry.path, stat.st_mtime, stat.st_size)
                     
                     files.append({
                         'filename': filename,
@@ -580,10 +1079,9 @@ def start_batch_generation():
     trace_id = start_trace(prefix="batch")
     logger.info(f"接收批量生成请求")
     
-    if building_status['is_running']:
-        return jsonify({'error': '系统正在运行中'}), 400
-    
-    data = request.json
+    data = get_request_json()
+    if data is None:
+        return invalid_json_response()
     entity_set_name = data.get('entity_set', '')
     
     if not entity_set_name:
@@ -597,12 +1095,14 @@ def start_batch_generation():
         if not os.path.exists(csv_path):
             return jsonify({'error': '实体集不存在'}), 404
         
+        # 实体名会在整个生成任务期间被反复哈希比较，驻留后相同名称共享同一对象
         entities = []
         with open(csv_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                if row.get('entity', '').strip():
-                    entities.append(row['entity'].strip())
+                entity = row.get('entity', '').strip()
+                if entity:
+                    entities.append(sys.intern(entity))
         
         if not entities:
             return jsonify({'error': '实体集为空'}), 400
@@ -615,15 +1115,8 @@ def start_batch_generation():
             
             if os.path.exists(resume_filepath):
                 # 读取已完成的实体
-                completed_entities = set()
                 try:
-                    with open(resume_filepath, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            if line.strip():
-                                line_data = json.loads(line.strip())
-                                entity = line_data.get('entity', '')
-                                if entity:
-                                    completed_entities.add(entity)
+                    completed_entities = load_completed_entities(resume_filepath)
                     
                     # 过滤掉已完成的实体
                     original_count = len(entities)
@@ -652,23 +1145,15 @@ def start_batch_generation():
         count = len(entities)
         logger.info(f"接收到批量生成请求，实体集: {entity_set_name}，实体数量: {count}")
         
-        # 创建运行管理器
+        # 创建运行管理器，注册任务并提交到构建线程池运行批量生成
         run_manager = RunManager()
-        batch_id = run_manager.create_new_run(f"batch_generation_{entity_set_name}_{count}")
-        
-        # 重置状态
-        building_status['is_running'] = True
-        building_status['current_step'] = '批量生成初始化'
-        building_status['progress'] = 0
-        building_status['run_id'] = batch_id
-        
-        # 在新线程中运行批量生成
-        thread = threading.Thread(target=run_batch_generation_process, args=(data, run_manager))
-        thread.daemon = True
-        thread.start()
+        job = start_job(BUILD_POOL, BUILD_WORKERS, partial(run_manager.create_new_run, f"batch_generation_{entity_set_name}_{count}"),
+                        '批量生成初始化', run_batch_generation_process, data, run_manager)
+        if job is None:
+            return jsonify({'error': '系统正在运行中'}), 400
         
         return jsonify({
-            'batch_id': batch_id, 
+            'batch_id': job.run_id, 
             'message': '批量生成已开始',
             'count': count
         })
@@ -679,15 +1164,24 @@ def start_batch_generation():
 
 @app.route('/api/batch_generation/stop', methods=['POST'])
 def stop_batch_generation():
-    """停止批量生成"""
-    building_status['is_running'] = False
-    building_status['current_step'] = '已停止'
+    """停止批量生成（前端以 batch_id 指定要停止的任务）"""
+    data = get_request_json() or {}
+    stop_job(data.get('run_id') or data.get('batch_id'))
     return jsonify({'message': '批量生成已停止'})
 
+# 预览用的模拟WikiData实体
+PREVIEW_SAMPLE_ENTITIES = (
+    '量子计算机', '人工智能', '基因编辑', '脑机接口', '纳米材料',
+    '区块链', '虚拟现实', '增强现实', '物联网', '5G通信',
+    '太阳能电池', '电动汽车', '自动驾驶', '机器学习', '深度学习'
+)
+
 @app.route('/api/preview_entities', methods=['POST'])
 def preview_entities():
     """预览实体"""
-    data = request.json
+    data = get_request_json()
+    if data is None:
+        return invalid_json_response()
     source = data.get('source', 'wikidata')
     count = data.get('count', 10)
     category = data.get('category', '')
@@ -695,13 +1189,7 @@ def preview_entities():
     # 这里可以实现不同数据源的预览逻辑
     if source == 'wikidata':
         # 模拟WikiData实体
-        sample_entities = [
-            '量子计算机', '人工智能', '基因编辑', '脑机接口', '纳米材料',
-            '区块链', '虚拟现实', '增强现实', '物联网', '5G通信',
-            '太阳能电池', '电动汽车', '自动驾驶', '机器学习', '深度学习'
-        ]
-        import random
-        entities = random.sample(sample_entities, min(count, len(sample_entities)))
+        entities = random.sample(PREVIEW_SAMPLE_ENTITIES, min(count, len(PREVIEW_SAMPLE_ENTITIES)))
         return jsonify({'entities': entities})
     
     return jsonify({'entities': []})
@@ -717,30 +1205,37 @@ def list_evaluation_data():
     def scan_dataset_directory(directory):
         """扫描数据集目录，返回jsonl文件列表"""
         datasets = []
-        if os.path.exists(directory):
-            for filename in os.listdir(directory):
-                if filename.endswith('.jsonl') and not filename.startswith('.'):
-                    filepath = os.path.join(directory, filename)
-                    try:
-                        # 计算文件中的行数（QA对数量）
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            count = sum(1 for line in f if line.strip())
-                        
-                        # 获取文件创建时间
-                        created_at = datetime.fromtimestamp(os.path.getctime(filepath)).strftime('%Y-%m-%d')
-                        
-                        # 去掉.jsonl后缀作为展示名称
-                        display_name = filename.replace('.jsonl', '')
-                        
-                        datasets.append({
-                            'id': filename,  # 使用完整文件名作为ID
-                            'name': display_name,  # 展示名称去掉后缀
-                            'count': count,
-                            'created_at': created_at
-                        })
-                    except Exception as e:
-                        logger.error(f"读取数据集文件 {filename} 失败: {e}")
-                        continue
+        try:
+            with os.scandir(directory) as it:
+                entries = [entry for entry in it
+                           if entry.name.endswith('.jsonl') and not entry.name.startswith('.')]
+        except FileNotFoundError:
+            return datasets
+        
+        for entry in entries:
+            filename = entry.name
+            try:
+                # 一次stat同时得到修改时间、大小和创建时间
+                stat = entry.stat()
+                
+                # 计算文件中的行数（QA对数量，文件未变化时使用缓存）
+                count = count_jsonl_records(entry.path, stat.st_mtime, stat.st_size)
+                
+                # 获取文件创建时间
+                created_at = time.strftime('%Y-%m-%d', time.localtime(stat.st_ctime))
+                
+                # 去掉.jsonl后缀作为展示名称
+                display_name = filename.replace('.jsonl', '')
+                
+                datasets.append({
+                    'id': filename,  # 使用完整文件名作为ID
+                    'name': display_name,  # 展示名称去掉后缀
+                    'count': count,
+                    'created_at': created_at
+                })
+            except Exception as e:
+                logger.error(f"读取数据集文件 {filename} 失败: {e}")
+                continue
         return datasets
     
     # 扫描标准数据集和生成数据集目录
@@ -776,47 +1271,64 @@ def get_evaluation_data_details(dataset_id):
         return jsonify({'error': 'Dataset not found'}), 404
     
     try:
-        # 读取jsonl文件
-        qa_pairs = []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                if line.strip():
-                    try:
-                        qa_pair = json.loads(line)
-                        qa_pairs.append({
-                            'line_num': line_num,
-                            'question': qa_pair.get('question', ''),
-                            'answer': qa_pair.get('answer', ''),
-                            'metadata': {k: v for k, v in qa_pair.items() if k not in ['question', 'answer']}
-                        })
-                    except json.JSONDecodeError as e:
-                        logger.error(f"解析第 {line_num} 行JSON失败: {e}")
-                        continue
-        
         # 获取文件信息
         file_stats = os.stat(filepath)
-        created_at = datetime.fromtimestamp(file_stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
-        modified_at = datetime.fromtimestamp(file_stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        created_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(file_stats.st_ctime))
+        modified_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(file_stats.st_mtime))
         
-        return jsonify({
+        header = json_dumps({
             'id': dataset_id,
             'name': dataset_id.replace('.jsonl', ''),
             'type': dataset_type,
-            'count': len(qa_pairs),
             'created_at': created_at,
             'modified_at': modified_at,
-            'data': qa_pairs,
             'evaluation_history': []  # TODO: 实现评测历史记录
         })
-        
+        # 在开始流式响应前打开文件，文件无法读取时仍能返回500
+        dataset_file = open(filepath, 'rb')
     except Exception as e:
         logger.error(f"读取数据集详情失败: {e}")
         return jsonify({'error': 'Failed to read dataset'}), 500
+    
+    def generate():
+        """逐行读取jsonl文件并流式输出JSON，不在内存中保留整个数据集
+
+        字段与一次性返回时相同，只是 count 在 data 之后输出（读完才知道记录数）。
+        读取中途出错时不再输出结尾，响应不是完整的JSON，客户端解析失败而不会把部分数据当作完整数据集。
+        """
+        yield header[:-1] + ',"data":['
+        count = 0
+        try:
+            with dataset_file as f:
+                for line_num, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        qa_pair = json_loads(line)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"解析第 {line_num} 行JSON失败: {e}")
+                        continue
+                    item = json_dumps({
+                        'line_num': line_num,
+                        'question': qa_pair.pop('question', ''),
+                        'answer': qa_pair.pop('answer', ''),
+                        'metadata': qa_pair
+                    })
+                    yield item if count == 0 else ',' + item
+                    count += 1
+        except Exception as e:
+            logger.error(f"读取数据集详情失败: {e}")
+            return
+        yield f'],"count":{count}}}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/api/evaluation_data/save', methods=['POST'])
 def save_evaluation_data():
     """保存评测数据"""
-    data = request.json
+    data = get_request_json()
+    if data is None:
+        return invalid_json_response()
     name = data.get('name')
     data_type = data.get('type', 'generated')
     qa_data = data.get('data', [])
@@ -863,7 +1375,7 @@ def save_evaluation_data():
                         **qa_item.get('metadata', {})
                     }
                 
-                f.write(json.dumps(line_data, ensure_ascii=False) + '\n')
+                f.write(json_dumps(line_data) + '\n')
         
         return jsonify({'success': True, 'filepath': filepath, 'filename': filename})
     except Exception as e:
@@ -879,28 +1391,74 @@ def upload_evaluation_data():
     if file.filename == '':
         return jsonify({'success': False, 'error': '文件名为空'})
     
+    upload_dir = "evaluation_data/uploaded_datasets"
+    filename = f"upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
+    filepath = os.path.join(upload_dir, filename)
+    part_path = filepath + '.part'
+    
     try:
-        # 读取文件内容
-        content = file.read().decode('utf-8')
-        
-        # 解析JSON
-        data = json.loads(content)
-        
-        # 保存文件
-        import os
-        upload_dir = "evaluation_data/uploaded_datasets"
         os.makedirs(upload_dir, exist_ok=True)
         
-        filename = f"upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-        filepath = os.path.join(upload_dir, filename)
+        # 边分块写入临时文件边校验，校验通过后再改名为正式文件
+        with open(part_path, 'wb') as f:
+            if file.filename.endswith('.jsonl'):
+                # JSONL逐行校验，遇到无效行立即失败
+                for line_num, line in enumerate(iter_upload_lines(file.stream), 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        json_loads(line)
+                    except ValueError as e:
+                        raise ValueError(f"第{line_num}行不是有效的JSON: {e}")
+                    f.write(line.rstrip(b'\r'))
+                    f.write(b'\n')
+            else:
+                while True:
+                    chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if not file.filename.endswith('.jsonl'):
+            # 整体JSON需要完整解析才能校验，原样保存上传内容，不再重新序列化
+            with open(part_path, 'rb') as f:
+                json_loads(f.read())
         
+        os.replace(part_path, filepath)
         return jsonify({'success': True, 'filepath': filepath})
     except Exception as e:
+        if os.path.exists(part_path):
+            os.remove(part_path)
         return jsonify({'success': False, 'error': str(e)})
 
+# 评测数据集所在目录，按查找优先级排列
+DATASET_DIRS = ('evaluation_data/standard_datasets', 'evaluation_data/generated_datasets')
+# 数据集目录文件名索引：目录 -> (修改时间, 文件名集合)，目录未变化时直接在内存中查找
+dataset_dir_index = {}
+
+def resolve_dataset_path(dataset_id):
+    """按优先级在数据集目录中查找数据集文件，返回路径，找不到时返回None"""
+    if not dataset_id:
+        return None
+    for dataset_dir in DATASET_DIRS:
+        if '/' in dataset_id or os.sep in dataset_id:
+            # 子目录中的数据集不在索引内，直接检查
+            path = os.path.join(dataset_dir, dataset_id)
+            if os.path.exists(path):
+                return path
+            continue
+        try:
+            mtime = os.stat(dataset_dir).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        cached = dataset_dir_index.get(dataset_dir)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, frozenset(os.listdir(dataset_dir)))
+            dataset_dir_index[dataset_dir] = cached
+        if dataset_id in cached[1]:
+            return os.path.join(dataset_dir, dataset_id)
+    return None
+
 # 评测执行API
 @app.route('/api/evaluation/start', methods=['POST'])
 def start_evaluation():
@@ -910,7 +1468,9 @@ def start_evaluation():
     # 启动trace
     trace_id = start_trace(prefix="eval")
     
-    data = request.json
+    data = get_request_json()
+    if data is None:
+        return invalid_json_response()
     dataset_id = data.get('dataset_id')
     evaluator_type = data.get('evaluator_type', 'reasoning_model')
     model_name = data.get('model_name', 'gpt-4')
@@ -918,32 +1478,23 @@ def start_evaluation():
     logger.info(f"开始评测，数据集: {dataset_id}, 评测器: {evaluator_type}")
     
     # 创建评测任务
-    evaluation_id = f"eval_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    evaluation_id = make_task_id('eval')
     
     # 计算总任务数
     total_tasks = 0
     try:
         # 确定数据集文件路径
-        standard_path = f'evaluation_data/standard_datasets/{dataset_id}'
-        generated_path = f'evaluation_data/generated_datasets/{dataset_id}'
-        
-        dataset_path = None
-        if os.path.exists(standard_path):
-            dataset_path = standard_path
-        elif os.path.exists(generated_path):
-            dataset_path = generated_path
-        
+        dataset_path = resolve_dataset_path(dataset_id)
         if dataset_path:
-            with open(dataset_path, 'r', encoding='utf-8') as f:
-                total_tasks = sum(1 for line in f if line.strip())
+            total_tasks = count_jsonl_lines(dataset_path)
     except Exception as e:
         logger.error(f"计算任务总数失败: {e}")
         total_tasks = 0
     
-    # 在新线程中运行评测
-    thread = threading.Thread(target=run_evaluation_process, args=(evaluation_id, data))
-    thread.daemon = True
-    thread.start()
+    # 注册任务并提交到评测线程池运行
+    job = start_job(EVAL_POOL, EVAL_WORKERS, lambda: evaluation_id, '评测初始化', run_evaluation_process, data)
+    if job is None:
+        return jsonify({'error': '系统正在运行中'}), 400
     
     return jsonify({
         'evaluation_id': evaluation_id, 
@@ -953,8 +1504,16 @@ def start_evaluation():
 
 @app.route('/api/evaluation/stop', methods=['POST'])
 def stop_evaluation():
-    """停止评测"""
-    # 这里应该停止正在运行的评测
+    """停止评测（未指定 run_id 时停止所有运行中的评测任务）"""
+    run_id = (get_request_json() or {}).get('run_id')
+    if run_id:
+        stop_job(run_id)
+    else:
+        with jobs_lock:
+            evaluation_ids = [job_id for job_id, job in jobs.items()
+                              if job.is_running and job_id.startswith('eval_')]
+        for job_id in evaluation_ids:
+            stop_job(job_id)
     return jsonify({'message': '评测已停止'})
 
 # 对比评测相关API
@@ -967,34 +1526,28 @@ def start_comparison():
     trace_id = start_trace(prefix="comp")
     logger.info(f"接收对比评测请求")
     
-    if building_status['is_running']:
-        return jsonify({'error': '系统正在运行中'}), 400
-    
-    data = request.json
+    data = get_request_json()
+    if data is None:
+        return invalid_json_response()
     
     # 验证必要参数
-    if not data.get('datasetA') or not data.get('datasetB'):
+    dataset_a = data.get('datasetA')
+    dataset_b = data.get('datasetB')
+    if not dataset_a or not dataset_b:
         return jsonify({'error': '请选择两个数据文件'}), 400
     
-    if data.get('datasetA', {}).get('id') == data.get('datasetB', {}).get('id'):
+    if dataset_a.get('id') == dataset_b.get('id'):
         return jsonify({'error': '不能选择相同的数据文件'}), 400
     
     try:
-        # 创建对比评测ID
-        comparison_id = f"comp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        # 重置状态
-        building_status['is_running'] = True
-        building_status['current_step'] = '对比评测初始化'
-        building_status['progress'] = 0
-        building_status['run_id'] = comparison_id
-        
-        logger.info(f"开始对比评测: {data.get('datasetA', {}).get('name')} vs {data.get('datasetB', {}).get('name')}")
+        # 创建对比评测ID，注册任务并提交到评测线程池运行对比评测
+        comparison_id = make_task_id('comp')
+        job = start_job(EVAL_POOL, EVAL_WORKERS, lambda: comparison_id, '对比评测初始化',
+                        run_comparison_process, data)
+        if job is None:
+            return jsonify({'error': '系统正在运行中'}), 400
         
-        # 在新线程中运行对比评测
-        thread = threading.Thread(target=run_comparison_process, args=(comparison_id, data))
-        thread.daemon = True
-        thread.start()
+        logger.info(f"开始对比评测: {dataset_a.get('name')} vs {dataset_b.get('name')}")
         
         return jsonify({
             'comparison_id': comparison_id,
@@ -1003,23 +1556,26 @@ def start_comparison():
         
     except Exception as e:
         logger.error(f"启动对比评测失败: {e}")
-        building_status['is_running'] = False
+        stop_job(comparison_id)
         return jsonify({'error': f'启动失败: {str(e)}'}), 500
 
 @app.route('/api/comparison/stop', methods=['POST'])
 def stop_comparison():
     """停止对比评测"""
-    building_status['is_running'] = False
-    building_status['current_step'] = '已停止'
+    stop_job((get_request_json() or {}).get('run_id'))
     return jsonify({'message': '对比评测已停止'})
 
+@lru_cache(maxsize=1)
+def get_comparison_evaluator():
+    """供历史/详情查询复用的对比评测器（只读取结果文件；执行评测时另建实例）"""
+    from lib.comparison_evaluator import ComparisonEvaluator
+    return ComparisonEvaluator()
+
 @app.route('/api/comparison/history')
 def get_comparison_history():
     """获取对比评测历史记录"""
     try:
-        from lib.comparison_evaluator import ComparisonEvaluator
-        evaluator = ComparisonEvaluator()
-        history = evaluator.get_comparison_history()
+        history = get_comparison_evaluator().get_comparison_history()
         
         return jsonify({
             'success': True,
@@ -1037,9 +1593,7 @@ def get_comparison_history():
 def get_comparison_details(comparison_id):
     """获取对比评测详细结果"""
     try:
-        from lib.comparison_evaluator import ComparisonEvaluator
-        evaluator = ComparisonEvaluator()
-        details = evaluator.get_comparison_details(comparison_id)
+        details = get_comparison_evaluator().get_comparison_details(comparison_id)
         
         if details is None:
             return jsonify({'error': '未找到对比记录'}), 404
@@ -1050,14 +1604,14 @@ def get_comparison_details(comparison_id):
         logger.error(f"获取对比详情失败: {e}")
         return jsonify({'error': str(e)}), 500
 
-def run_building_process(entity, max_nodes, sample_size, run_manager, max_iterations=3, sampling_algorithm='mixed'):
-    """运行构建过程"""
+def run_building_process(job, entity, max_nodes, sample_size, run_manager, max_iterations=3, sampling_algorithm='mixed'):
+    """运行构建过程（job 为该次构建的任务状态）"""
     from lib.trace_manager import TraceManager, start_trace
     
-    # 在新线程中需要重新设置trace（使用building_status中的run_id）
-    if building_status.get('run_id'):
+    # 在新线程中需要重新设置trace（使用任务的run_id）
+    if job.run_id:
         # 创建基于run_id的trace
-        trace_id = f"build_{building_status['run_id']}"
+        trace_id = f"build_{job.run_id}"
         start_trace(trace_id)
         logger.info(f"构建线程启动，trace_id: {trace_id}")
     else:
@@ -1065,11 +1619,13 @@ def run_building_process(entity, max_nodes, sample_size, run_manager, max_iterat
         logger.info(f"构建线程启动，创建新trace")
     
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        loop = get_worker_loop()
         
         logger.info(f"开始异步构建过程: 实体={entity}, 最大节点={max_nodes}, 采样大小={sample_size}")
-        result = loop.run_until_complete(async_building_process(entity, max_nodes, sample_size, run_manager, max_iterations, sampling_algorithm))
+        result = loop.run_until_complete(async_building_process(
+            entity, max_nodes, sample_size, run_manager, max_iterations, sampling_algorithm,
+            progress_callback=partial(update_progress, job)
+        ))
         logger.info(f"异步构建过程完成")
         
         # 保存结果
@@ -1077,35 +1633,44 @@ def run_building_process(entity, max_nodes, sample_size, run_manager, max_iterat
         
         # 提取QA结果
         qa_pair = result.get('qa_pair', {})
-        building_status['qa_result'] = qa_pair
+        job.qa_result = qa_pair
         
         # 发送完成事件，包含QA结果
-        socketio.emit('building_complete', {
+        emit_after_graph_updates('building_complete', {
             'success': True,
             'result': result,
             'qa_result': qa_pair,
-            'run_id': building_status['run_id'],
+            'run_id': job.run_id,
             'message': '知识图谱构建完成'
         })
         
         # 标记运行完成
         run_manager.complete_run(success=True)
         
+    except JobCancelled:
+        logger.info("构建已停止")
+        run_manager.complete_run(success=False, error_message='已停止')
+        emit_after_graph_updates('building_complete', {
+            'success': False,
+            'stopped': True,
+            'run_id': job.run_id,
+            'message': '构建已停止'
+        })
     except Exception as e:
         logger.error(f"构建过程出错: {e}")
         
         # 标记运行失败
         run_manager.complete_run(success=False, error_message=str(e))
         
-        socketio.emit('building_complete', {
+        emit_after_graph_updates('building_complete', {
             'success': False,
             'error': str(e),
-            'run_id': building_status['run_id'],
+            'run_id': job.run_id,
             'message': '构建过程出错'
         })
     finally:
-        building_status['is_running'] = False
-        building_status['current_step'] = '完成'
+        job.is_running = False
+        job.current_step = '已停止' if job.cancel_event.is_set() else '完成'
         # 清理trace
         from lib.trace_manager import end_trace
         end_trace()
@@ -1128,12 +1693,16 @@ async def async_building_process(entity, max_nodes, sample_size, run_manager, ma
         custom_settings.MAX_NODES = max_nodes
         custom_settings.SAMPLE_SIZE = sample_size
         
+        # 图更新事件归属于启动本次构建的任务
+        run_id = (current_job.get() or idle_job).run_id
+        
         # 创建图更新回调函数
         def graph_update_callback(graph_data):
             """实时图更新回调"""
             try:
-                socketio.emit('graph_update', graph_data)
-                logger.info(f"发送实时图更新: {len(graph_data.get('nodes', []))} 个节点, {len(graph_data.get('links', []))} 个关系")
+                emit_graph_update('graph_update', graph_data, run_id)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"发送实时图更新: {len(graph_data.get('nodes', []))} 个节点, {len(graph_data.get('links', []))} 个关系")
             except Exception as e:
                 logger.error(f"发送实时图更新失败: {e}")
         
@@ -1141,12 +1710,9 @@ async def async_building_process(entity, max_nodes, sample_size, run_manager, ma
         builder = GraphRagBuilder(custom_settings, graph_update_callback)
         
         def pipeline_progress_callback(step, progress):
-            """流水线进度回调"""
+            """流水线进度回调（由调用方绑定到所属任务）"""
             if progress_callback:
                 progress_callback(step, progress)
-            else:
-                # 如果没有流水线回调，使用默认的进度更新
-                update_progress(step, progress)
         
         result = await builder.build_knowledge_graph(
             entity, 
@@ -1158,48 +1724,7 @@ async def async_building_process(entity, max_nodes, sample_size, run_manager, ma
         # 只发送星座图采样信息，避免重复发送基础图数据
         if 'sample_info' in result:
             try:
-                sample_info = result['sample_info']
-                sampled_nodes = sample_info.get('nodes', [])
-                sampled_relations = sample_info.get('relations', [])
-                
-                # 创建采样节点数据
-                sampled_graph_nodes = []
-                for node in sampled_nodes:
-                    sampled_graph_nodes.append({
-                        'id': node.get('name', f'Node_{len(sampled_graph_nodes)}'),
-                        'name': node.get('name', f'Node_{len(sampled_graph_nodes)}'),
-                        'type': node.get('type', 'unknown'),
-                        'description': node.get('description', ''),
-                        'group': hash(node.get('type', 'unknown')) % 10,
-                        'sampled': True
-                    })
-                
-                # 创建采样连线数据
-                sampled_graph_links = []
-                for relation in sampled_relations:
-                    source = relation.get('source') or relation.get('head') or relation.get('from')
-                    target = relation.get('target') or relation.get('tail') or relation.get('to')
-                    if source and target:
-                        relation_type = (relation.get('relationship') or 
-                                       relation.get('relation') or 
-                                       relation.get('type') or 
-                                       'related_to')
-                        sampled_graph_links.append({
-                            'source': source,
-                            'target': target,
-                            'relation': relation_type,
-                            'description': relation.get('description', ''),
-                            'weight': relation.get('weight', 1.0),
-                            'sampled': True
-                        })
-                
-                # 发送星座图高亮事件
-                socketio.emit('sampled_graph_update', {
-                    'nodes': sampled_graph_nodes,
-                    'links': sampled_graph_links
-                })
-                logger.info(f"发送星座图更新: {len(sampled_graph_nodes)} 个采样节点, {len(sampled_graph_links)} 个采样关系")
-                
+                emit_sampled_graph(result['sample_info'], run_id)
             except Exception as e:
                 logger.error(f"发送星座图更新失败: {e}")
         
@@ -1207,9 +1732,9 @@ async def async_building_process(entity, max_nodes, sample_size, run_manager, ma
         if 'qa_pair' in result:
             socketio.emit('qa_generated', result['qa_pair'])
         
-        # 输出QA对到控制台和日志
+        # 输出QA对到控制台和日志（INFO级别关闭时跳过整段字符串拼接）
         qa_pair = result.get('qa_pair', {})
-        if qa_pair:
+        if qa_pair and logger.isEnabledFor(logging.INFO):
             logger.info("\n" + "="*60)
             logger.info("🎯 生成的QA对:")
             logger.info("="*60)
@@ -1229,107 +1754,133 @@ async def async_building_process(entity, max_nodes, sample_size, run_manager, ma
         
         return result
         
+    except JobCancelled:
+        raise
     except Exception as e:
         logger.error(f"异步构建过程出错: {e}")
         raise
 
-def update_progress(step, progress):
-    """更新进度"""
-    building_status['current_step'] = step
-    building_status['progress'] = progress
+# 关系字段的候选键，按优先级排列（优先使用 relationship 字段作为关系类型）
+RELATION_SOURCE_KEYS = ('source', 'head', 'from')
+RELATION_TARGET_KEYS = ('target', 'tail', 'to')
+RELATION_TYPE_KEYS = ('relationship', 'relation', 'type')
+
+def first_value(item, keys):
+    """按顺序返回第一个非空字段值"""
+    for key in keys:
+        value = item.get(key)
+        if value:
+            return value
+    return None
+
+@lru_cache(maxsize=256)
+def node_type_group(entity_type):
+    """节点类型对应的着色分组，按类型缓存；使用crc32而非hash()，同一类型在不同进程/重启后颜色一致"""
+    return zlib.crc32(str(entity_type).encode('utf-8')) % 10
+
+def build_graph_payload(entities, relationships, sampled=False):
+    """将实体和关系转换为前端图数据 (nodes, links)；sampled=True 时用于星座图采样高亮"""
+    if sampled:
+        default_type, name_prefix = 'unknown', 'Node_'
+    else:
+        default_type, name_prefix = 'concept', 'Entity_'
+    
+    # 节点数与实体数一致，按下标直接填充预分配的列表
+    nodes = [None] * len(entities)
+    for i, entity in enumerate(entities):
+        name = entity.get('name') if sampled else entity.get('name', entity.get('id'))
+        if name is None:
+            name = f'{name_prefix}{i}'
+        entity_type = entity.get('type', default_type)
+        node = {
+            'id': name,
+            'name': name,
+            'type': entity_type,
+            'description': entity.get('description', ''),
+            'group': node_type_group(entity_type)
+        }
+        if sampled:
+            node['sampled'] = True
+        nodes[i] = node
+    
+    links = []
+    for relation in relationships:
+        source = first_value(relation, RELATION_SOURCE_KEYS)
+        target = first_value(relation, RELATION_TARGET_KEYS)
+        if source and target:
+            link = {
+                'source': source,
+                'target': target,
+                'relation': first_value(relation, RELATION_TYPE_KEYS) or 'related_to',
+                'description': relation.get('description', ''),
+                'weight': relation.get('weight', 1.0)
+            }
+            if sampled:
+                link['sampled'] = True
+            links.append(link)
+    
+    return nodes, links
+
+def emit_sampled_graph(sample_info, run_id=None):
+    """根据采样信息构建星座图高亮数据并发送 sampled_graph_update 事件（run_id 为所属任务）"""
+    sampled_graph_nodes, sampled_graph_links = build_graph_payload(
+        sample_info.get('nodes', []),
+        sample_info.get('relations', []),
+        sampled=True
+    )
+    emit_graph_update('sampled_graph_update', {
+        'nodes': sampled_graph_nodes,
+        'links': sampled_graph_links
+    }, run_id)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"发送星座图更新: {len(sampled_graph_nodes)} 个采样节点, {len(sampled_graph_links)} 个采样关系")
+
+def update_progress(job, step, progress):
+    """更新指定任务的进度；任务已被停止时抛出 JobCancelled，中断正在执行的构建"""
+    if job.cancel_event.is_set():
+        raise JobCancelled('任务已停止')
+    job.current_step = step
+    job.progress = progress
     
     socketio.emit('progress_update', {
         'step': step,
-        'progress': progress
+        'progress': progress,
+        'run_id': job.run_id
     })
     logger.info(f"进度更新: {step} ({progress}%)")
 
-def update_graph_data(result):
-    """更新图数据"""
+def graph_info_fingerprint(graph_info):
+    """计算图信息（实体和关系）的内容指纹；含无法序列化的值时返回None（视为有变化）"""
+    try:
+        content = json_dumps([graph_info.get('entities', []), graph_info.get('relationships', [])])
+    except TypeError:
+        return None
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+def update_graph_data(job, result):
+    """更新指定任务的图数据"""
     try:
         # 检查是否有完整的图信息（迭代过程中的增量更新）
         if 'graph_info' in result:
             graph_info = result['graph_info']
-            entities = graph_info.get('entities', [])
-            relationships = graph_info.get('relationships', [])
             
-            graph_nodes = []
-            for entity in entities:
-                graph_nodes.append({
-                    'id': entity.get('name', entity.get('id', f'Entity_{len(graph_nodes)}')),
-                    'name': entity.get('name', entity.get('id', f'Entity_{len(graph_nodes)}')),
-                    'type': entity.get('type', 'concept'),
-                    'description': entity.get('description', ''),
-                    'group': hash(entity.get('type', 'concept')) % 10
-                })
-            
-            graph_links = []
-            for relation in relationships:
-                source = relation.get('source') or relation.get('head') or relation.get('from')
-                target = relation.get('target') or relation.get('tail') or relation.get('to')
-                if source and target:
-                    # 正确获取关系类型，优先使用 relationship 字段
-                    relation_type = (relation.get('relationship') or 
-                                   relation.get('relation') or 
-                                   relation.get('type') or 
-                                   'related_to')
-                    graph_links.append({
-                        'source': source,
-                        'target': target,
-                        'relation': relation_type,
-                        'description': relation.get('description', ''),
-                        'weight': relation.get('weight', 1.0)
-                    })
-            
-            building_status['graph_data'] = {
-                'nodes': graph_nodes,
-                'links': graph_links
-            }
-            
-            socketio.emit('graph_update', building_status['graph_data'])
+            # 图内容与上次发送的完全相同时不再重建和发送
+            fingerprint = graph_info_fingerprint(graph_info)
+            if fingerprint is None or fingerprint != job.graph_fingerprint:
+                graph_nodes, graph_links = build_graph_payload(
+                    graph_info.get('entities', []),
+                    graph_info.get('relationships', [])
+                )
+                job.graph_data = {
+                    'nodes': graph_nodes,
+                    'links': graph_links
+                }
+                job.graph_fingerprint = fingerprint
+                emit_graph_update('graph_update', job.graph_data, job.run_id)
             
         # 检查是否有采样信息（星座图高亮）
         if 'sample_info' in result:
-            sample_info = result['sample_info']
-            sampled_nodes = sample_info.get('nodes', [])
-            sampled_relations = sample_info.get('relations', [])
-            
-            # 创建采样节点数据
-            sampled_graph_nodes = []
-            for node in sampled_nodes:
-                sampled_graph_nodes.append({
-                    'id': node.get('name', f'Node_{len(sampled_graph_nodes)}'),
-                    'name': node.get('name', f'Node_{len(sampled_graph_nodes)}'),
-                    'type': node.get('type', 'unknown'),
-                    'description': node.get('description', ''),
-                    'group': hash(node.get('type', 'unknown')) % 10,
-                    'sampled': True
-                })
-            
-            # 创建采样连线数据
-            sampled_graph_links = []
-            for relation in sampled_relations:
-                source = relation.get('source') or relation.get('head') or relation.get('from')
-                target = relation.get('target') or relation.get('tail') or relation.get('to')
-                if source and target:
-                    relation_type = (relation.get('relationship') or 
-                                   relation.get('relation') or 
-                                   relation.get('type') or 
-                                   'related_to')
-                    sampled_graph_links.append({
-                        'source': source,
-                        'target': target,
-                        'relation': relation_type,
-                        'description': relation.get('description', ''),
-                        'weight': relation.get('weight', 1.0),
-                        'sampled': True
-                    })
-            
-            # 发送星座图高亮事件
-            socketio.emit('sampled_graph_update', {
-                'nodes': sampled_graph_nodes,
-                'links': sampled_graph_links
-            })
+            emit_sampled_graph(result['sample_info'], job.run_id)
         
     except Exception as e:
         logger.error(f"更新图数据失败: {e}")
@@ -1345,31 +1896,35 @@ def handle_disconnect():
     """处理客户端断开连接"""
     logger.info("客户端已断开连接")
 
-def run_batch_building_process(entities, run_manager):
+def run_batch_building_process(job, entities, run_manager):
     """运行批量构建过程"""
+    progress_callback = partial(update_progress, job)
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        loop = get_worker_loop()
         
         results = []
         total_entities = len(entities)
         
         for i, entity in enumerate(entities):
+            if job.cancel_event.is_set():
+                raise JobCancelled('任务已停止')
             logger.info(f"批量构建 ({i+1}/{total_entities}): {entity}")
             
             # 更新进度
             progress = int((i / total_entities) * 100)
-            update_progress(f"处理实体: {entity}", progress)
+            progress_callback(f"处理实体: {entity}", progress)
             
             # 运行单个实体的构建
-            result = loop.run_until_complete(async_building_process(entity, 30, 8, run_manager, 3))
+            result = loop.run_until_complete(async_building_process(
+                entity, 30, 8, run_manager, 3, progress_callback=progress_callback
+            ))
             results.append({
                 'entity': entity,
                 'result': result
             })
             
             # 更新图数据
-            update_graph_data(result)
+            update_graph_data(job, result)
             
             # 保存单个实体的结果
             run_manager.save_result(result, f"entity_{entity}_result.json")
@@ -1377,29 +1932,67 @@ def run_batch_building_process(entities, run_manager):
         # 批量构建完成后，保存所有结果
         run_manager.save_result(results, "batch_knowledge_graph_results.json")
         
-        socketio.emit('batch_building_complete', {
+        emit_after_graph_updates('batch_building_complete', {
             'success': True,
             'results': results,
+            'run_id': job.run_id,
             'message': f'批量构建完成，共处理 {total_entities} 个实体'
         })
         
         # 标记运行完成
         run_manager.complete_run(success=True)
         
+    except JobCancelled:
+        logger.info(f"批量构建已停止，已完成 {len(results)} 个实体")
+        run_manager.save_result(results, "batch_knowledge_graph_results.json")
+        run_manager.complete_run(success=False, error_message='已停止')
+        emit_after_graph_updates('batch_building_complete', {
+            'success': False,
+            'stopped': True,
+            'results': results,
+            'run_id': job.run_id,
+            'message': f'批量构建已停止，已完成 {len(results)} 个实体'
+        })
     except Exception as e:
         logger.error(f"批量构建过程出错: {e}")
         
         # 标记运行失败
         run_manager.complete_run(success=False, error_message=str(e))
         
-        socketio.emit('batch_building_complete', {
+        emit_after_graph_updates('batch_building_complete', {
             'success': False,
             'error': str(e),
+            'run_id': job.run_id,
             'message': '批量构建过程出错'
         })
     finally:
-        building_status['is_running'] = False
-        building_status['current_step'] = '批量完成'
+        job.is_running = False
+        job.current_step = '已停止' if job.cancel_event.is_set() else '批量完成'
+
+# 即时保存的文件句柄：同一批次的结果复用一个追加句柄，批次结束时关闭
+instant_save_files = {}
+instant_save_lock = Lock()
+
+def instant_save_path(instant_save_config):
+    """返回即时保存的文件路径；未指定文件名时生成一次并写回配置，保证整个批次写入同一文件"""
+    filename = instant_save_config.get('filename')
+    if not filename:
+        # 自动生成文件名
+        filename = f"{make_task_id('batch_generated')}.jsonl"
+    
+    # 确保文件名以.jsonl结尾
+    if not filename.endswith('.jsonl'):
+        filename += '.jsonl'
+    instant_save_config['filename'] = filename
+    
+    return os.path.join("evaluation_data/generated_datasets", filename)
+
+def close_instant_save_file(filepath):
+    """关闭即时保存的文件句柄"""
+    with instant_save_lock:
+        f = instant_save_files.pop(filepath, None)
+    if f is not None:
+        f.close()
 
 def instant_save_result(result, config):
     """即时保存单个结果到文件"""
@@ -1408,22 +2001,7 @@ def instant_save_result(result, config):
         if not instant_save_config.get('enabled'):
             return
         
-        filename = instant_save_config.get('filename')
-        if not filename:
-            # 自动生成文件名
-            from datetime import datetime
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"batch_generated_{timestamp}.jsonl"
-        
-        # 确保文件名以.jsonl结尾
-        if not filename.endswith('.jsonl'):
-            filename += '.jsonl'
-        
-        # 创建生成数据集目录
-        dataset_dir = "evaluation_data/generated_datasets"
-        os.makedirs(dataset_dir, exist_ok=True)
-        
-        filepath = os.path.join(dataset_dir, filename)
+        filepath = instant_save_path(instant_save_config)
         
         # 只保存成功生成的QA对
         qa_pair = result.get('qa_pair', {})
@@ -1440,21 +2018,24 @@ def instant_save_result(result, config):
                 'generated_at': datetime.now().isoformat()
             }
             
-            # 追加写入文件
-            with open(filepath, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(line_data, ensure_ascii=False) + '\n')
-                f.flush()  # 立即刷新到磁盘
+            # 追加写入文件：句柄按行缓冲，每条记录写完即落盘，无需每次重新打开文件
+            with instant_save_lock:
+                f = instant_save_files.get(filepath)
+                if f is None:
+                    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                    f = open(filepath, 'a', encoding='utf-8', buffering=1)
+                    instant_save_files[filepath] = f
+                f.write(json_dumps(line_data) + '\n')
             
             logger.info(f"即时保存结果到: {filepath}")
         
     except Exception as e:
         logger.error(f"即时保存结果失败: {e}")
 
-def run_batch_generation_process(config, run_manager):
+def run_batch_generation_process(job, config, run_manager):
     """批量生成过程 - 使用并行处理"""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        loop = get_worker_loop()
         
         entities = config.get('entities', [])
         parallel_workers = config.get('parallel_workers', 2)
@@ -1468,13 +2049,23 @@ def run_batch_generation_process(config, run_manager):
         instant_save_enabled = config.get('instant_save', {}).get('enabled', False)
         if instant_save_enabled:
             logger.info("启用即时保存模式")
+            instant_save_filepath = instant_save_path(config['instant_save'])
         
         # 在新的事件循环中运行异步批量生成
-        result = loop.run_until_complete(async_batch_generation_process(
-            entities, config, run_manager, parallel_workers
-        ))
+        try:
+            result = loop.run_until_complete(async_batch_generation_process(
+                entities, config, run_manager, parallel_workers, job.cancel_event
+            ))
+        finally:
+            if instant_save_enabled:
+                close_instant_save_file(instant_save_filepath)
         
         results = result
+        # 停止后已完成的结果照常保存，完成事件中标记 stopped
+        stopped = job.cancel_event.is_set()
+        done_message = '批量生成已停止' if stopped else '批量生成完成'
+        if stopped:
+            logger.info(f"批量生成已停止，已完成 {len(results)} 个实体")
         
         # 如果没有启用即时保存，则在最后统一保存
         if not instant_save_enabled and results:
@@ -1487,8 +2078,7 @@ def run_batch_generation_process(config, run_manager):
             os.makedirs(dataset_dir, exist_ok=True)
             
             # 生成文件名
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"batch_generated_{timestamp}.jsonl"
+            filename = f"{make_task_id('batch_generated')}.jsonl"
             filepath = os.path.join(dataset_dir, filename)
             
             try:
@@ -1507,44 +2097,135 @@ def run_batch_generation_process(config, run_manager):
                                 'entity': result.get('initial_entity', ''),
                                 'generated_at': datetime.now().isoformat()
                             }
-                            f.write(json.dumps(line_data, ensure_ascii=False) + '\n')
+                            f.write(json_dumps(line_data) + '\n')
                 
                 logger.info(f"批量生成结果已保存到: {filepath}")
                 
                 # 发送完成信号（包含保存的文件信息）
-                socketio.emit('batch_complete', {
+                emit_after_progress('batch_complete', {
                     'total': len(results),
-                    'message': f'批量生成完成，共生成 {len(results)} 个QA对',
+                    'message': f'{done_message}，共生成 {len(results)} 个QA对',
                     'saved_file': filename,
-                    'saved_path': filepath
+                    'saved_path': filepath,
+                    'stopped': stopped,
+                    'run_id': job.run_id
                 })
                 
             except Exception as e:
                 logger.error(f"保存批量生成结果失败: {e}")
                 # 即使保存失败，也发送完成信号
-                socketio.emit('batch_complete', {
+                emit_after_progress('batch_complete', {
                     'total': len(results),
-                    'message': f'批量生成完成，共生成 {len(results)} 个QA对（保存失败）'
+                    'message': f'{done_message}，共生成 {len(results)} 个QA对（保存失败）',
+                    'stopped': stopped,
+                    'run_id': job.run_id
                 })
         else:
             # 即时保存模式下的完成信号
             instant_save_config = config.get('instant_save', {})
             filename = instant_save_config.get('filename', 'unknown')
-            socketio.emit('batch_complete', {
+            emit_after_progress('batch_complete', {
                 'total': len(results),
-                'message': f'批量生成完成，共生成 {len(results)} 个QA对（即时保存）',
+                'message': f'{done_message}，共生成 {len(results)} 个QA对（即时保存）',
                 'saved_file': filename,
-                'instant_save': True
+                'instant_save': True,
+                'stopped': stopped,
+                'run_id': job.run_id
             })
         
-        building_status['is_running'] = False
-        building_status['current_step'] = '批量生成完成'
-        building_status['progress'] = 100
+        job.is_running = False
+        if stopped:
+            job.current_step = '已停止'
+        else:
+            job.current_step = '批量生成完成'
+            job.progress = 100
         
     except Exception as e:
         logger.error(f"批量生成过程出错: {e}")
-        socketio.emit('batch_error', {'message': f'批量生成失败: {str(e)}'})
-        building_status['is_running'] = False
+        emit_after_progress('batch_error', {'message': f'批量生成失败: {str(e)}', 'run_id': job.run_id})
+        job.is_running = False
+
+# 评测结果文件解析缓存：文件名 -> (修改时间, 大小, 解析后的数据)，文件未变化时不再重复解析
+evaluation_results_cache = {}
+# 多个请求线程同时读写缓存，读写缓存和计算ETag时持有该锁
+evaluation_results_lock = Lock()
+
+def read_evaluation_result_summary(path):
+    """读取单个评测结果文件，去掉逐题结果只保留汇总字段"""
+    with open(path, 'rb') as f:
+        result_data = json_loads(f.read())
+    # 列表与历史接口只用到汇总字段，不缓存逐题结果以控制内存
+    result_data.pop('results', None)
+    return result_data
+
+def load_evaluation_results(results_dir):
+    """返回评测结果目录下所有可解析的 (文件名, 结果汇总数据)，只重新解析有变化的文件"""
+    if not os.path.exists(results_dir):
+        return []
+    
+    entries = []
+    with os.scandir(results_dir) as it:
+        for entry in it:
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                entries.append((entry.name, entry.path, entry.stat()))
+            except OSError as e:
+                logger.error(f"读取评测结果文件 {entry.name} 失败: {e}")
+    
+    results = []
+    misses = []
+    with evaluation_results_lock:
+        for name, path, st in entries:
+            cached = evaluation_results_cache.get(name)
+            if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                results.append((name, cached[2]))
+            else:
+                misses.append((name, path, st))
+    
+    # 未命中缓存的文件较多时交给共享的IO线程池并行读取解析，重叠文件I/O等待且线程数有上限
+    if len(misses) > 1:
+        futures = [IO_POOL.submit(read_evaluation_result_summary, path) for _, path, _ in misses]
+    else:
+        futures = None
+    
+    loaded = []
+    for i, (name, path, st) in enumerate(misses):
+        try:
+            result_data = futures[i].result(timeout=IO_TIMEOUT) if futures else read_evaluation_result_summary(path)
+        except Exception as e:
+            logger.error(f"读取评测结果文件 {name} 失败: {e}")
+            continue
+        loaded.append((name, st, result_data))
+        results.append((name, result_data))
+    
+    seen = {name for name, _, _ in entries}
+    with evaluation_results_lock:
+        for name, st, result_data in loaded:
+            evaluation_results_cache[name] = (st.st_mtime_ns, st.st_size, result_data)
+        # 清理已删除文件的缓存
+        for name in [name for name in evaluation_results_cache if name not in seen]:
+            del evaluation_results_cache[name]
+    return results
+
+def evaluation_results_etag(scope):
+    """根据评测结果文件的 (文件名, 修改时间, 大小) 和查询范围计算ETag"""
+    digest = hashlib.blake2b(scope.encode('utf-8'), digest_size=16)
+    with evaluation_results_lock:
+        stamps = sorted((name, mtime, size) for name, (mtime, size, _) in evaluation_results_cache.items())
+    for name, mtime, size in stamps:
+        digest.update(f'{name}:{mtime}:{size};'.encode('utf-8'))
+    return digest.hexdigest()
+
+def etag_json_response(payload, etag):
+    """返回带ETag的JSON响应；客户端缓存的ETag未变化时返回304，不再序列化响应体"""
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/api/evaluation_data/results')
 def get_evaluation_results():
@@ -1555,39 +2236,38 @@ def get_evaluation_results():
     results_dir = 'evaluation_data/evaluation_results'
     dataset_results = {}  # 用于存储每个数据集的最新结果
     
-    if os.path.exists(results_dir):
-        for filename in os.listdir(results_dir):
-            if filename.endswith('.json'):
-                try:
-                    filepath = os.path.join(results_dir, filename)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        result_data = json.load(f)
-                    
-                    if result_data.get('mode') == mode:
-                        dataset_name = result_data.get('dataset_name', '')
-                        submitted_at = result_data.get('submitted_at', '')
-                        
-                        # 保留最新的评测结果
-                        if dataset_name not in dataset_results or submitted_at > dataset_results[dataset_name]['submitted_at']:
-                            dataset_results[dataset_name] = {
-                                'name': dataset_name,
-                                'count': result_data.get('total_questions', 0),
-                                'accuracy': result_data.get('accuracy', 0) * 100,  # 转换为百分比
-                                'last_evaluation': result_data.get('timestamp', '').split('_')[0] if result_data.get('timestamp') else '',
-                                'submitted_at': submitted_at,
-                                'evaluation_id': result_data.get('evaluation_id', ''),
-                                'status': 'completed',
-                                'correct_count': result_data.get('correct_answers', 0)  # 修复字段名不匹配问题
-                            }
-                except Exception as e:
-                    logger.error(f"读取评测结果文件 {filename} 失败: {e}")
-                    continue
+    evaluation_results = load_evaluation_results(results_dir)
+    etag = evaluation_results_etag(f'results:{mode}')
+    if etag in request.if_none_match:
+        return etag_json_response(None, etag)
+    
+    for filename, result_data in evaluation_results:
+        try:
+            if result_data.get('mode') == mode:
+                dataset_name = result_data.get('dataset_name', '')
+                submitted_at = result_data.get('submitted_at', '')
+                
+                # 保留最新的评测结果
+                if dataset_name not in dataset_results or submitted_at > dataset_results[dataset_name]['submitted_at']:
+                    dataset_results[dataset_name] = {
+                        'name': dataset_name,
+                        'count': result_data.get('total_questions', 0),
+                        'accuracy': result_data.get('accuracy', 0) * 100,  # 转换为百分比
+                        'last_evaluation': result_data.get('timestamp', '').split('_')[0] if result_data.get('timestamp') else '',
+                        'submitted_at': submitted_at,
+                        'evaluation_id': result_data.get('evaluation_id', ''),
+                        'status': 'completed',
+                        'correct_count': result_data.get('correct_answers', 0)  # 修复字段名不匹配问题
+                    }
+        except Exception as e:
+            logger.error(f"读取评测结果文件 {filename} 失败: {e}")
+            continue
     
     # 转换为列表并按提交时间排序
     results = list(dataset_results.values())
     results.sort(key=lambda x: x['submitted_at'], reverse=True)
     
-    return jsonify({'results': results})
+    return etag_json_response({'results': results}, etag)
 
 @app.route('/api/evaluation_data/history/<dataset_id>')
 def get_evaluation_history(dataset_id):
@@ -1595,86 +2275,158 @@ def get_evaluation_history(dataset_id):
     results_dir = 'evaluation_data/evaluation_results'
     history = []
     
-    if os.path.exists(results_dir):
-        for filename in os.listdir(results_dir):
-            if filename.endswith('.json') and dataset_id.replace('.jsonl', '') in filename:
-                try:
-                    filepath = os.path.join(results_dir, filename)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        result_data = json.load(f)
-                    
-                    history.append({
-                        'mode': result_data.get('mode', 'R1-0528'),
-                        'completed_at': result_data.get('submitted_at', '').replace('T', ' ').split('.')[0] if result_data.get('submitted_at') else '',
-                        'total_questions': result_data.get('total_questions', 0),
-                        'correct_count': result_data.get('correct_answers', 0),  # 修复字段名不匹配问题
-                        'accuracy': round(result_data.get('accuracy', 0) * 100, 1)  # 转换为百分比并保留1位小数
-                    })
-                except Exception as e:
-                    logger.error(f"读取历史记录文件 {filename} 失败: {e}")
-                    continue
+    dataset_key = dataset_id.replace('.jsonl', '')
+    evaluation_results = load_evaluation_results(results_dir)
+    etag = evaluation_results_etag(f'history:{dataset_key}')
+    if etag in request.if_none_match:
+        return etag_json_response(None, etag)
+    
+    for filename, result_data in evaluation_results:
+        if dataset_key not in filename:
+            continue
+        try:
+            history.append({
+                'mode': result_data.get('mode', 'R1-0528'),
+                'completed_at': result_data.get('submitted_at', '').replace('T', ' ').split('.')[0] if result_data.get('submitted_at') else '',
+                'total_questions': result_data.get('total_questions', 0),
+                'correct_count': result_data.get('correct_answers', 0),  # 修复字段名不匹配问题
+                'accuracy': round(result_data.get('accuracy', 0) * 100, 1)  # 转换为百分比并保留1位小数
+            })
+        except Exception as e:
+            logger.error(f"读取历史记录文件 {filename} 失败: {e}")
+            continue
     
     # 按完成时间倒序排列
     history.sort(key=lambda x: x['completed_at'], reverse=True)
     
-    return jsonify({'history': history})
+    return etag_json_response({'history': history}, etag)
 
-def run_evaluation_process(evaluation_id, config):
+def run_evaluation_process(job, config):
     """评测过程"""
     from lib.trace_manager import start_trace
     
+    evaluation_id = job.run_id
+    
     # 在新线程中重新设置trace
     trace_id = f"eval_{evaluation_id}"
     start_trace(trace_id)
     logger.info(f"评测线程启动，evaluation_id: {evaluation_id}")
     
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        loop = get_worker_loop()
         
         logger.info(f"开始异步评测过程")
-        result = loop.run_until_complete(async_evaluation_process(evaluation_id, config))
+        result = loop.run_until_complete(async_evaluation_process(evaluation_id, config, job.cancel_event))
         logger.info(f"异步评测过程完成")
         
-        socketio.emit('evaluation_complete', {
+        if job.cancel_event.is_set():
+            # 前端在点击停止时已重置界面，这里只通知停止完成
+            emit_after_progress('evaluation_stopped', {
+                'evaluation_id': evaluation_id,
+                'stopped': True,
+                'message': '评测已停止'
+            })
+            return
+        
+        emit_after_progress('evaluation_complete', {
             'evaluation_id': evaluation_id,
             'results': result
         })
         
     except Exception as e:
         logger.error(f"评测过程出错: {e}")
-        socketio.emit('evaluation_error', {'message': f'评测失败: {str(e)}'})
+        emit_after_progress('evaluation_error', {'message': f'评测失败: {str(e)}'})
     finally:
+        job.is_running = False
+        job.current_step = '已停止' if job.cancel_event.is_set() else '评测完成'
         # 清理trace
         from lib.trace_manager import end_trace
         end_trace()
 
-def run_comparison_process(comparison_id, config):
+def run_comparison_process(job, config):
     """对比评测过程"""
+    comparison_id = job.run_id
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        loop = get_worker_loop()
+        
+        result = loop.run_until_complete(async_comparison_process(comparison_id, config, job.cancel_event))
         
-        result = loop.run_until_complete(async_comparison_process(comparison_id, config))
+        if job.cancel_event.is_set():
+            # 前端在点击停止时已重置界面，这里只通知停止完成
+            emit_after_progress('comparison_stopped', {
+                'comparison_id': comparison_id,
+                'stopped': True,
+                'message': '对比评测已停止'
+            })
+            job.is_running = False
+            job.current_step = '已停止'
+            return
         
-        socketio.emit('comparison_complete', {
+        emit_after_progress('comparison_complete', {
             'comparison_id': comparison_id,
             'results': result
         })
         
         # 标记运行完成
-        building_status['is_running'] = False
-        building_status['current_step'] = '对比评测完成'
+        job.is_running = False
+        job.current_step = '对比评测完成'
         
     except Exception as e:
         logger.error(f"对比评测过程出错: {e}")
-        socketio.emit('comparison_error', {'message': f'对比评测失败: {str(e)}'})
-        building_status['is_running'] = False
+        emit_after_progress('comparison_error', {'message': f'对比评测失败: {str(e)}'})
+        job.is_running = False
     finally:
         # 清理trace
         from lib.trace_manager import end_trace
         end_trace()
 
+def emit_batch_progress(message, progress, task_id=None, status=None, run_id=None):
+    """批量生成的进度回调：组装进度数据（run_id 为所属任务）并合并推送 batch_progress"""
+    progress_data = {
+        'step': message,
+        'progress': progress,
+        'run_id': run_id
+    }
+    
+    if task_id:
+        progress_data['task_id'] = task_id
+    if message:
+        progress_data['message'] = message
+    if status:
+        progress_data['status'] = status
+        
+    emit_progress('batch_progress', progress_data)
+
+@dataclass(slots=True)
+class TaskProgressForwarder:
+    """把单个子任务的图构建进度加上题号前缀后转发给批量进度回调（每个任务一个小对象，代替闭包）"""
+    progress_callback: Callable
+    index: int
+    task_id: str
+    
+    def __call__(self, step, progress):
+        self.progress_callback(
+            f"第{self.index}题: {step}", 
+            None,
+            task_id=self.task_id,
+            status="running"
+        )
+
+# 批量生成子任务复用的运行管理器池（后进先出，实例数不超过同时运行的任务数）
+run_manager_pool = queue.LifoQueue()
+
+def acquire_run_manager():
+    """从池中取出一个空闲的运行管理器，池为空时新建"""
+    try:
+        return run_manager_pool.get_nowait()
+    except queue.Empty:
+        return RunManager()
+
+def release_run_manager(run_manager):
+    """关闭运行日志并清空状态后放回池中"""
+    run_manager.reset()
+    run_manager_pool.put(run_manager)
+
 async def _process_single_generation_task(task_item: dict, config: dict, parent_run_manager, progress_callback=None):
     """处理单个生成任务的完整流水线：图构建 → 图采样 → 信息模糊化 → QA生成"""
     from lib.trace_manager import start_trace, TraceManager
@@ -1692,10 +2444,9 @@ async def _process_single_generation_task(task_item: dict, config: dict, parent_
         # 如果没有batch trace，创建独立的trace
         start_trace(prefix=f"task_{index}")
     
+    # 为每个任务取用独立的运行管理器（从池中复用）
+    task_run_manager = acquire_run_manager()
     try:
-        # 为每个任务创建独立的运行管理器
-        from lib.run_manager import RunManager
-        task_run_manager = RunManager()
         task_run_id = task_run_manager.create_new_run(f"task_{index}_{entity}")
         
         # 阶段1：图构建
@@ -1717,12 +2468,7 @@ async def _process_single_generation_task(task_item: dict, config: dict, parent_
             task_run_manager,  # 使用独立的运行管理器
             config.get('max_iterations', 3),
             config.get('sampling_algorithm', 'mixed'),
-            progress_callback=lambda step, prog: progress_callback(
-                f"第{index}题: {step}", 
-                None,
-                task_id=task_id,
-                status="running"
-            ) if progress_callback else None
+            progress_callback=TaskProgressForwarder(progress_callback, index, task_id) if progress_callback else None
         )
         
         if not result:
@@ -1763,9 +2509,8 @@ async def _process_single_generation_task(task_item: dict, config: dict, parent_
                 status="error"
             )
         
-        # 如果创建了任务运行管理器，标记为失败
-        if 'task_run_manager' in locals():
-            task_run_manager.complete_run(success=False, error_message=str(e))
+        # 标记任务运行失败（运行尚未创建时complete_run不做任何事）
+        task_run_manager.complete_run(success=False, error_message=str(e))
         
         # 返回错误结果
         return {
@@ -1775,154 +2520,112 @@ async def _process_single_generation_task(task_item: dict, config: dict, parent_
             "error": str(e)
         }
     finally:
+        release_run_manager(task_run_manager)
         # 清理trace
         from lib.trace_manager import end_trace
         end_trace()
 
-async def async_batch_generation_process(entities, config, run_manager, parallel_workers):
-    """异步批量生成过程 - 使用流水线并发模式"""
+async def async_batch_generation_process(entities, config, run_manager, parallel_workers, cancel_event=None):
+    """异步批量生成过程 - 使用流水线并发模式（cancel_event 被设置后不再开始新的实体，已开始的实体正常完成）"""
     try:
         total_tasks = len(entities)
         results = [None] * total_tasks  # 预分配结果数组
         
-        # 创建任务队列
-        task_queue = asyncio.Queue()
-        
-        # 完成计数器和锁
+        # 完成计数器（所有协程运行在同一事件循环中，计数更新之间没有await，无需加锁）
         completed_count = 0
-        progress_lock = asyncio.Lock()
-        
-        # 将所有任务放入队列
-        for i, entity in enumerate(entities):
-            task_item = {
-                "index": i + 1,
-                "array_index": i,
-                "entity": entity,
-                "task_id": f"task_{i + 1}"
-            }
-            await task_queue.put(task_item)
-        
-        # 添加结束信号
-        for _ in range(parallel_workers):
-            await task_queue.put(None)
         
         # 使用信号量控制并发数量
         semaphore = asyncio.Semaphore(parallel_workers)
         
-        # 进度回调函数
-        def progress_callback(message, progress, task_id=None, status=None):
-            progress_data = {
-                'step': message,
-                'progress': progress
-            }
-            
-            if task_id:
-                progress_data['task_id'] = task_id
-            if message:
-                progress_data['message'] = message
-            if status:
-                progress_data['status'] = status
-                
-            socketio.emit('batch_progress', progress_data)
+        # 进度回调函数，进度和结果事件归属于启动本次批量生成的任务
+        run_id = (current_job.get() or idle_job).run_id
+        progress_callback = partial(emit_batch_progress, run_id=run_id)
         
-        # 创建工作协程
-        async def worker(worker_id: int):
-            """工作协程 - 处理完整的流水线"""
+        async def run_task(task_item):
+            """在并发上限内处理单个实体的完整流水线"""
             nonlocal completed_count
             
-            while True:
-                try:
-                    # 从队列获取任务
-                    task_item = await task_queue.get()
+            try:
+                async with semaphore:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
                     
-                    if task_item is None:  # 结束信号
-                        logger.debug(f"批量生成工作协程 {worker_id} 收到结束信号，退出")
-                        break
+                    # 处理单个任务
+                    result = await _process_single_generation_task(
+                        task_item, 
+                        config, 
+                        run_manager,
+                        progress_callback=progress_callback
+                    )
                     
-                    # 检查是否已经处理完所有任务
-                    async with progress_lock:
-                        if completed_count >= total_tasks:
-                            logger.warning(f"批量生成工作协程 {worker_id}: 已完成所有任务，跳过额外任务")
-                            break
+                    # 将结果存储到正确的位置，并保留输入顺序索引供前端对齐
+                    if result:
+                        result["array_index"] = task_item["array_index"]
+                        result["run_id"] = run_id
+                        results[task_item["array_index"]] = result
                     
-                    async with semaphore:
-                        # 处理单个任务
-                        result = await _process_single_generation_task(
-                            task_item, 
-                            config, 
-                            run_manager,
-                            progress_callback=progress_callback
-                        )
-                        
-                        # 将结果存储到正确的位置
-                        if result and "array_index" in task_item:
-                            array_index = task_item["array_index"]
-                            if 0 <= array_index < total_tasks:
-                                results[array_index] = result
-                        
-                        # 即时保存结果（如果启用）
-                        instant_save_result(result, config)
-                        
-                        # 发送单个结果
-                        socketio.emit('batch_result', result)
+                    # 即时保存结果（如果启用）
+                    instant_save_result(result, config)
                     
-                    # 更新完成计数并通知进度
-                    async with progress_lock:
-                        completed_count += 1
-                        progress_percent = min(completed_count / total_tasks * 100, 100)
-                        
-                        # 通知任务完成
-                        if progress_callback and result:
-                            status = "completed" if result.get("qa_pair") else "error"
-                            progress_callback(
-                                f"第{result.get('index', task_item['index'])}题: 完成 - {status.upper()} ({completed_count}/{total_tasks})", 
-                                progress_percent,
-                                task_id=task_item["task_id"],
-                                status="completed"
-                            )
-                            
-                        logger.debug(f"批量生成工作协程 {worker_id}: 完成第{task_item['index']}个实体 ({completed_count}/{total_tasks})")
-                        
-                except Exception as e:
-                    logger.error(f"批量生成工作协程 {worker_id} 处理任务失败: {e}")
-                    # 即使出错也要标记任务完成
-                    async with progress_lock:
-                        completed_count += 1
-                        progress_percent = min(completed_count / total_tasks * 100, 100)
-                        
-                        # 通知任务失败
-                        if progress_callback and task_item:
-                            progress_callback(
-                                f"第{task_item.get('index', '?')}题: 系统错误 ({completed_count}/{total_tasks})", 
-                                progress_percent,
-                                task_id=task_item.get("task_id", "unknown"),
-                                status="error"
-                            )
-        
-        # 启动工作协程
-        workers = [asyncio.create_task(worker(i)) for i in range(parallel_workers)]
-        
-        # 等待所有工作协程结束
-        await asyncio.gather(*workers, return_exceptions=True)
-        
-        # 过滤掉None结果并确保连续性
+                    # 发送单个结果
+                    socketio.emit('batch_result', result)
+                
+                # 更新完成计数并通知进度
+                completed_count += 1
+                progress_percent = min(completed_count / total_tasks * 100, 100)
+                
+                # 通知任务完成
+                if result:
+                    status = "completed" if result.get("qa_pair") else "error"
+                    progress_callback(
+                        f"第{result.get('index', task_item['index'])}题: 完成 - {status.upper()} ({completed_count}/{total_tasks})", 
+                        progress_percent,
+                        task_id=task_item["task_id"],
+                        status="completed"
+                    )
+                    
+                logger.debug(f"批量生成: 完成第{task_item['index']}个实体 ({completed_count}/{total_tasks})")
+                
+            except Exception as e:
+                logger.error(f"批量生成处理第{task_item['index']}个实体失败: {e}")
+                # 即使出错也要标记任务完成
+                completed_count += 1
+                progress_percent = min(completed_count / total_tasks * 100, 100)
+                
+                # 通知任务失败
+                progress_callback(
+                    f"第{task_item['index']}题: 系统错误 ({completed_count}/{total_tasks})", 
+                    progress_percent,
+                    task_id=task_item["task_id"],
+                    status="error"
+                )
+        
+        # 所有任务直接并发调度，由信号量限制同时运行的数量
+        await asyncio.gather(*[
+            run_task({
+                "index": i + 1,
+                "array_index": i,
+                "entity": entity,
+                "task_id": f"task_{i + 1}"
+            })
+            for i, entity in enumerate(entities)
+        ], return_exceptions=True)
+        
+        # 过滤掉None结果；results按array_index预分配，过滤后即保持输入顺序，无需再排序
         valid_results = [r for r in results if r is not None]
         
         # 验证结果完整性
         if len(valid_results) != total_tasks:
             logger.warning(f"批量生成结果数量不匹配: 期望{total_tasks}个，实际{len(valid_results)}个")
         
-        # 按索引排序结果
-        valid_results.sort(key=lambda x: x.get("initial_entity", ""))
-        
         return valid_results
         
     except Exception as e:
         logger.error(f"异步批量生成过程出错: {e}")
         return []
 
-async def async_evaluation_process(evaluation_id, config):
-    """异步评测过程"""
+async def async_evaluation_process(evaluation_id, config, cancel_event=None):
+    """异步评测过程（cancel_event 被设置后不再开始新的题目，返回 None）"""
     from lib.trace_manager import TraceManager, start_trace
     
     # 继承或创建trace
@@ -1942,22 +2645,14 @@ async def async_evaluation_process(evaluation_id, config):
         logger.info(f"开始评测，评测ID: {evaluation_id}, 数据集: {dataset_id}, 模式: {evaluation_mode}")
         
         # 确定数据集文件路径
-        standard_path = f'evaluation_data/standard_datasets/{dataset_id}'
-        generated_path = f'evaluation_data/generated_datasets/{dataset_id}'
-        
-        dataset_path = None
-        if os.path.exists(standard_path):
-            dataset_path = standard_path
-        elif os.path.exists(generated_path):
-            dataset_path = generated_path
-        else:
+        dataset_path = resolve_dataset_path(dataset_id)
+        if not dataset_path:
             raise ValueError(f"找不到数据集文件: {dataset_id}")
             
-        # 计算总任务数
+        # 计算总任务数（在共享的IO线程池中统计非空行数，不阻塞事件循环）
         total_tasks = 0
         try:
-            with open(dataset_path, 'r', encoding='utf-8') as f:
-                total_tasks = sum(1 for line in f if line.strip())
+            total_tasks = await asyncio.get_running_loop().run_in_executor(IO_POOL, count_jsonl_lines, dataset_path)
         except Exception as e:
             logger.error(f"计算任务总数失败: {e}")
             total_tasks = 0
@@ -1980,7 +2675,7 @@ async def async_evaluation_process(evaluation_id, config):
             if status:
                 progress_data['status'] = status
                 
-            socketio.emit('evaluation_progress', progress_data)
+            emit_progress('evaluation_progress', progress_data)
         
         # 执行评测
         dataset_name = dataset_id.replace('.jsonl', '')
@@ -1990,7 +2685,8 @@ async def async_evaluation_process(evaluation_id, config):
             dataset_name=dataset_name,
             mode=evaluation_mode,
             progress_callback=progress_callback,
-            batch_size=batch_size
+            batch_size=batch_size,
+            cancel_event=cancel_event
         )
         
         # 将total_tasks信息传递给前端
@@ -2002,8 +2698,8 @@ async def async_evaluation_process(evaluation_id, config):
         logger.error(f"异步评测过程出错: {e}")
         raise
 
-async def async_comparison_process(comparison_id, config):
-    """异步对比评测过程"""
+async def async_comparison_process(comparison_id, config, cancel_event=None):
+    """异步对比评测过程（cancel_event 被设置后停止开始新的对比，返回 None）"""
     try:
         from lib.comparison_evaluator import ComparisonEvaluator
         
@@ -2027,10 +2723,10 @@ async def async_comparison_process(comparison_id, config):
             if details:
                 progress_data['details'] = details
                 
-            socketio.emit('comparison_progress', progress_data)
+            emit_progress('comparison_progress', progress_data)
         
         # 执行对比评测
-        result = await evaluator.compare_datasets(config, progress_callback)
+        result = await evaluator.compare_datasets(config, progress_callback, cancel_event)
         
         return result
         
@@ -2046,10 +2742,19 @@ runs_qa_generator = RunsQAGenerator()
 def list_runs():
     """获取所有可用的运行记录"""
     try:
-        runs = runs_qa_generator.list_available_runs()
+        runs = run_io(runs_qa_generator.list_available_runs)
+        total = len(runs)
+        # 可选分页：?offset=&limit=，未指定limit时返回全部
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = request.args.get('limit', type=int)
+        if limit is not None:
+            runs = runs[offset:offset + max(limit, 0)]
+        elif offset:
+            runs = runs[offset:]
         return jsonify({
             'success': True,
-            'runs': runs
+            'runs': runs,
+            'total': total
         })
     except Exception as e:
         logger.error(f"获取运行记录列表失败: {e}")
@@ -2074,6 +2779,24 @@ def get_run_graph(run_id):
             'error': str(e)
         }), 500
 
+# 进行中的Runs QA任务：task_id -> 线程池Future（任务结束后自动移除）
+runs_qa_tasks: Dict[str, concurrent.futures.Future] = {}
+# 已开始执行的Runs QA任务：task_id -> (事件循环, asyncio任务)，用于从请求线程取消
+runs_qa_running: Dict[str, tuple] = {}
+runs_qa_lock = threading.Lock()
+
+def run_runs_qa_coroutine(task_id, coro):
+    """在工作线程复用的事件循环中运行Runs QA协程，运行期间登记以便取消"""
+    loop = get_worker_loop()
+    task = loop.create_task(coro)
+    with runs_qa_lock:
+        runs_qa_running[task_id] = (loop, task)
+    try:
+        return loop.run_until_complete(task)
+    finally:
+        with runs_qa_lock:
+            runs_qa_running.pop(task_id, None)
+
 @app.route('/api/runs/generate-qa', methods=['POST'])
 def generate_qa_from_runs():
     """从运行记录生成QA（支持QPS限制）"""
@@ -2083,7 +2806,9 @@ def generate_qa_from_runs():
         # 启动trace
         trace_id = start_trace(prefix="runs")
         
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         run_ids = data.get('run_ids', [])
         sample_size = data.get('sample_size', 10)
         sampling_algorithm = data.get('sampling_algorithm', 'mixed')
@@ -2101,7 +2826,7 @@ def generate_qa_from_runs():
             }), 400
         
         # 启动异步任务
-        task_id = f"runs_qa_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        task_id = make_task_id('runs_qa')
         
         def generate_qa_task():
             try:
@@ -2116,7 +2841,7 @@ def generate_qa_from_runs():
                 if len(run_ids) == 1:
                     # 单个运行记录
                     progress_callback("正在处理单个运行记录...", 10)
-                    results = asyncio.run(runs_qa_generator.generate_qa_from_run(
+                    results = run_runs_qa_coroutine(task_id, runs_qa_generator.generate_qa_from_run(
                         run_id=run_ids[0],
                         sample_size=sample_size,
                         sampling_algorithm=sampling_algorithm,
@@ -2140,7 +2865,7 @@ def generate_qa_from_runs():
                     # 多个运行记录 - 使用QPS限制
                     progress_callback(f"开始批量处理 {len(run_ids)} 个记录（QPS限制: {qps_limit}）...", 5)
                     
-                    results = asyncio.run(runs_qa_generator.batch_generate_from_multiple_runs_with_qps_limit(
+                    results = run_runs_qa_coroutine(task_id, runs_qa_generator.batch_generate_from_multiple_runs_with_qps_limit(
                         run_ids=run_ids,
                         sample_size=sample_size,
                         sampling_algorithm=sampling_algorithm,
@@ -2169,6 +2894,13 @@ def generate_qa_from_runs():
                         'qa_results': all_results  # 包含实际的QA内容
                     })
                     
+            except asyncio.CancelledError:
+                logger.info(f"Runs QA生成任务已取消: {task_id}")
+                socketio.emit('runs_qa_complete', {
+                    'task_id': task_id,
+                    'success': False,
+                    'error': '任务已取消'
+                })
             except Exception as e:
                 logger.error(f"Runs QA生成任务失败: {e}")
                 socketio.emit('runs_qa_complete', {
@@ -2177,9 +2909,10 @@ def generate_qa_from_runs():
                     'error': str(e)
                 })
         
-        # 在后台线程中运行
-        thread = threading.Thread(target=generate_qa_task)
-        thread.start()
+        # 提交到任务线程池运行，登记Future以便取消
+        with runs_qa_lock:
+            future = runs_qa_tasks[task_id] = BUILD_POOL.submit(generate_qa_task)
+        future.add_done_callback(lambda _: runs_qa_tasks.pop(task_id, None))
         
         return jsonify({
             'success': True,
@@ -2194,17 +2927,104 @@ def generate_qa_from_runs():
             'error': str(e)
         }), 500
 
+@app.route('/api/runs/cancel/<task_id>', methods=['POST'])
+def cancel_runs_qa(task_id):
+    """取消Runs QA生成任务：尚未开始的直接从线程池移除，运行中的取消其asyncio任务"""
+    with runs_qa_lock:
+        future = runs_qa_tasks.get(task_id)
+        running = runs_qa_running.get(task_id)
+    
+    if future is None:
+        return jsonify({'success': False, 'error': '任务不存在或已结束'}), 404
+    
+    if future.cancel():
+        # 任务尚未开始执行，不会再发送完成事件，这里直接通知前端
+        socketio.emit('runs_qa_complete', {
+            'task_id': task_id,
+            'success': False,
+            'error': '任务已取消'
+        })
+    elif running:
+        loop, task = running
+        loop.call_soon_threadsafe(task.cancel)
+    
+    return jsonify({'success': True, 'task_id': task_id, 'message': '已请求取消任务'})
+
+# QA结果文件生成后不再修改，允许浏览器缓存一小段时间；过期后凭ETag/Last-Modified条件请求，未变化时返回304
+QA_OUTPUT_MAX_AGE = 60
+
 @app.route('/qa_output/<filename>')
 def download_qa_file(filename):
     """下载QA结果文件"""
     try:
-        return send_from_directory('qa_output', filename, as_attachment=True)
+        return send_from_directory('qa_output', filename, as_attachment=True,
+                                   conditional=True, max_age=QA_OUTPUT_MAX_AGE)
     except Exception as e:
         logger.error(f"下载文件失败: {e}")
         return jsonify({'error': '文件不存在或无法访问'}), 404
 
 
 # 数据管理相关API
+# 数据条目的必要字段及默认值（reasoning_path 缺失时取 reasoning，单独处理）
+DATA_ITEM_DEFAULTS = {
+    'question': '',
+    'answer': '',
+    'mapped_reasoning_path': '',
+    'question_language': 'unknown',
+    'answer_language': 'unknown'
+}
+
+# 数据文件解析缓存：路径 -> (修改时间, 大小, 解析结果)，按最近使用顺序排列；
+# 缓存文件的总字节数不超过 KG_PARSE_CACHE_MB，超过上限的单个文件不缓存
+PARSE_CACHE_MAX_BYTES = int(os.getenv('KG_PARSE_CACHE_MB', '64')) * 1024 * 1024
+parsed_data_cache = OrderedDict()
+parsed_data_cache_bytes = 0
+parsed_data_cache_lock = Lock()
+
+def parse_data_file(file_path, mtime_ns, size):
+    """解析JSONL数据文件并补齐必要字段，文件未变化时使用缓存；返回的列表只读，不可修改"""
+    global parsed_data_cache_bytes
+    with parsed_data_cache_lock:
+        cached = parsed_data_cache.get(file_path)
+        if cached and cached[0] == mtime_ns and cached[1] == size:
+            parsed_data_cache.move_to_end(file_path)
+            return cached[2]
+    
+    data = read_data_file(file_path)
+    
+    with parsed_data_cache_lock:
+        # 同一路径只保留最新版本
+        old = parsed_data_cache.pop(file_path, None)
+        if old:
+            parsed_data_cache_bytes -= old[1]
+        if size <= PARSE_CACHE_MAX_BYTES:
+            parsed_data_cache[file_path] = (mtime_ns, size, data)
+            parsed_data_cache_bytes += size
+            # 超出总字节上限时淘汰最久未使用的文件
+            while parsed_data_cache_bytes > PARSE_CACHE_MAX_BYTES:
+                _, (_, evicted_size, _) = parsed_data_cache.popitem(last=False)
+                parsed_data_cache_bytes -= evicted_size
+    return data
+
+def read_data_file(file_path):
+    """逐行解析JSONL数据文件并补齐必要字段"""
+    data = []
+    # 以字节读取，直接交给JSON解析器，省去逐行解码和strip
+    with open(file_path, 'rb') as f:
+        for line_num, line in enumerate(f, 1):
+            if line.isspace():
+                continue
+            try:
+                item = json_loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"跳过无效JSON行 {line_num}: {e}")
+                continue
+            if 'reasoning_path' not in item:
+                item['reasoning_path'] = item.get('reasoning', '')
+            # 一次字典合并补齐其余必要字段（已有字段覆盖默认值）
+            data.append({**DATA_ITEM_DEFAULTS, **item})
+    return data
+
 @app.route('/api/data_management/load/<filename>')
 def load_data_file(filename):
     """加载数据文件，支持从多个目录查找"""
@@ -2231,39 +3051,16 @@ def load_data_file(filename):
         if not file_path:
             return jsonify({'success': False, 'error': '文件不存在'}), 404
         
-        # 读取文件数据
-        data = []
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                if line.strip():
-                    try:
-                        item = json.loads(line.strip())
-                        # 确保必要字段存在
-                        if 'question' not in item:
-                            item['question'] = ''
-                        if 'answer' not in item:
-                            item['answer'] = ''
-                        if 'reasoning_path' not in item:
-                            item['reasoning_path'] = item.get('reasoning', '')
-                        if 'mapped_reasoning_path' not in item:
-                            item['mapped_reasoning_path'] = ''
-                        if 'question_language' not in item:
-                            item['question_language'] = 'unknown'
-                        if 'answer_language' not in item:
-                            item['answer_language'] = 'unknown'
-                        
-                        data.append(item)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"跳过无效JSON行 {line_num}: {e}")
-                        continue
+        # 读取文件数据（文件未变化时直接使用缓存的解析结果）
+        file_stats = os.stat(file_path)
+        data = run_io(parse_data_file, file_path, file_stats.st_mtime_ns, file_stats.st_size)
         
         # 获取文件信息
-        file_stats = os.stat(file_path)
         file_info = {
             'filename': filename,
             'count': len(data),
             'size': file_stats.st_size,
-            'modified_time': datetime.fromtimestamp(file_stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+            'modified_time': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(file_stats.st_mtime)),
             'directory': os.path.dirname(file_path)
         }
         
@@ -2281,7 +3078,9 @@ def load_data_file(filename):
 def detect_languages():
     """检测问题和答案的语言"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         filename = data.get('filename')
         items = data.get('data', [])
         
@@ -2291,37 +3090,128 @@ def detect_languages():
         logger.info(f"开始语言检测，共 {len(items)} 条数据")
         
         # 先使用简单检测，如果用户需要LLM检测可以单独调用
-        results = []
+        # 条目来自本次请求体，直接原地写入检测结果，不再逐条复制字典
         for item in items:
-            question = item.get('question', '')
-            answer = item.get('answer', '')
-            
-            # 使用简单规则检测语言
-            question_lang = detect_language_simple(question)
-            answer_lang = detect_language_simple(answer)
-            
-            results.append({
-                **item,
-                'question_language': question_lang,
-                'answer_language': answer_lang
-            })
+            item['question_language'] = detect_language_simple(item.get('question', ''))
+            item['answer_language'] = detect_language_simple(item.get('answer', ''))
         
-        logger.info(f"语言检测完成，处理了 {len(results)} 条数据")
+        logger.info(f"语言检测完成，处理了 {len(items)} 条数据")
         
         return jsonify({
             'success': True,
-            'data': results
+            'data': items
         })
         
     except Exception as e:
         logger.error(f"语言检测失败: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# LLM语言检测支持的语言代码
+VALID_LANGUAGE_CODES = frozenset(['zh', 'en', 'ja', 'ko', 'fr', 'de', 'es', 'it', 'pt', 'ru', 'ar', 'hi', 'th', 'vi', 'unknown'])
+
+LANGUAGE_DETECTION_INSTRUCTIONS = """
+请为每个索引返回语言检测结果，格式如下：
+[
+  {"index": 0, "question_language": "语言代码", "answer_language": "语言代码"},
+  {"index": 1, "question_language": "语言代码", "answer_language": "语言代码"}
+]
+
+请使用ISO 639-1语言代码，支持的语言包括：
+- zh: 中文 (Chinese)
+- en: 英文 (English)
+- ja: 日文 (Japanese)
+- ko: 韩文 (Korean)
+- fr: 法文 (French)
+- de: 德文 (German)
+- es: 西班牙文 (Spanish)
+- it: 意大利文 (Italian)
+- pt: 葡萄牙文 (Portuguese)
+- ru: 俄文 (Russian)
+- ar: 阿拉伯文 (Arabic)
+- hi: 印地文 (Hindi)
+- th: 泰文 (Thai)
+- vi: 越南文 (Vietnamese)
+- unknown: 实在无法确定的语言
+
+只返回JSON数组，不要其他文字。"""
+
+# LLM语言检测结果的持久化缓存（每行 {"key": 文本哈希, "language": 语言代码}，只追加）
+LANGUAGE_CACHE_FILE = 'evaluation_data/.lang_cache.jsonl'
+language_cache_lock = Lock()
+
+def language_cache_key(text):
+    """文本的缓存键（blake2b 8字节摘要）"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+@lru_cache(maxsize=1)
+def get_llm_language_cache():
+    """首次使用时从缓存文件加载LLM语言检测结果（文本哈希 -> 语言代码）"""
+    cache = {}
+    try:
+        with open(LANGUAGE_CACHE_FILE, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json_loads(line)
+                    cache[entry['key']] = entry['language']
+                except (ValueError, KeyError, TypeError):
+                    continue
+    except FileNotFoundError:
+        pass
+    return cache
+
+def store_llm_languages(text_languages):
+    """记录LLM检测出的 (文本, 语言代码) 并追加到缓存文件；已缓存的文本跳过"""
+    cache = get_llm_language_cache()
+    with language_cache_lock:
+        new_entries = {}
+        for text, language in text_languages:
+            key = language_cache_key(text)
+            if cache.get(key) != language:
+                cache[key] = new_entries[key] = language
+        if not new_entries:
+            return
+        try:
+            os.makedirs(os.path.dirname(LANGUAGE_CACHE_FILE), exist_ok=True)
+            with open(LANGUAGE_CACHE_FILE, 'a', encoding='utf-8') as f:
+                f.writelines(json_dumps({'key': key, 'language': language}) + '\n'
+                             for key, language in new_entries.items())
+        except OSError as e:
+            logger.warning(f"写入语言检测缓存失败: {e}")
+
+# LLM语言检测同时进行的请求数上限（请求中未指定 llm_concurrency 时使用）
+LANG_DETECT_CONCURRENCY = int(os.getenv('LANG_DETECT_CONCURRENCY', '8'))
+
+def pack_detection_batches(batch_texts, max_tokens):
+    """按估算的token数（约4字符1个token）贪心打包检测条目，每批尽量接近上限；单条超限时独占一批"""
+    batch = []
+    batch_tokens = 0
+    for text_item in batch_texts:
+        estimated = (len(text_item['question']) + len(text_item['answer'])) // 4 + 40
+        if batch and batch_tokens + estimated > max_tokens:
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(text_item)
+        batch_tokens += estimated
+    if batch:
+        yield batch
+
+def build_language_detection_prompt(batch):
+    """构建一批文本的语言检测prompt"""
+    prompt_parts = ["请检测以下批量文本的语言类型，返回JSON数组格式：\n"]
+    for text_item in batch:
+        prompt_parts.append(f"[{text_item['index']}] 问题: {text_item['question']}")
+        prompt_parts.append(f"[{text_item['index']}] 答案: {text_item['answer']}\n")
+    prompt_parts.append(LANGUAGE_DETECTION_INSTRUCTIONS)
+    return '\n'.join(prompt_parts)
+
 @app.route('/api/data_management/detect_languages_llm', methods=['POST'])
 def detect_languages_llm():
     """使用LLM检测问题和答案的语言(高精度但较慢)"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         items = data.get('data', [])
         
         if not items:
@@ -2331,254 +3221,190 @@ def detect_languages_llm():
         
         # 批量检测语言
         from lib.llm_client import LLMClient
+        from lib.runs_qa_generator import AsyncRateLimiter
         llm_client = LLMClient()
         
-        # 准备批量检测的文本
+        # 准备批量检测的文本：问题和答案都已有LLM缓存结果或能由简单规则确定语言的条目不送LLM，直接写入结果
+        # （条目来自本次请求体，检测结果直接原地写入）
+        language_cache = get_llm_language_cache()
+        cached_count = 0
         batch_texts = []
         for i, item in enumerate(items):
             question = item.get('question', '')
             answer = item.get('answer', '')
+            question_cached = language_cache.get(language_cache_key(question)) if question else None
+            answer_cached = language_cache.get(language_cache_key(answer)) if answer else None
+            if ((question_cached or is_language_obvious(question))
+                    and (answer_cached or is_language_obvious(answer))):
+                if question_cached or answer_cached:
+                    cached_count += 1
+                item['question_language'] = question_cached or detect_language_simple(question)
+                item['answer_language'] = answer_cached or detect_language_simple(answer)
+                continue
             
             # 截取文本避免token过多，每个字段最多500字符
-            question_sample = question[:500] if question else ''
-            answer_sample = answer[:500] if answer else ''
-            
             batch_texts.append({
                 'index': i,
-                'question': question_sample,
-                'answer': answer_sample
+                'question': question[:500] if question else '',
+                'answer': answer[:500] if answer else ''
             })
         
-        # 创建批量语言检测的prompt
-        prompt_parts = ["请检测以下批量文本的语言类型，返回JSON数组格式：\n"]
+        # 按token估算打包成若干批，每批一次LLM调用；多批之间并发请求（可限制并发数和QPS）
+        batches = list(pack_detection_batches(batch_texts, int(data.get('max_batch_tokens', 12000))))
+        concurrency = int(data.get('llm_concurrency', LANG_DETECT_CONCURRENCY))
+        qps_limit = float(data.get('qps_limit', 0))
         
-        for text_item in batch_texts:
-            prompt_parts.append(f"[{text_item['index']}] 问题: {text_item['question']}")
-            prompt_parts.append(f"[{text_item['index']}] 答案: {text_item['answer']}\n")
+        async def detect_batch(batch, semaphore, rate_limiter):
+            """检测一批文本，解析失败时返回空列表（该批条目回退到简单检测）"""
+            try:
+                async with semaphore:
+                    if rate_limiter:
+                        await rate_limiter.acquire()
+                    response = await llm_client.generate_response(build_language_detection_prompt(batch))
+                
+                # 提取JSON部分
+                return extract_json_array(response)
+            except json.JSONDecodeError as e:
+                logger.warning(f"LLM返回非JSON格式，该批 {len(batch)} 条回退到简单检测: {e}")
+            except Exception as e:
+                logger.error(f"LLM调用失败，该批 {len(batch)} 条回退到简单检测: {e}")
+            return []
         
-        prompt_parts.append("""
-请为每个索引返回语言检测结果，格式如下：
-[
-  {"index": 0, "question_language": "语言代码", "answer_language": "语言代码"},
-  {"index": 1, "question_language": "语言代码", "answer_language": "语言代码"}
-]
-
-请使用ISO 639-1语言代码，支持的语言包括：
-- zh: 中文 (Chinese)
-- en: 英文 (English)
-- ja: 日文 (Japanese)
-- ko: 韩文 (Korean)
-- fr: 法文 (French)
-- de: 德文 (German)
-- es: 西班牙文 (Spanish)
-- it: 意大利文 (Italian)
-- pt: 葡萄牙文 (Portuguese)
-- ru: 俄文 (Russian)
-- ar: 阿拉伯文 (Arabic)
-- hi: 印地文 (Hindi)
-- th: 泰文 (Thai)
-- vi: 越南文 (Vietnamese)
-- unknown: 实在无法确定的语言
-
-只返回JSON数组，不要其他文字。""")
+        async def start_detection():
+            # 信号量和限速器在事件循环内创建
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+            rate_limiter = AsyncRateLimiter(qps_limit) if qps_limit > 0 else None
+            return {asyncio.create_task(detect_batch(batch, semaphore, rate_limiter)) for batch in batches}
         
-        full_prompt = '\n'.join(prompt_parts)
+        async def detect_all():
+            return await asyncio.gather(*await start_detection())
         
-        # 检查prompt长度
-        if len(full_prompt) > 150000:
-            # 如果prompt太长，分批处理
-            return process_large_batch_detection(items, llm_client)
+        # 送检且尚未得到结果的条目索引，以及需要写入缓存的LLM检测结果
+        pending_indices = {text_item['index'] for text_item in batch_texts}
+        new_languages = []
         
-        try:
-            import asyncio
-            response = asyncio.run(llm_client.generate_response(full_prompt))
-            logger.info(f"LLM语言检测响应长度: {len(response)}")
-            
-            # 尝试解析JSON响应
-            try:
-                # 提取JSON部分
-                json_start = response.find('[')
-                json_end = response.rfind(']') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    detection_results = json.loads(json_str)
-                else:
-                    raise json.JSONDecodeError("未找到有效的JSON数组", response, 0)
-                
-                # 创建结果字典
-                results_dict = {}
-                for result in detection_results:
-                    if isinstance(result, dict) and 'index' in result:
-                        results_dict[result['index']] = result
-                
-                # 组装最终结果
-                results = []
-                for i, item in enumerate(items):
-                    if i in results_dict:
-                        result = results_dict[i]
-                        question_lang = result.get('question_language', 'unknown')
-                        answer_lang = result.get('answer_language', 'unknown')
-                        
-                        # 验证语言代码
-                        valid_langs = ['zh', 'en', 'ja', 'ko', 'fr', 'de', 'es', 'it', 'pt', 'ru', 'ar', 'hi', 'th', 'vi', 'unknown']
-                        if question_lang not in valid_langs:
-                            question_lang = 'unknown'
-                        if answer_lang not in valid_langs:
-                            answer_lang = 'unknown'
-                            
-                        results.append({
-                            **item,
-                            'question_language': question_lang,
-                            'answer_language': answer_lang
-                        })
-                    else:
-                        # 如果LLM没有返回这个索引的结果，使用简单检测
-                        results.append({
-                            **item,
-                            'question_language': detect_language_simple(item.get('question', '')),
-                            'answer_language': detect_language_simple(item.get('answer', ''))
-                        })
+        def apply_detection_results(detection_results):
+            """把一批LLM检测结果写入对应条目（只接受本次送检且尚未写入的索引），返回写入的索引"""
+            applied = []
+            for result in detection_results:
+                if not isinstance(result, dict) or result.get('index') not in pending_indices:
+                    continue
+                i = result['index']
+                pending_indices.discard(i)
+                item = items[i]
+                question_lang = result.get('question_language', 'unknown')
+                answer_lang = result.get('answer_language', 'unknown')
                 
-                logger.info(f"LLM语言检测完成，处理了 {len(results)} 条数据")
+                # 验证语言代码
+                if question_lang not in VALID_LANGUAGE_CODES:
+                    question_lang = 'unknown'
+                if answer_lang not in VALID_LANGUAGE_CODES:
+                    answer_lang = 'unknown'
                 
-                return jsonify({
-                    'success': True,
-                    'data': results
+                item['question_language'] = question_lang
+                item['answer_language'] = answer_lang
+                if item.get('question') and question_lang != 'unknown':
+                    new_languages.append((item['question'], question_lang))
+                if item.get('answer') and answer_lang != 'unknown':
+                    new_languages.append((item['answer'], answer_lang))
+                applied.append(i)
+            return applied
+        
+        def apply_simple_fallback():
+            """LLM没有返回结果的条目使用简单检测，返回写入的索引"""
+            applied = sorted(pending_indices)
+            for i in applied:
+                items[i]['question_language'] = detect_language_simple(items[i].get('question', ''))
+                items[i]['answer_language'] = detect_language_simple(items[i].get('answer', ''))
+            pending_indices.clear()
+            if new_languages:
+                store_llm_languages(new_languages)
+            return applied
+        
+        logger.info(f"LLM语言检测: {cached_count} 条命中缓存，{len(items) - cached_count - len(batch_texts)} 条由简单规则确定，"
+                    f"其余 {len(batch_texts)} 条分为 {len(batches)} 批请求")
+        
+        if data.get('stream'):
+            # 流式模式：每行输出一条 {"index", "question_language", "answer_language"}（NDJSON），
+            # 已确定的条目立即输出，各批LLM结果完成一批输出一批，最后一行为 {"done": true}
+            def item_line(i):
+                return json_dumps_line({
+                    'index': i,
+                    'question_language': items[i]['question_language'],
+                    'answer_language': items[i]['answer_language']
                 })
+            
+            def generate():
+                for i in range(len(items)):
+                    if i not in pending_indices:
+                        yield item_line(i)
                 
-            except json.JSONDecodeError as e:
-                logger.warning(f"LLM返回非JSON格式，回退到简单检测: {e}")
-                # 如果LLM返回的不是有效JSON，回退到简单检测
-                results = []
-                for item in items:
-                    results.append({
-                        **item,
-                        'question_language': detect_language_simple(item.get('question', '')),
-                        'answer_language': detect_language_simple(item.get('answer', ''))
-                    })
-                
-                return jsonify({
-                    'success': True,
-                    'data': results
-                })
+                loop = asyncio.new_event_loop()
+                running = set()
+                try:
+                    running = loop.run_until_complete(start_detection()) if batches else set()
+                    while running:
+                        done, running = loop.run_until_complete(
+                            asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                        )
+                        for task in done:
+                            for i in apply_detection_results(task.result()):
+                                yield item_line(i)
+                finally:
+                    # 客户端中途断开时取消剩余的LLM请求
+                    for task in running:
+                        task.cancel()
+                    if running:
+                        loop.run_until_complete(asyncio.gather(*running, return_exceptions=True))
+                    loop.close()
                 
-        except Exception as e:
-            logger.error(f"LLM调用失败: {e}")
-            # 发生错误时回退到简单检测
-            results = []
-            for item in items:
-                results.append({
-                    **item,
-                    'question_language': detect_language_simple(item.get('question', '')),
-                    'answer_language': detect_language_simple(item.get('answer', ''))
-                })
+                for i in apply_simple_fallback():
+                    yield item_line(i)
+                logger.info(f"LLM语言检测完成，处理了 {len(items)} 条数据")
+                yield json_dumps_line({'done': True, 'success': True, 'count': len(items)})
             
-            return jsonify({
-                'success': True,
-                'data': results
-            })
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        for detection_results in (asyncio.run(detect_all()) if batches else []):
+            apply_detection_results(detection_results)
+        apply_simple_fallback()
+        
+        logger.info(f"LLM语言检测完成，处理了 {len(items)} 条数据")
+        
+        return jsonify({
+            'success': True,
+            'data': items
+        })
         
     except Exception as e:
         logger.error(f"LLM语言检测失败: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
-def process_large_batch_detection(items, llm_client):
-    """处理大批量数据的语言检测"""
-    import asyncio
-    
-    async def detect_single_item(item):
-        """检测单个条目的语言"""
-        try:
-            question = item.get('question', '')
-            answer = item.get('answer', '')
-            
-            # 截取文本避免token过多
-            question_sample = question[:500] if question else ''
-            answer_sample = answer[:500] if answer else ''
-            
-            # 创建单个检测的prompt
-            prompt = f"""请检测以下文本的语言类型：
-
-问题文本: {question_sample}
-答案文本: {answer_sample}
-
-请判断每个文本的主要语言，只返回以下格式的JSON：
-{{"question_language": "语言代码", "answer_language": "语言代码"}}
-
-请使用ISO 639-1语言代码，支持的语言包括：
-- zh: 中文 (Chinese)
-- en: 英文 (English)
-- ja: 日文 (Japanese)
-- ko: 韩文 (Korean)
-- fr: 法文 (French)
-- de: 德文 (German)
-- es: 西班牙文 (Spanish)
-- it: 意大利文 (Italian)
-- pt: 葡萄牙文 (Portuguese)
-- ru: 俄文 (Russian)
-- ar: 阿拉伯文 (Arabic)
-- hi: 印地文 (Hindi)
-- th: 泰文 (Thai)
-- vi: 越南文 (Vietnamese)
-- unknown: 实在无法确定的语言"""
-            
-            response = await llm_client.generate_response(prompt)
-            
-            try:
-                # 提取JSON部分
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    result = json.loads(json_str)
-                    
-                    question_lang = result.get('question_language', 'unknown')
-                    answer_lang = result.get('answer_language', 'unknown')
-                    
-                    # 验证语言代码
-                    valid_langs = ['zh', 'en', 'ja', 'ko', 'fr', 'de', 'es', 'it', 'pt', 'ru', 'ar', 'hi', 'th', 'vi', 'unknown']
-                    if question_lang not in valid_langs:
-                        question_lang = 'unknown'
-                    if answer_lang not in valid_langs:
-                        answer_lang = 'unknown'
-                    
-                    return {
-                        **item,
-                        'question_language': question_lang,
-                        'answer_language': answer_lang
-                    }
-                else:
-                    raise json.JSONDecodeError("未找到有效的JSON", response, 0)
-                    
-            except json.JSONDecodeError:
-                # 回退到简单检测
-                return {
-                    **item,
-                    'question_language': detect_language_simple(question),
-                    'answer_language': detect_language_simple(answer)
-                }
-                
-        except Exception as e:
-            logger.error(f"单个项目检测失败: {e}")
-            return {
-                **item,
-                'question_language': detect_language_simple(item.get('question', '')),
-                'answer_language': detect_language_simple(item.get('answer', ''))
-            }
-    
-    async def process_all():
-        tasks = [detect_single_item(item) for item in items]
-        return await asyncio.gather(*tasks)
-    
-    results = asyncio.run(process_all())
-    
-    return jsonify({
-        'success': True,
-        'data': results
-    })
+# 语言检测字符映射表：中文字符（包括中文标点和全角字符）映射为 \x01，ASCII英文字母映射为 \x02，
+# 文本中原有的 \x01/\x02 删除；一次 str.translate 后用 str.count 在C层完成统计
+CHINESE_CHAR_MARK = '\x01'
+ENGLISH_CHAR_MARK = '\x02'
+LANGUAGE_CHAR_TABLE = {
+    **{code: CHINESE_CHAR_MARK
+       for start, end in ((0x4e00, 0x9fff), (0x3000, 0x303f), (0xff00, 0xffef))
+       for code in range(start, end + 1)},
+    **{ord(char): ENGLISH_CHAR_MARK for char in string.ascii_letters},
+    ord(CHINESE_CHAR_MARK): None,
+    ord(ENGLISH_CHAR_MARK): None
+}
+ASCII_LETTER_BYTES = string.ascii_letters.encode('ascii')
+# 汉字以外的字母（假名、谚文、拉丁字母等）；含有它们的文本不能直接判定为中文
+NON_HAN_LETTER_PATTERN = re.compile(r'[^\W\d_\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+ASCII_WORD_PATTERN = re.compile(r'[A-Za-z]+')
+# 只在英文中常见的功能词，用于高置信度地判定纯ASCII文本为英文（避开 was/in/a 等与德语、西班牙语等重合的词）
+ENGLISH_MARKER_WORDS = frozenset({
+    'the', 'of', 'and', 'is', 'are', 'what', 'which', 'who', 'whom', 'whose', 'how', 'why',
+    'does', 'did', 'with', 'that', 'this', 'these', 'those', 'from', 'for', 'to', 'be',
+    'been', 'it', 'its', 'were', 'has', 'have', 'had', 'by', 'or', 'can', 'should', 'when', 'where'
+})
 
 def detect_language_simple(text):
-    """简单的语言检测函数"""
+    """简单的语言检测函数（字符统计都在C层完成，不按整段文本缓存，避免长答案常驻内存）"""
     if not text or len(text.strip()) == 0:
         return 'unknown'
     
@@ -2587,12 +3413,16 @@ def detect_language_simple(text):
     if len(text_clean) == 0:
         return 'unknown'
     
-    # 统计中文字符（包括中文标点）
-    chinese_count = sum(1 for char in text_clean if '\u4e00' <= char <= '\u9fff' or 
-                       '\u3000' <= char <= '\u303f' or '\uff00' <= char <= '\uffef')
-    
-    # 统计英文字母
-    english_count = sum(1 for char in text_clean if char.isalpha() and ord(char) < 128)
+    if text_clean.isascii():
+        # 纯ASCII文本（最常见的英文情况）不含中文，按字节删除字母后的长度差即为英文字母数
+        text_bytes = text_clean.encode('ascii')
+        chinese_count = 0
+        english_count = len(text_bytes) - len(text_bytes.translate(None, ASCII_LETTER_BYTES))
+    else:
+        # 一次映射后分别统计中文字符（包括中文标点）和英文字母
+        marked = text_clean.translate(LANGUAGE_CHAR_TABLE)
+        chinese_count = marked.count(CHINESE_CHAR_MARK)
+        english_count = marked.count(ENGLISH_CHAR_MARK)
     
     # 统计总字符数（排除空格和常见标点）
     total_chars = len(text_clean)
@@ -2603,7 +3433,8 @@ def detect_language_simple(text):
     chinese_ratio = chinese_count / total_chars
     english_ratio = english_count / total_chars
     
-    logger.debug(f"语言检测 - 文本长度: {total_chars}, 中文比例: {chinese_ratio:.2f}, 英文比例: {english_ratio:.2f}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"语言检测 - 文本长度: {total_chars}, 中文比例: {chinese_ratio:.2f}, 英文比例: {english_ratio:.2f}")
     
     # 调整阈值，提高检测准确性
     if chinese_ratio > 0.05:  # 如果中文字符超过5%
@@ -2613,11 +3444,32 @@ def detect_language_simple(text):
     else:
         return 'unknown'
 
+def is_language_obvious(text):
+    """文本为空、功能词明确的纯ASCII英文或只含汉字的中文时，简单检测的结果即可信，无需LLM判断
+
+    含假名、谚文或其他非汉字字母的文本（如日文、韩文），以及英文功能词不足的纯ASCII文本
+    （可能是西班牙语、德语等）仍交给LLM判断。
+    """
+    if not text or text.isspace():
+        return True
+    language = detect_language_simple(text)
+    if language == 'en':
+        if not text.isascii():
+            return False
+        words = ASCII_WORD_PATTERN.findall(text.lower())
+        marker_count = sum([word in ENGLISH_MARKER_WORDS for word in words])
+        return marker_count >= 2 and marker_count * 5 >= len(words)
+    if language == 'zh':
+        return NON_HAN_LETTER_PATTERN.search(text) is None
+    return False
+
 @app.route('/api/data_management/save', methods=['POST'])
 def save_data_file():
     """保存数据文件"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         filename = data.get('filename')
         items = data.get('data', [])
         
@@ -2650,14 +3502,16 @@ def save_data_file():
         # 创建备份
         if os.path.exists(file_path):
             backup_path = f'{file_path}.backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
-            import shutil
-            shutil.copy2(file_path, backup_path)
+            # 新数据通过原子替换写入新文件，原文件内容不会被改写，备份直接硬链接到原文件即可，无需复制
+            try:
+                os.link(file_path, backup_path)
+            except OSError:
+                import shutil
+                shutil.copy2(file_path, backup_path)
             logger.info(f"创建备份文件: {backup_path}")
         
         # 保存数据
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        write_jsonl(file_path, items)
         
         logger.info(f"数据文件已保存: {file_path}, 共 {len(items)} 条记录")
         
@@ -2674,7 +3528,9 @@ def save_data_file():
 def save_as_data_file():
     """另存为新数据文件"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         filename = data.get('filename')
         items = data.get('data', [])
         scope = data.get('scope', 'filtered')
@@ -2698,9 +3554,7 @@ def save_as_data_file():
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
         
         # 保存数据
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        write_jsonl(file_path, items)
         
         # 记录操作信息
         scope_desc = {
@@ -2729,7 +3583,9 @@ def save_as_data_file():
 def extract_entities():
     """从推理路径中提取实体和变量"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         reasoning_path = data.get('reasoning_path', '')
         
         if not reasoning_path:
@@ -2751,7 +3607,9 @@ def extract_entities():
 def replace_entities():
     """替换推理路径中的实体"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         reasoning_path = data.get('reasoning_path', '')
         entity_mapping = data.get('entity_mapping', {})
         
@@ -2771,51 +3629,60 @@ def replace_entities():
         logger.error(f"替换实体失败: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# 实体提取使用的正则（模块加载时编译一次）
+PROPER_NOUN_PATTERN = re.compile(r'\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*\b')
+BOLD_TEXT_PATTERN = re.compile(r'\*\*([^*]+)\*\*')
+YEAR_PATTERN = re.compile(r'\b(?:19|20)\d{2}\b')
+GEOGRAPHIC_NAME_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s*,\s*[A-Z][a-z]+)*\b')
+# 各模式分别扫描全文后取并集：同一段文字可同时作为专有名词、加粗内容和地名被提取
+ENTITY_PATTERNS = (PROPER_NOUN_PATTERN, BOLD_TEXT_PATTERN, YEAR_PATTERN, GEOGRAPHIC_NAME_PATTERN)
+
 def extract_entities_from_text(text):
     """从文本中提取可能的实体"""
-    import re
-    
-    entities = []
-    
-    # 1. 提取专有名词（大写字母开头的词）
-    proper_nouns = re.findall(r'\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*\b', text)
-    entities.extend(proper_nouns)
+    # 1. 专有名词、加粗内容、年份、地名/人名各扫描一次，按首次出现去重（过滤太短的）
+    entities = dict.fromkeys(
+        entity
+        for pattern in ENTITY_PATTERNS
+        for entity in pattern.findall(text)
+        if len(entity.strip()) > 2
+    )
     
-    # 2. 提取括号中的内容（通常是实体的具体名称）
-    parentheses_content = re.findall(r'\*\*([^*]+)\*\*', text)
-    entities.extend(parentheses_content)
-    
-    # 3. 提取年份
-    years = re.findall(r'\b(19|20)\d{2}\b', text)
-    entities.extend(years)
-    
-    # 4. 提取地名和人名的特殊模式
-    geographic_patterns = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s*,\s*[A-Z][a-z]+)*\b', text)
-    entities.extend(geographic_patterns)
-    
-    # 5. 去重并排序（按长度排序，长的在前面，避免替换时的冲突）
-    unique_entities = list(set(entities))
-    unique_entities = [e for e in unique_entities if len(e.strip()) > 2]  # 过滤太短的
-    unique_entities.sort(key=len, reverse=True)
+    # 2. 按长度排序（长的在前面，避免替换时的冲突），并统计每个实体在文本中的出现次数
+    entity_counts = count_entity_occurrences(text, entities)
+    return [
+        {
+            'entity': entity,
+            'count': entity_counts[entity],
+            'type': classify_entity_type(entity)
+        }
+        for entity in sorted(entities, key=len, reverse=True)
+    ]
+
+# 实体数达到该值且安装了pyahocorasick时，用Aho-Corasick自动机一次扫描统计全部实体
+AHOCORASICK_MIN_ENTITIES = 32
+
+def count_entity_occurrences(text, entities):
+    """统计每个实体在文本中不重叠出现的次数（与 str.count 结果一致）"""
+    if not AHOCORASICK_AVAILABLE or len(entities) < AHOCORASICK_MIN_ENTITIES:
+        return {entity: text.count(entity) for entity in entities}
     
-    # 6. 统计每个实体的出现次数
-    entity_info = []
-    for entity in unique_entities:
-        count = text.count(entity)
-        if count > 0:
-            entity_info.append({
-                'entity': entity,
-                'count': count,
-                'type': classify_entity_type(entity)
-            })
+    automaton = ahocorasick.Automaton()
+    for entity in entities:
+        automaton.add_word(entity, entity)
+    automaton.make_automaton()
     
-    return entity_info
+    counts = dict.fromkeys(entities, 0)
+    # 每个实体上一次计数的结束位置；与上一次重叠的匹配不计数，保持 str.count 的不重叠语义
+    last_end = {}
+    for end_index, entity in automaton.iter(text):
+        if end_index - len(entity) >= last_end.get(entity, -1):
+            counts[entity] += 1
+            last_end[entity] = end_index
+    return counts
 
 def classify_entity_type(entity):
     """简单分类实体类型"""
-    import re
-    
-    if re.match(r'\b(19|20)\d{2}\b', entity):
+    if YEAR_PATTERN.match(entity):
         return 'year'
     elif entity[0].isupper() and ' ' in entity:
         return 'proper_name'
@@ -2825,27 +3692,26 @@ def classify_entity_type(entity):
         return 'other'
 
 def replace_entities_in_text(text, entity_mapping):
-    """在文本中替换实体"""
-    import re
-    
-    new_text = text
-    
-    # 按长度倒序排列，确保先替换长的实体，避免部分匹配问题
-    sorted_entities = sorted(entity_mapping.items(), key=lambda x: len(x[0]), reverse=True)
-    
-    for old_entity, new_entity in sorted_entities:
-        if old_entity != new_entity and old_entity.strip() and new_entity.strip():
-            # 使用正则表达式进行精确匹配，避免部分匹配
-            pattern = re.escape(old_entity)
-            new_text = re.sub(pattern, new_entity, new_text)
+    """在文本中替换实体（所有实体合并为一个正则，一次扫描完成替换）"""
+    replacements = {
+        old_entity: new_entity
+        for old_entity, new_entity in entity_mapping.items()
+        if old_entity != new_entity and old_entity.strip() and new_entity.strip()
+    }
+    if not replacements:
+        return text
     
-    return new_text
+    # 按长度倒序排列，同一位置优先匹配长的实体，避免部分匹配问题
+    pattern = re.compile('|'.join(re.escape(entity) for entity in sorted(replacements, key=len, reverse=True)))
+    return pattern.sub(lambda match: replacements[match.group(0)], text)
 
 @app.route('/api/data_management/get_languages', methods=['POST'])
 def get_available_languages():
     """获取当前数据集中存在的语言列表"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         items = data.get('data', [])
         
         if not items:
@@ -2916,7 +3782,9 @@ def detect_domain_tags():
     注意：此接口已废弃，请使用 detect_folder_domain_tags 接口，该接口具有完整的标签管理功能
     """
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         items = data.get('data', [])
         existing_tags = data.get('existing_tags', [])
         
@@ -2952,7 +3820,9 @@ def detect_domain_tags():
 def detect_folder_domain_tags():
     """检测文件夹下所有JSONL文件的领域标签"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         folder_path = data.get('folder_path', '')
         force_reprocess = data.get('force_reprocess', False)
         
@@ -2984,6 +3854,12 @@ def detect_folder_domain_tags():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@lru_cache(maxsize=16)
+def read_domain_tags_info(info_file, mtime_ns, size):
+    """读取标签信息文件，按 (路径, 修改时间, 大小) 缓存；返回的字典只读，不可修改"""
+    with open(info_file, 'rb') as f:
+        return json_loads(f.read())
+
 @app.route('/api/data_management/get_domain_tags_info', methods=['GET'])
 def get_domain_tags_info():
     """获取领域标签信息"""
@@ -3010,8 +3886,8 @@ def get_domain_tags_info():
         if os.path.exists(info_file):
             logger.info("找到标签信息文件，正在读取...")
             try:
-                with open(info_file, 'r', encoding='utf-8') as f:
-                    info = json.load(f)
+                info_stat = os.stat(info_file)
+                info = read_domain_tags_info(info_file, info_stat.st_mtime_ns, info_stat.st_size)
                 logger.info(f"成功读取标签信息，包含 {len(info.get('tags', {}))} 个标签")
             except json.JSONDecodeError as e:
                 logger.error(f"标签信息文件格式错误: {e}")
@@ -3042,6 +3918,31 @@ def get_domain_tags_info():
         return jsonify({'success': False, 'error': f'服务器内部错误: {str(e)}'}), 500
 
 
+# 不超过该大小的标签文件一次性读入内存后按行切分，更大的文件逐行流式读取
+TAGGED_FILE_BULK_READ_LIMIT = 256 * 1024 * 1024
+
+def read_tagged_jsonl(file_path, filename):
+    """读取带标签的JSONL文件，为每条数据附加来源文件名和行号；格式错误的行记录警告后跳过"""
+    items = []
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= TAGGED_FILE_BULK_READ_LIMIT:
+            lines = f.read().split(b'\n')
+        else:
+            lines = f
+        for line_num, line in enumerate(lines, 1):
+            if not line or line.isspace():
+                continue
+            try:
+                item = json_loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"文件 {filename} 第 {line_num} 行JSON格式错误: {e}")
+                continue
+            # 添加文件信息
+            item['_source_file'] = filename
+            item['_line_number'] = line_num
+            items.append(item)
+    return items
+
 @app.route('/api/data_management/get_folder_data', methods=['GET'])
 def get_folder_data():
     """获取文件夹中的所有JSON数据"""
@@ -3074,28 +3975,20 @@ def get_folder_data():
             # 兼容旧版本，如果tagged目录不存在，还是从原目录查找
             search_dir = folder_path
             
-        for filename in os.listdir(search_dir):
-            if filename.endswith('_with_tags.jsonl'):
-                file_path = os.path.join(search_dir, filename)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        for line_num, line in enumerate(f, 1):
-                            line = line.strip()
-                            if line:
-                                try:
-                                    item = json.loads(line)
-                                    # 添加文件信息
-                                    item['_source_file'] = filename
-                                    item['_line_number'] = line_num
-                                    all_data.append(item)
-                                except json.JSONDecodeError as e:
-                                    logger.warning(f"文件 {filename} 第 {line_num} 行JSON格式错误: {e}")
-                                    continue
-                    processed_files += 1
-                    logger.info(f"已处理文件: {filename}")
-                except Exception as e:
-                    logger.error(f"读取文件 {filename} 失败: {e}")
-                    continue
+        # 各文件在IO线程池中并行读取解析，结果按目录顺序合并（日志仍在当前线程输出）
+        pending_reads = [
+            (filename, IO_POOL.submit(read_tagged_jsonl, os.path.join(search_dir, filename), filename))
+            for filename in os.listdir(search_dir)
+            if filename.endswith('_with_tags.jsonl')
+        ]
+        for filename, future in pending_reads:
+            try:
+                all_data.extend(future.result())
+                processed_files += 1
+                logger.info(f"已处理文件: {filename}")
+            except Exception as e:
+                logger.error(f"读取文件 {filename} 失败: {e}")
+                continue
         
         logger.info(f"成功获取文件夹数据，共 {len(all_data)} 条数据，来自 {processed_files} 个文件")
         return jsonify({
@@ -3123,11 +4016,13 @@ def process_folder_domain_detection(folder_path, llm_client, force_reprocess=Fal
         # 初始化标签信息管理器
         tag_manager = DomainTagManager(folder_path)
         
-        # 获取文件夹下所有JSONL文件
-        jsonl_files = []
-        for file in os.listdir(folder_path):
-            if file.endswith('.jsonl') and not file.endswith('_with_tags.jsonl'):
-                jsonl_files.append(file)
+        # 获取文件夹下所有JSONL文件及其修改时间（scandir 一次遍历取得，后续不再逐个stat）
+        with os.scandir(folder_path) as entries:
+            jsonl_files = [
+                (entry.name, entry.stat().st_mtime)
+                for entry in entries
+                if entry.name.endswith('.jsonl') and not entry.name.endswith('_with_tags.jsonl')
+            ]
         
         if not jsonl_files:
             return {
@@ -3142,7 +4037,7 @@ def process_folder_domain_detection(folder_path, llm_client, force_reprocess=Fal
         processed_files = 0
         cleared_files = 0
         
-        for filename in jsonl_files:
+        for filename, file_mtime in jsonl_files:
             file_path = os.path.join(folder_path, filename)
             
                             # 如果是强制重新处理，先清理旧数据（无论之前是否处理过）
@@ -3166,7 +4061,7 @@ def process_folder_domain_detection(folder_path, llm_client, force_reprocess=Fal
                     logger.info(f"强制重新处理文件: {filename}，文件之前未处理过")
             else:
                 # 非强制重新处理模式：检查是否需要处理该文件
-                if tag_manager.is_file_processed(filename, file_path):
+                if tag_manager.is_file_processed(filename, file_mtime):
                     logger.info(f"跳过已处理的文件: {filename}")
                     continue
             
@@ -3175,10 +4070,10 @@ def process_folder_domain_detection(folder_path, llm_client, force_reprocess=Fal
             # 加载文件数据
             items = []
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
+                with open(file_path, 'rb') as f:
                     for line in f:
                         if line.strip():
-                            items.append(json.loads(line.strip()))
+                            items.append(json_loads(line))
             except Exception as e:
                 logger.error(f"读取文件 {filename} 失败: {e}")
                 continue
@@ -3205,18 +4100,14 @@ def process_folder_domain_detection(folder_path, llm_client, force_reprocess=Fal
                 output_filename = filename.replace('.jsonl', '_with_tags.jsonl')
                 output_path = os.path.join(tagged_dir, output_filename)
                 
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    for i, item in enumerate(items):
-                        # 添加领域标签到原数据
-                        enhanced_item = item.copy()
-                        if i < len(results):
-                            enhanced_item['domain_tags'] = results[i].get('domain_tags', [])
-                        else:
-                            enhanced_item['domain_tags'] = []
-                        f.write(json.dumps(enhanced_item, ensure_ascii=False) + '\n')
+                # 添加领域标签到原数据
+                write_jsonl(output_path, (
+                    {**item, 'domain_tags': results[i].get('domain_tags', []) if i < len(results) else []}
+                    for i, item in enumerate(items)
+                ))
                 
                 # 更新处理状态
-                tag_manager.mark_file_processed(filename, len(items), results)
+                tag_manager.mark_file_processed(filename, len(items), results, file_mtime=file_mtime)
                 
                 total_processed_items += len(items)
                 processed_files += 1
@@ -3275,8 +4166,8 @@ class DomainTagManager:
         """加载标签信息"""
         if os.path.exists(self.info_file):
             try:
-                with open(self.info_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.info_file, 'rb') as f:
+                    return json_loads(f.read())
             except Exception as e:
                 logger.error(f"加载标签信息文件失败: {e}")
         
@@ -3294,7 +4185,7 @@ class DomainTagManager:
         self.info['last_updated'] = datetime.now().isoformat()
         
         # 最终验证数据一致性
-        total_tag_count = sum(tag_info.get('count', 0) for tag_info in self.info['tags'].values())
+        total_tag_count = sum([tag_info.get('count', 0) for tag_info in self.info['tags'].values()])
         total_processed = self.info.get('total_processed', 0)
         
         if total_tag_count != total_processed and total_processed > 0:
@@ -3304,8 +4195,11 @@ class DomainTagManager:
             self.info['total_processed'] = total_tag_count
         
         try:
-            with open(self.info_file, 'w', encoding='utf-8') as f:
-                json.dump(self.info, f, ensure_ascii=False, indent=2)
+            # 先写临时文件再原子替换，读取方不会看到写了一半的文件
+            tmp_file = f'{self.info_file}.part'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(json_dumps(self.info, indent=True))
+            os.replace(tmp_file, self.info_file)
             logger.info(f"标签信息已保存: {len(self.info['tags'])} 个标签，{self.info['total_processed']} 条记录")
         except Exception as e:
             logger.error(f"保存标签信息文件失败: {e}")
@@ -3330,8 +4224,8 @@ class DomainTagManager:
             self.add_tag(tag_name)
             self.info['tags'][tag_name]['count'] = count_increment
     
-    def is_file_processed(self, filename, file_path):
-        """检查文件是否已处理"""
+    def is_file_processed(self, filename, file_mtime):
+        """检查文件是否已处理（file_mtime 为调用方扫描目录时取得的修改时间戳）"""
         if filename not in self.info['file_processing_status']:
             return False
         
@@ -3342,7 +4236,7 @@ class DomainTagManager:
         # 检查文件是否被修改
         try:
             from datetime import datetime
-            file_modified_time = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+            file_modified_time = datetime.fromtimestamp(file_mtime).isoformat()
             recorded_modified_time = file_status.get('file_modified', '')
             
             if file_modified_time != recorded_modified_time:
@@ -3365,15 +4259,20 @@ class DomainTagManager:
                 if self.info['total_processed'] < 0:
                     self.info['total_processed'] = 0
             
-            # 尝试从with_tags文件中精确计算该文件的标签贡献
+            # 优先使用处理时记录的各标签计数；旧版本记录没有该字段时，从with_tags文件中精确计算该文件的标签贡献
             try:
                 tagged_file_path = os.path.join(self.folder_path, 'tagged', filename.replace('.jsonl', '_with_tags.jsonl'))
-                if os.path.exists(tagged_file_path):
+                if 'tag_counts' in file_status:
+                    for tag, count in file_status['tag_counts'].items():
+                        if tag in self.info['tags']:
+                            self.info['tags'][tag]['count'] = max(0, self.info['tags'][tag]['count'] - count)
+                    logger.info(f"已按记录的标签计数减去文件 {filename} 的标签贡献")
+                elif os.path.exists(tagged_file_path):
                     logger.info(f"从with_tags文件精确计算文件 {filename} 的标签计数")
-                    with open(tagged_file_path, 'r', encoding='utf-8') as f:
+                    with open(tagged_file_path, 'rb') as f:
                         for line in f:
                             if line.strip():
-                                item = json.loads(line.strip())
+                                item = json_loads(line)
                                 domain_tags = item.get('domain_tags', [])
                                 if isinstance(domain_tags, list):
                                     for tag in domain_tags:
@@ -3405,29 +4304,31 @@ class DomainTagManager:
             del self.info['file_processing_status'][filename]
             logger.info(f"已清除文件 {filename} 的处理数据，准备重新处理")
 
-    def mark_file_processed(self, filename, processed_count, file_tags=None):
-        """标记文件已处理"""
+    def mark_file_processed(self, filename, processed_count, file_tags=None, file_mtime=None):
+        """标记文件已处理（已知修改时间戳时通过 file_mtime 传入，避免重复stat）"""
         from datetime import datetime
-        file_path = os.path.join(self.folder_path, filename)
         try:
-            file_modified_time = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+            if file_mtime is None:
+                file_mtime = os.path.getmtime(os.path.join(self.folder_path, filename))
+            file_modified_time = datetime.fromtimestamp(file_mtime).isoformat()
         except Exception:
             file_modified_time = datetime.now().isoformat()
         
-        # 收集文件中的所有标签
-        all_file_tags = set()
+        # 统计文件中各标签的出现次数（清除处理数据时直接按此扣减，无需重新读取with_tags文件）
+        tag_counts = Counter()
         if file_tags:
             for result in file_tags:
                 tags = result.get('domain_tags', [])
                 if isinstance(tags, list):
-                    all_file_tags.update(tags)
+                    tag_counts.update(tags)
         
         self.info['file_processing_status'][filename] = {
             'processed': True,
             'processed_count': processed_count,
             'last_processed': datetime.now().isoformat(),
             'file_modified': file_modified_time,
-            'tags': list(all_file_tags)  # 保存文件包含的所有标签
+            'tags': list(tag_counts),  # 保存文件包含的所有标签
+            'tag_counts': dict(tag_counts)
         }
         
         self.info['total_processed'] += processed_count
@@ -3441,8 +4342,7 @@ class DomainTagManager:
         self.info['tags'] = {}
         
         # 初始化预定义标签（确保所有预定义标签都存在，即使计数为0）
-        predefined_tags = {'体育', '学术', '政治', '娱乐', '文学', '文化', '经济', '科技', '历史', '医疗', '其他'}
-        for tag in predefined_tags:
+        for tag in PREDEFINED_DOMAIN_TAGS:
             self.add_tag(tag)
         
         # 重置总处理数
@@ -3453,6 +4353,9 @@ class DomainTagManager:
         if os.path.exists(tagged_dir):
             recalculated_files = 0
             found_tags = set()
+            # 逐行循环中使用局部变量，避免重复查找全局名称和绑定方法
+            predefined_tags = PREDEFINED_DOMAIN_TAGS
+            add_found_tag = found_tags.add
             
             for filename, file_status in self.info['file_processing_status'].items():
                 if file_status.get('processed', False):
@@ -3462,13 +4365,18 @@ class DomainTagManager:
                     if os.path.exists(tagged_file_path):
                         try:
                             file_item_count = 0
-                            file_tags = set()
+                            # 先在本地统计，整个文件解析成功后再一次性并入标签计数
+                            file_tag_counts = Counter()
                             
-                            with open(tagged_file_path, 'r', encoding='utf-8') as f:
-                                for line in f:
-                                    if line.strip():
+                            with open(tagged_file_path, 'rb') as f:
+                                if os.fstat(f.fileno()).st_size <= TAGGED_FILE_BULK_READ_LIMIT:
+                                    lines = f.read().split(b'\n')
+                                else:
+                                    lines = f
+                                for line in lines:
+                                    if line and not line.isspace():
                                         file_item_count += 1
-                                        item = json.loads(line.strip())
+                                        item = json_loads(line)
                                         domain_tags = item.get('domain_tags', [])
                                         if isinstance(domain_tags, list):
                                             # 在单标签模式下，每个条目应该只有一个标签
@@ -3478,7 +4386,7 @@ class DomainTagManager:
                                             # 只选择第一个有效的预定义标签
                                             selected_tag = None
                                             for tag in domain_tags:
-                                                found_tags.add(tag)
+                                                add_found_tag(tag)
                                                 if tag in predefined_tags:
                                                     selected_tag = tag
                                                     break
@@ -3490,13 +4398,11 @@ class DomainTagManager:
                                                 selected_tag = '其他'
                                             
                                             # 只为选中的标签计数一次
-                                            file_tags.add(selected_tag)
-                                            if selected_tag in self.info['tags']:
-                                                self.info['tags'][selected_tag]['count'] += 1
-                                            else:
-                                                # 如果标签不在info中，添加它
-                                                self.add_tag(selected_tag)
-                                                self.info['tags'][selected_tag]['count'] += 1
+                                            file_tag_counts[selected_tag] += 1
+                            
+                            for tag, count in file_tag_counts.items():
+                                self.update_tag_count(tag, count)
+                            file_tags = set(file_tag_counts)
                             
                             # 更新文件的处理数量和标签列表
                             file_status['processed_count'] = file_item_count
@@ -3514,7 +4420,7 @@ class DomainTagManager:
             # 清理不再使用的标签（不在预定义列表中的标签）
             tags_to_remove = []
             for tag_name in self.info['tags']:
-                if tag_name not in predefined_tags:
+                if tag_name not in PREDEFINED_DOMAIN_TAGS:
                     tags_to_remove.append(tag_name)
             
             if tags_to_remove:
@@ -3560,7 +4466,8 @@ def process_batch_domain_detection_with_manager(items, existing_tags, llm_client
     """带标签管理器的批量领域标签检测"""
     try:
         max_chars_per_batch = 70000  # 每批最大字符数
-        all_results = []
+        # 按全局索引预分配结果，各批次直接写入对应位置
+        all_results = [None] * len(items)
         
         logger.info(f"分批处理 {len(items)} 个数据项，每批最大 {max_chars_per_batch} 字符")
         
@@ -3583,8 +4490,7 @@ def process_batch_domain_detection_with_manager(items, existing_tags, llm_client
                 
                 # 获取最新的标签集合（每批次都获取最新的）
                 current_tags = tag_manager.get_all_tags()
-                batch_results = _process_batch_with_manager(current_batch, current_tags, llm_client, tag_manager, batch_count)
-                all_results.extend(batch_results)
+                _process_batch_with_manager(current_batch, all_results, current_tags, llm_client, tag_manager, batch_count)
                 
                 # 重置批次
                 current_batch = []
@@ -3604,21 +4510,14 @@ def process_batch_domain_detection_with_manager(items, existing_tags, llm_client
             batch_count += 1
             logger.info(f"处理第 {batch_count} 批，包含 {len(current_batch)} 个项目，总字符数: {current_batch_chars}")
             current_tags = tag_manager.get_all_tags()
-            batch_results = _process_batch_with_manager(current_batch, current_tags, llm_client, tag_manager, batch_count)
-            all_results.extend(batch_results)
-        
-        # 按索引排序结果
-        all_results.sort(key=lambda x: x['index'])
+            _process_batch_with_manager(current_batch, all_results, current_tags, llm_client, tag_manager, batch_count)
         
         # 确保所有项目都有结果，缺失的标记为"其他"
-        for i in range(len(items)):
-            if not any(result['index'] == i for result in all_results):
-                all_results.append({'index': i, 'domain_tags': ['其他']})
+        for i, result in enumerate(all_results):
+            if result is None:
+                all_results[i] = {'index': i, 'domain_tags': ['其他']}
                 tag_manager.update_tag_count('其他')
         
-        # 再次排序
-        all_results.sort(key=lambda x: x['index'])
-        
         return all_results
         
     except Exception as e:
@@ -3629,8 +4528,8 @@ def process_batch_domain_detection_with_manager(items, existing_tags, llm_client
         return [{'index': i, 'domain_tags': ['其他']} for i in range(len(items))]
 
 
-def _process_batch_with_manager(batch_items, existing_tags, llm_client, tag_manager, batch_number):
-    """处理单个批次并更新标签管理器"""
+def _process_batch_with_manager(batch_items, all_results, existing_tags, llm_client, tag_manager, batch_number):
+    """处理单个批次并更新标签管理器，结果按全局索引写入 all_results；未得到结果的位置保持为 None"""
     try:
         # 准备当前批次的文本
         batch_texts = []
@@ -3705,18 +4604,17 @@ def _process_batch_with_manager(batch_items, existing_tags, llm_client, tag_mana
         full_prompt = '\n'.join(prompt_parts)
         logger.info(f"第 {batch_number} 批次包含 {len(batch_texts)} 个问题，索引范围: {[item['global_index'] for item in batch_texts]}，单标签模式: {sorted(PREDEFINED_DOMAIN_TAGS)}")
         
-        batch_results = []
+        result_count = 0
+        # 结果循环中使用局部变量，避免重复查找全局名称和绑定方法
+        valid_tags = PREDEFINED_DOMAIN_TAGS
+        update_tag_count = tag_manager.update_tag_count
         
         try:
             import asyncio
             response = asyncio.run(llm_client.generate_response(full_prompt))
             
             # 解析当前批次的结果
-            json_start = response.find('[')
-            json_end = response.rfind(']') + 1
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                detection_results = json.loads(json_str)
+            detection_results = extract_json_array(response)
                 
             for result in detection_results:
                 if isinstance(result, dict) and 'index' in result:
@@ -3724,10 +4622,9 @@ def _process_batch_with_manager(batch_items, existing_tags, llm_client, tag_mana
                     if 0 <= batch_index < len(batch_texts):
                         global_index = batch_texts[batch_index]['global_index']
                         tags = result.get('domain_tags', [])
-                        if isinstance(tags, list):
-                            # 使用预定义的标签列表
-                            valid_tags = PREDEFINED_DOMAIN_TAGS
-                            
+                        if all_results[global_index] is not None:
+                            logger.warning(f"批次 {batch_number}: 全局索引 {global_index} 重复返回，忽略后续结果")
+                        elif isinstance(tags, list):
                             # 如果模型返回了多个标签，记录警告
                             if len(tags) > 1:
                                 logger.warning(f"模型返回了多个标签 {tags}，将只选择第一个有效标签")
@@ -3753,41 +4650,27 @@ def _process_batch_with_manager(batch_items, existing_tags, llm_client, tag_mana
                             
                             clean_tags = [selected_tag]
                             # 实时更新标签管理器
-                            tag_manager.update_tag_count(selected_tag)
+                            update_tag_count(selected_tag)
                             
                             # 只为每个问题添加一次结果，不是每个标签添加一次
-                            batch_results.append({
+                            all_results[global_index] = {
                                 'index': global_index,
                                 'domain_tags': clean_tags
-                            })
+                            }
+                            result_count += 1
                             logger.debug(f"批次 {batch_number}: 为全局索引 {global_index} 选择标签 '{selected_tag}'")
                     else:
                         logger.warning(f"批次索引 {batch_index} 超出范围，批次大小: {len(batch_texts)}")
         
         except Exception as e:
+            # 未写入结果的位置由调用方统一标记为"其他"
             logger.error(f"处理第 {batch_number} 批时出错: {e}")
-            # 为当前批次添加默认结果（标记为"其他"）
-            for batch_item in batch_items:
-                batch_results.append({
-                    'index': batch_item['global_index'],
-                    'domain_tags': ['其他']
-                })
-                tag_manager.update_tag_count('其他')
         
-        logger.info(f"批次 {batch_number} 处理完成，输入 {len(batch_texts)} 个问题，输出 {len(batch_results)} 个结果")
-        return batch_results
+        logger.info(f"批次 {batch_number} 处理完成，输入 {len(batch_texts)} 个问题，输出 {result_count} 个结果")
 
     except Exception as e:
+        # 未写入结果的位置由调用方统一标记为"其他"
         logger.error(f"批次 {batch_number} 处理异常: {e}")
-        # 为当前批次添加默认结果（标记为"其他"）
-        batch_results = []
-        for batch_item in batch_items:
-            batch_results.append({
-                'index': batch_item['global_index'],
-                'domain_tags': ['其他']
-            })
-            tag_manager.update_tag_count('其他')
-        return batch_results
 
 
 def process_batch_domain_detection(items, existing_tags, llm_client):
@@ -3922,12 +4805,8 @@ def _process_batch(batch_items, all_results, all_tags, llm_client, batch_number)
                 response = asyncio.run(llm_client.generate_response(full_prompt))
                 
                 # 解析当前批次的结果
-                json_start = response.find('[')
-                json_end = response.rfind(']') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    detection_results = json.loads(json_str)
-                    
+                detection_results = extract_json_array(response)
+                if detection_results:
                     for result in detection_results:
                         if isinstance(result, dict) and 'index' in result:
                             batch_index = result['index']
@@ -3973,7 +4852,9 @@ def _process_batch(batch_items, all_results, all_tags, llm_client, batch_number)
 def convert_json_to_jsonl():
     """将JSON文件转换为JSONL格式"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         filename = data.get('filename', '')
         content = data.get('content', '')
         count = data.get('count', 0)
@@ -4020,7 +4901,9 @@ def convert_json_to_jsonl():
 def detect_information_leakage():
     """检测推理路径中的信息泄漏"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         question = data.get('question', '')
         reasoning_map = data.get('reasoning_map', '')
         entity_mapping = data.get('entity_mapping', {})
@@ -4069,7 +4952,9 @@ def detect_information_leakage_batch():
     """批量检测信息泄漏（后端并发处理，突破浏览器并发限制）"""
     
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         items = data.get('items', [])
         auto_fix = data.get('auto_fix', True)
         qps_limit = data.get('qps_limit', 2.0)
@@ -4243,7 +5128,7 @@ def load_final_datasets():
                         line = line.strip()
                         if line:
                             try:
-                                item = json.loads(line)
+                                item = json_loads(line)
                                 # 添加数据源信息
                                 item['source'] = source_name
                                 # 注意：不在加载时自动生成ID，让用户明确点击"生成ID"按钮来生成并保存
@@ -4326,7 +5211,9 @@ def load_final_datasets():
 def update_data_id():
     """更新数据项的唯一ID"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         old_id = data.get('old_id')
         new_id = data.get('new_id')
         source_file = data.get('source_file')
@@ -4358,12 +5245,12 @@ def update_data_id():
                 line = line.strip()
                 if line:
                     try:
-                        item = json.loads(line)
+                        item = json_loads(line)
                         if item.get('unique_id') == old_id:
                             item['unique_id'] = new_id
                             found = True
                             logger.info(f"更新ID: {old_id} -> {new_id} 在文件 {source_file}")
-                        updated_lines.append(json.dumps(item, ensure_ascii=False))
+                        updated_lines.append(json_dumps(item))
                     except json.JSONDecodeError:
                         updated_lines.append(line)
         
@@ -4374,9 +5261,7 @@ def update_data_id():
             }), 404
         
         # 写回文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for line in updated_lines:
-                f.write(line + '\n')
+        write_jsonl_lines(file_path, updated_lines)
         
         return jsonify({
             'success': True,
@@ -4418,7 +5303,7 @@ def generate_missing_ids():
                             line = line.strip()
                             if line:
                                 try:
-                                    item = json.loads(line)
+                                    item = json_loads(line)
                                     if item.get('unique_id'):
                                         existing_ids.add(item['unique_id'])
                                 except json.JSONDecodeError:
@@ -4440,7 +5325,7 @@ def generate_missing_ids():
                     line = line.strip()
                     if line:
                         try:
-                            item = json.loads(line)
+                            item = json_loads(line)
                             if 'unique_id' not in item or not item['unique_id'] or item['unique_id'].strip() == '':
                                 # 生成新的唯一ID，确保不重复
                                 content = str(item.get('question', '')) + str(item.get('answer', ''))
@@ -4476,16 +5361,14 @@ def generate_missing_ids():
                                     existing_ids.add(item['unique_id'])
                                 generated_count += 1
                                 logger.info(f"生成ID: {item['unique_id']} 在文件 {source_name}:{line_num}")
-                            updated_lines.append(json.dumps(item, ensure_ascii=False))
+                            updated_lines.append(json_dumps(item))
                         except json.JSONDecodeError as e:
                             logger.warning(f"解析JSON失败 {file_path}:{line_num} - {e}")
                             updated_lines.append(line)
             
             if generated_count > 0:
                 # 写回文件
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    for line in updated_lines:
-                        f.write(line + '\n')
+                write_jsonl_lines(file_path, updated_lines)
                 
                 updated_files.append({
                     'file': source_name,
@@ -4579,21 +5462,19 @@ def clean_dirty_ids():
                         line = line.strip()
                         if line:
                             try:
-                                item = json.loads(line)
+                                item = json_loads(line)
                                 if 'unique_id' in item:
                                     del item['unique_id']
                                     cleaned_count += 1
                                     logger.info(f"删除ID: {original_file.name}:{line_num}")
-                                updated_lines.append(json.dumps(item, ensure_ascii=False))
+                                updated_lines.append(json_dumps(item))
                             except json.JSONDecodeError as e:
                                 logger.warning(f"解析JSON失败 {original_file}:{line_num} - {e}")
                                 updated_lines.append(line)
                 
                 if cleaned_count > 0:
                     # 写回文件
-                    with open(original_file, 'w', encoding='utf-8') as f:
-                        for line in updated_lines:
-                            f.write(line + '\n')
+                    write_jsonl_lines(original_file, updated_lines)
                     
                     cleaned_files.append({
                         'file': original_name,
@@ -4649,7 +5530,7 @@ def check_duplicate_ids():
                         line = line.strip()
                         if line:
                             try:
-                                item = json.loads(line)
+                                item = json_loads(line)
                                 unique_id = item.get('unique_id')
                                 if unique_id:
                                     all_ids.append(unique_id)
@@ -4685,8 +5566,8 @@ def check_duplicate_ids():
                 'unique_ids': len(id_counts),
                 'duplicate_count': len(duplicates),
                 'missing_ids': len([1 for file_path in final_datasets_dir.rglob('*.jsonl') 
-                                  for line in open(file_path, 'r', encoding='utf-8') 
-                                  if line.strip() and not json.loads(line.strip()).get('unique_id', '')])
+                                  for line in open(file_path, 'rb') 
+                                  if line.strip() and not json_loads(line).get('unique_id', '')])
             },
             'duplicates': duplicate_details
         })
@@ -4702,7 +5583,9 @@ def check_duplicate_ids():
 def export_final_datasets():
     """导出筛选后的数据"""
     try:
-        data = request.get_json()
+        data = get_request_json()
+        if data is None:
+            return invalid_json_response()
         filtered_data = data.get('data', [])
         export_format = data.get('format', 'jsonl')
         
@@ -4718,14 +5601,14 @@ def export_final_datasets():
             # 导出为JSONL格式
             output_lines = []
             for item in filtered_data:
-                output_lines.append(json.dumps(item, ensure_ascii=False))
+                output_lines.append(json_dumps(item))
             
             output_content = '\n'.join(output_lines)
             filename = f'final_datasets_export_{timestamp}.jsonl'
             
         elif export_format == 'json':
             # 导出为JSON格式
-            output_content = json.dumps(filtered_data, ensure_ascii=False, indent=2)
+            output_content = json_dumps(filtered_data, indent=True)
             filename = f'final_datasets_export_{timestamp}.json'
             
         else: